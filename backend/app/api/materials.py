@@ -17,7 +17,7 @@ from app.db.session import get_db
 from app.models.chunk import MaterialChunk
 from app.models.material import Material
 from app.models.user import User
-from app.services.document_processor import chunk_text, extract_text_from_pdf
+from app.services.document_processor import chunk_text_by_tokens, extract_text_from_pdf
 from app.services.embedding_service import get_embedding_service
 from app.services.file_validator import file_validator
 
@@ -167,7 +167,7 @@ async def upload_material(
         )
 
         chunking_start = perf_counter()
-        text_chunks = await run_in_threadpool(chunk_text, text)
+        text_chunks = await run_in_threadpool(chunk_text_by_tokens, text)
         if not text_chunks:
             raise ValueError("Document processing produced no chunks.")
 
@@ -197,20 +197,23 @@ async def upload_material(
 
         await session.flush()
 
-        for chunk_model in chunk_models:
-            metadata = {
-                "material_id": str(material.id),
-                "user_id": str(current_user.id),
-                "chunk_index": chunk_model.chunk_index,
-                "filename": material.filename,
-            }
-            await run_in_threadpool(
-                embedding_service.store_chunk_embedding,
-                str(chunk_model.id),
-                chunk_model.content,
-                metadata,
-            )
-            stored_chunk_ids.append(str(chunk_model.id))
+        # Batches of EMBEDDING_BATCH_SIZE are embedded concurrently, then
+        # written with a single vector-store upsert
+        chunk_ids = [str(chunk_model.id) for chunk_model in chunk_models]
+        await embedding_service.store_chunk_embeddings_async(
+            chunk_ids,
+            [chunk_model.content for chunk_model in chunk_models],
+            [
+                {
+                    "material_id": str(material.id),
+                    "user_id": str(current_user.id),
+                    "chunk_index": chunk_model.chunk_index,
+                    "filename": material.filename,
+                }
+                for chunk_model in chunk_models
+            ],
+        )
+        stored_chunk_ids = chunk_ids
 
         chunk_count = len(chunk_models)
         embedding_end = perf_counter()
@@ -29,6 +29,7 @@ class Settings(BaseSettings):
     REDIS_PORT: int = 6379
     REDIS_DB: int = 0
     REDIS_PASSWORD: str | None = None
+    REDIS_POOL_SIZE: int = 10
 
     # File upload security
     MAX_UPLOAD_SIZE: int = 50 * 1024 * 1024  # 50 MB
@@ -47,6 +48,8 @@ class Settings(BaseSettings):
     CLAMAV_HOST: str | None = None
     CLAMAV_PORT: int = 3310
     CLAMAV_SOCKET: str | None = None
+    CLAMAV_MAX_CONCURRENCY: int = 4  # Concurrent INSTREAM scans per worker
+    UPLOAD_DIGEST: str = "blake3"  # "blake3" (falls back to sha256 if not installed) or "sha256"
 
     # CORS - Using simple string for now to avoid pydantic parsing issues
     CORS_ALLOW_ORIGINS: str = "http://localhost:3000,http://127.0.0.1:3000"
@@ -70,7 +73,7 @@ class Settings(BaseSettings):
     CODEX_DEFAULT_MODEL: str = "gpt-5"  # or "claude-3.5-sonnet", "gpt-5-codex", etc.
     CODEX_TEMPERATURE: float = 0.7
     CODEX_MAX_TOKENS: int = 128000  # GPT-5: 128K output, GPT-4o: 16K output, Claude 3.5: 8K output
-    CODEX_STREAM_TIMEOUT: float = 30.0  # Timeout for individual readline operations (seconds)
+    CODEX_STREAM_TIMEOUT: float = 30.0  # Timeout for individual stdout reads (seconds)
     CODEX_MAX_RESPONSE_SIZE: int = 1024 * 1024  # Maximum accumulated response size (1MB)
     CODEX_PROCESS_CLEANUP_TIMEOUT: float = 5.0  # Timeout for process cleanup in finally block (seconds)
     CODEX_MAX_PROMPT_LENGTH: int = 51200  # Maximum prompt size (50KB) - security limit to prevent memory exhaustion
@@ -79,6 +82,20 @@ class Settings(BaseSettings):
     GEMINI_API_KEY: str | None = None
     GEMINI_EMBEDDING_MODEL: str = "gemini-embedding-001"  # latest text embedding model
     GEMINI_EMBEDDING_DIM: int = 1536  # recommended default; make it configurable
+    # Upload chunk size in tiktoken tokens. gemini-embedding-001 takes 2048 input
+    # tokens; tiktoken only approximates Gemini's tokenizer, so leave headroom.
+    EMBEDDING_CHUNK_TOKENS: int = 1792
+    EMBEDDING_CHUNK_OVERLAP_TOKENS: int = 128
+    # Storage type for vectors in the embedding cache sidecar. "float16" halves
+    # its size; vectors are widened back to float32 before reaching Chroma.
+    EMBEDDING_CACHE_DTYPE: str = "float32"
+    # Sidecar bounds: rows unused this long expire, and past the entry cap the
+    # least recently used are evicted (~6 KB per 1536-dim float32 vector)
+    EMBEDDING_CACHE_MAX_ENTRIES: int = 100_000
+    EMBEDDING_CACHE_TTL_DAYS: int = 90
+    # Embedding batch requests in flight at once during uploads; bounded by
+    # the Gemini API rate limit
+    EMBEDDING_CONCURRENCY: int = 4
 
     # Monitoring
     LOG_LEVEL: str = "INFO"
@@ -117,6 +134,24 @@ class Settings(BaseSettings):
         """Convert CORS_ALLOW_HEADERS string to list."""
         return [item.strip() for item in self.CORS_ALLOW_HEADERS.split(",") if item.strip()]
 
+    @field_validator("UPLOAD_DIGEST")
+    @classmethod
+    def _validate_upload_digest(cls, value: str) -> str:
+        normalized = (value or "").strip().lower()
+        allowed = {"blake3", "sha256"}
+        if normalized not in allowed:
+            raise ValueError(f"UPLOAD_DIGEST must be one of: {', '.join(sorted(allowed))}")
+        return normalized
+
+    @field_validator("EMBEDDING_CACHE_DTYPE")
+    @classmethod
+    def _validate_embedding_cache_dtype(cls, value: str) -> str:
+        normalized = (value or "").strip().lower()
+        allowed = {"float16", "float32"}
+        if normalized not in allowed:
+            raise ValueError(f"EMBEDDING_CACHE_DTYPE must be one of: {', '.join(sorted(allowed))}")
+        return normalized
+
     @field_validator("MAX_UPLOAD_SIZE", "USER_STORAGE_QUOTA")
     @classmethod
     def _validate_positive_sizes(cls, value: int) -> int:
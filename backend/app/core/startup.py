@@ -5,17 +5,36 @@ Manages lifecycle of connections and background tasks.
 
 from __future__ import annotations
 
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 from typing import AsyncIterator
 
 from fastapi import FastAPI
 
-from app.services.analytics import get_event_bus
+from app.db.session import SessionLocal
+from app.services.analytics import get_event_bus, view_refresher
+from app.services.embedding_service import get_embedding_service
+from app.services.tokenizer import get_encoder
 
 logger = logging.getLogger(__name__)
 
 
+def _warm_embedding_service() -> None:
+    """Open the Chroma collection and Gemini client before the first upload."""
+    try:
+        get_embedding_service()
+        logger.info("Embedding service warmed up")
+    except Exception as e:
+        logger.warning(f"Embedding service warmup skipped: {e}")
+
+
+def _warm_tokenizer() -> None:
+    """Load (and, on a fresh host, download) the tiktoken encoding."""
+    if get_encoder() is None:
+        logger.warning("Tokenizer unavailable; token counts and chunking use heuristics")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     """Manage application lifecycle.
@@ -37,6 +56,15 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     # Store event bus in app state for access in endpoints
     app.state.event_bus = event_bus if 'event_bus' in locals() else None
 
+    # Pay disk/network initialization now instead of on the first request
+    await asyncio.gather(
+        asyncio.to_thread(_warm_embedding_service),
+        asyncio.to_thread(_warm_tokenizer),
+    )
+
+    # Keep the dashboard materialized views current off the request path
+    await view_refresher.start(SessionLocal)
+
     logger.info("StudyIn backend started successfully")
 
     yield
@@ -44,6 +72,8 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     # Shutdown
     logger.info("Shutting down StudyIn backend...")
 
+    await view_refresher.stop()
+
     # Disconnect from event bus
     if hasattr(app.state, "event_bus") and app.state.event_bus:
         try:
@@ -18,15 +18,19 @@ import uuid
 from typing import Optional
 
 from sqlalchemy import (
+    BigInteger,
     Boolean,
     CheckConstraint,
+    Column,
     Date,
     DateTime,
     Float,
     ForeignKey,
     Index,
     Integer,
+    MetaData,
     String,
+    Table,
 )
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
@@ -507,3 +511,50 @@ class KnowledgeGap(Base):
             name="ck_priority_range",
         ),
     )
+
+
+# Materialized view (migration 009): per-user 7/30/90-day window rollups.
+# Kept on its own MetaData so Base.metadata.create_all() never creates it as a table.
+_view_metadata = MetaData()
+
+user_window_stats = Table(
+    "user_window_stats",
+    _view_metadata,
+    Column("user_id", UUID(as_uuid=True), nullable=False),
+    Column("window_days", Integer, nullable=False),
+    Column("as_of", Date, nullable=False),
+    Column("questions", BigInteger),
+    Column("correct", BigInteger),
+    Column("minutes", BigInteger),
+    Column("sessions", BigInteger),
+    Column("topics", BigInteger),
+    Column("first_attempts", BigInteger),
+    Column("first_correct", BigInteger),
+)
+
+# Materialized view (migration 010): TopicMastery joined with Topic.name for the radar chart.
+topic_mastery_radar = Table(
+    "topic_mastery_radar",
+    _view_metadata,
+    Column("user_id", UUID(as_uuid=True), nullable=False),
+    Column("topic_id", UUID(as_uuid=True), nullable=False),
+    Column("topic_name", String(200)),
+    Column("mastery_score", Float),
+    Column("retention_rate", Float),
+    Column("questions_attempted", Integer),
+    Column("avg_response_time_seconds", Float),
+    Column("last_studied_at", DateTime(timezone=True)),
+)
+
+# Materialized view (migration 011): daily_user_stats rolled up per calendar month.
+monthly_user_stats = Table(
+    "monthly_user_stats",
+    _view_metadata,
+    Column("user_id", UUID(as_uuid=True), nullable=False),
+    Column("month_start", Date, nullable=False),
+    Column("questions_attempted", Integer),
+    Column("questions_correct", Integer),
+    Column("total_study_minutes", Integer),
+    Column("sessions_count", Integer),
+    Column("active_days", Integer),
+)
@@ -0,0 +1,189 @@
+"""Mapped tables behind the anonymized analytics tracker.
+
+These mirror the tables created in migration 004 (plus ``system_metrics``).
+User IDs here are anonymized hashes, so there are no foreign keys to ``users``.
+
+Why mapped classes instead of ``text()``?
+- Core ``insert()``/``update()`` constructs hit SQLAlchemy's compiled cache
+- Bind parameter types come from the column, not per-call inference
+"""
+
+from __future__ import annotations
+
+import datetime
+import uuid
+from typing import Optional
+
+from sqlalchemy import Boolean, Date, DateTime, Float, Index, Integer, String
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, UUID
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+from app.models.base import Base
+
+
+class LearningSession(Base):
+    """One row per tracked learning session."""
+
+    __tablename__ = "learning_sessions"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    started_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False
+    )
+    ended_at: Mapped[Optional[datetime.datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    duration_seconds: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    materials_viewed: Mapped[list[uuid.UUID]] = mapped_column(
+        ARRAY(UUID(as_uuid=True)), nullable=False, server_default="{}"
+    )
+    materials_completed: Mapped[list[uuid.UUID]] = mapped_column(
+        ARRAY(UUID(as_uuid=True)), nullable=False, server_default="{}"
+    )
+    xp_earned: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    is_active: Mapped[bool] = mapped_column(
+        Boolean, nullable=False, server_default="true"
+    )
+    created_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    updated_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
+
+    __table_args__ = (
+        Index("ix_learning_sessions_user_started", "user_id", "started_at"),
+    )
+
+
+class GamificationStats(Base):
+    """Current gamification state per anonymized user."""
+
+    __tablename__ = "gamification_stats"
+
+    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    total_xp: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    current_level: Mapped[int] = mapped_column(
+        Integer, nullable=False, server_default="1"
+    )
+    current_streak: Mapped[int] = mapped_column(
+        Integer, nullable=False, server_default="0"
+    )
+    longest_streak: Mapped[int] = mapped_column(
+        Integer, nullable=False, server_default="0"
+    )
+    last_activity_date: Mapped[Optional[datetime.date]] = mapped_column(
+        Date, nullable=True
+    )
+    achievements: Mapped[list] = mapped_column(
+        JSONB, nullable=False, server_default="[]"
+    )
+    created_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    updated_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
+
+
+class DailyActivitySummary(Base):
+    """Per-day activity rollup for the tracker (one row per user per day)."""
+
+    __tablename__ = "daily_activity_summary"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    date: Mapped[datetime.date] = mapped_column(Date, nullable=False)
+    total_sessions: Mapped[int] = mapped_column(
+        Integer, nullable=False, server_default="0"
+    )
+    total_duration_seconds: Mapped[int] = mapped_column(
+        Integer, nullable=False, server_default="0"
+    )
+    materials_viewed: Mapped[int] = mapped_column(
+        Integer, nullable=False, server_default="0"
+    )
+    materials_completed: Mapped[int] = mapped_column(
+        Integer, nullable=False, server_default="0"
+    )
+    xp_earned: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    ai_messages_sent: Mapped[int] = mapped_column(
+        Integer, nullable=False, server_default="0"
+    )
+    created_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    updated_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
+
+    __table_args__ = (
+        Index("ix_daily_activity_user_date", "user_id", "date", unique=True),
+    )
+
+
+class AICoachMetrics(Base):
+    """Per-conversation AI coach metrics."""
+
+    __tablename__ = "ai_coach_metrics"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    conversation_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), nullable=False
+    )
+    message_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, server_default="0"
+    )
+    avg_response_time_ms: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    avg_rating: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    total_ratings: Mapped[int] = mapped_column(
+        Integer, nullable=False, server_default="0"
+    )
+    created_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    updated_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
+
+
+class SystemMetric(Base):
+    """One row per tracked API request (system-wide, user optional)."""
+
+    __tablename__ = "system_metrics"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    timestamp: Mapped[datetime.datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, index=True
+    )
+    endpoint: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    method: Mapped[Optional[str]] = mapped_column(String(10), nullable=True)
+    status_code: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    response_time_ms: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    error_type: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
+    user_id: Mapped[Optional[uuid.UUID]] = mapped_column(
+        UUID(as_uuid=True), nullable=True
+    )
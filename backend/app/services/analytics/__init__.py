@@ -5,10 +5,13 @@ Provides event tracking, aggregation, and reporting capabilities.
 
 from app.services.analytics.event_bus import EventBus, get_event_bus, publish_event
 from app.services.analytics.tracker import AnalyticsTracker
+from app.services.analytics.view_refresher import MaterializedViewRefresher, view_refresher
 
 __all__ = [
     "EventBus",
     "get_event_bus",
     "publish_event",
     "AnalyticsTracker",
+    "MaterializedViewRefresher",
+    "view_refresher",
 ]
\ No newline at end of file
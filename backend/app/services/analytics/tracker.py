@@ -7,14 +7,15 @@ and computing metrics with HIPAA compliance.
 from __future__ import annotations
 
 import hashlib
+import json
 import logging
 from datetime import date, datetime, timedelta
 from typing import Any, Optional
 from uuid import UUID, uuid4
 
-from sqlalchemy import and_, func, select, text, update
+from sqlalchemy import and_, any_, cast, func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.dialects.postgresql import JSONB, insert
 
 from app.models.analytics import (
     AICoachEvent,
@@ -24,6 +25,13 @@ from app.models.analytics import (
     MaterialInteractionEvent,
     SystemMetricEvent,
 )
+from app.models.analytics_tracking import (
+    AICoachMetrics,
+    DailyActivitySummary,
+    GamificationStats,
+    LearningSession,
+    SystemMetric,
+)
 from app.services.analytics.event_bus import publish_event
 
 logger = logging.getLogger(__name__)
@@ -87,16 +95,13 @@ class AnalyticsTracker:
 
         # Store in database
         await self.db.execute(
-            text("""
-            INSERT INTO learning_sessions (id, user_id, started_at, materials_viewed, is_active)
-            VALUES (:id, :user_id, :started_at, :materials_viewed, true)
-            """),
-            {
-                "id": session_id,
-                "user_id": anonymized_user,
-                "started_at": event.timestamp,
-                "materials_viewed": [material_id] if material_id else [],
-            },
+            insert(LearningSession).values(
+                id=session_id,
+                user_id=anonymized_user,
+                started_at=event.timestamp,
+                materials_viewed=[material_id] if material_id else [],
+                is_active=True,
+            )
         )
         await self.db.commit()
 
@@ -133,12 +138,17 @@ class AnalyticsTracker:
 
         # Get session data
         result = await self.db.execute(
-            text("""
-            SELECT started_at, materials_viewed, materials_completed
-            FROM learning_sessions
-            WHERE id = :id AND user_id = :user_id AND is_active = true
-            """),
-            {"id": session_id, "user_id": anonymized_user},
+            select(
+                LearningSession.started_at,
+                LearningSession.materials_viewed,
+                LearningSession.materials_completed,
+            ).where(
+                and_(
+                    LearningSession.id == session_id,
+                    LearningSession.user_id == anonymized_user,
+                    LearningSession.is_active.is_(True),
+                )
+            )
         )
         session_data = result.first()
 
@@ -166,22 +176,15 @@ class AnalyticsTracker:
 
         # Update session in database
         await self.db.execute(
-            text("""
-            UPDATE learning_sessions
-            SET ended_at = :ended_at,
-                duration_seconds = :duration,
-                xp_earned = :xp_earned,
-                is_active = false,
-                updated_at = :updated_at
-            WHERE id = :id
-            """),
-            {
-                "id": session_id,
-                "ended_at": now,
-                "duration": int(duration),
-                "xp_earned": xp_earned,
-                "updated_at": now,
-            },
+            update(LearningSession)
+            .where(LearningSession.id == session_id)
+            .values(
+                ended_at=now,
+                duration_seconds=int(duration),
+                xp_earned=xp_earned,
+                is_active=False,
+                updated_at=now,
+            )
         )
 
         # Update daily summary
@@ -257,29 +260,33 @@ class AnalyticsTracker:
         if session_id:
             if interaction_type == "view":
                 await self.db.execute(
-                    text("""
-                    UPDATE learning_sessions
-                    SET materials_viewed = array_append(
-                        COALESCE(materials_viewed, ARRAY[]::uuid[]),
-                        :material_id
+                    update(LearningSession)
+                    .where(
+                        and_(
+                            LearningSession.id == session_id,
+                            ~(material_id == any_(LearningSession.materials_viewed)),
+                        )
+                    )
+                    .values(
+                        materials_viewed=func.array_append(
+                            LearningSession.materials_viewed, material_id
+                        )
                     )
-                    WHERE id = :session_id
-                    AND NOT (:material_id = ANY(COALESCE(materials_viewed, ARRAY[]::uuid[])))
-                    """),
-                    {"session_id": session_id, "material_id": material_id},
                 )
             elif interaction_type == "complete":
                 await self.db.execute(
-                    text("""
-                    UPDATE learning_sessions
-                    SET materials_completed = array_append(
-                        COALESCE(materials_completed, ARRAY[]::uuid[]),
-                        :material_id
+                    update(LearningSession)
+                    .where(
+                        and_(
+                            LearningSession.id == session_id,
+                            ~(material_id == any_(LearningSession.materials_completed)),
+                        )
+                    )
+                    .values(
+                        materials_completed=func.array_append(
+                            LearningSession.materials_completed, material_id
+                        )
                     )
-                    WHERE id = :session_id
-                    AND NOT (:material_id = ANY(COALESCE(materials_completed, ARRAY[]::uuid[])))
-                    """),
-                    {"session_id": session_id, "material_id": material_id},
                 )
 
         await self.db.commit()
@@ -310,12 +317,11 @@ class AnalyticsTracker:
 
         # Get current gamification stats
         result = await self.db.execute(
-            text("""
-            SELECT total_xp, current_level, current_streak
-            FROM gamification_stats
-            WHERE user_id = :user_id
-            """),
-            {"user_id": anonymized_user},
+            select(
+                GamificationStats.total_xp,
+                GamificationStats.current_level,
+                GamificationStats.current_streak,
+            ).where(GamificationStats.user_id == anonymized_user)
         )
         current_stats = result.first()
 
@@ -459,21 +465,16 @@ class AnalyticsTracker:
 
         # Store in system metrics table
         await self.db.execute(
-            text("""
-            INSERT INTO system_metrics
-            (id, timestamp, endpoint, method, status_code, response_time_ms, error_type, user_id)
-            VALUES (:id, :timestamp, :endpoint, :method, :status_code, :response_time_ms, :error_type, :user_id)
-            """),
-            {
-                "id": event.event_id,
-                "timestamp": event.timestamp,
-                "endpoint": endpoint,
-                "method": method,
-                "status_code": status_code,
-                "response_time_ms": response_time_ms,
-                "error_type": error_type,
-                "user_id": anonymized_user,
-            },
+            insert(SystemMetric).values(
+                id=event.event_id,
+                timestamp=event.timestamp,
+                endpoint=endpoint,
+                method=method,
+                status_code=status_code,
+                response_time_ms=response_time_ms,
+                error_type=error_type,
+                user_id=anonymized_user,
+            )
         )
 
         await self.db.commit()
@@ -504,9 +505,7 @@ class AnalyticsTracker:
         today = date.today()
 
         # Upsert daily summary
-        stmt = insert(self.db.get_bind().dialect.insert_ignore_into(
-            "daily_activity_summary"
-        )).values(
+        stmt = insert(DailyActivitySummary).values(
             id=uuid4(),
             user_id=user_id,
             date=today,
@@ -547,9 +546,7 @@ class AnalyticsTracker:
             new_level: New level to set
         """
         # Upsert gamification stats
-        stmt = insert(self.db.get_bind().dialect.insert_ignore_into(
-            "gamification_stats"
-        )).values(
+        stmt = insert(GamificationStats).values(
             user_id=user_id,
             total_xp=xp_earned,
             current_level=new_level or 1,
@@ -583,19 +580,18 @@ class AnalyticsTracker:
             user_id: Anonymized user ID
             achievement_id: Achievement ID to add
         """
+        achievement = json.dumps(
+            {"id": achievement_id, "earned_at": datetime.utcnow().isoformat()}
+        )
         await self.db.execute(
-            text("""
-            UPDATE gamification_stats
-            SET achievements = achievements || :achievement::jsonb,
-                updated_at = NOW()
-            WHERE user_id = :user_id
-            """),
-            {
-                "user_id": user_id,
-                "achievement": json.dumps(
-                    {"id": achievement_id, "earned_at": datetime.utcnow().isoformat()}
+            update(GamificationStats)
+            .where(GamificationStats.user_id == user_id)
+            .values(
+                achievements=GamificationStats.achievements.op("||")(
+                    cast(achievement, JSONB)
                 ),
-            },
+                updated_at=func.now(),
+            )
         )
 
     async def _update_streak(self, user_id: UUID, streak_days: int) -> None:
@@ -606,15 +602,16 @@ class AnalyticsTracker:
             streak_days: New streak value
         """
         await self.db.execute(
-            text("""
-            UPDATE gamification_stats
-            SET current_streak = :streak_days,
-                longest_streak = GREATEST(longest_streak, :streak_days),
-                last_activity_date = :today,
-                updated_at = NOW()
-            WHERE user_id = :user_id
-            """),
-            {"user_id": user_id, "streak_days": streak_days, "today": date.today()},
+            update(GamificationStats)
+            .where(GamificationStats.user_id == user_id)
+            .values(
+                current_streak=streak_days,
+                longest_streak=func.greatest(
+                    GamificationStats.longest_streak, streak_days
+                ),
+                last_activity_date=date.today(),
+                updated_at=func.now(),
+            )
         )
 
     async def _update_ai_coach_metrics(
@@ -636,12 +633,18 @@ class AnalyticsTracker:
         """
         # Check if metrics exist
         result = await self.db.execute(
-            text("""
-            SELECT id, message_count, avg_response_time_ms, avg_rating, total_ratings
-            FROM ai_coach_metrics
-            WHERE user_id = :user_id AND conversation_id = :conversation_id
-            """),
-            {"user_id": user_id, "conversation_id": conversation_id},
+            select(
+                AICoachMetrics.id,
+                AICoachMetrics.message_count,
+                AICoachMetrics.avg_response_time_ms,
+                AICoachMetrics.avg_rating,
+                AICoachMetrics.total_ratings,
+            ).where(
+                and_(
+                    AICoachMetrics.user_id == user_id,
+                    AICoachMetrics.conversation_id == conversation_id,
+                )
+            )
         )
         metrics = result.first()
 
@@ -672,33 +675,20 @@ class AnalyticsTracker:
                 update_dict["total_ratings"] = metrics.total_ratings + 1
 
             await self.db.execute(
-                update("ai_coach_metrics")
-                .where(
-                    and_(
-                        self.db.get_bind().dialect.ai_coach_metrics.c.id == metrics.id
-                    )
-                )
+                update(AICoachMetrics)
+                .where(AICoachMetrics.id == metrics.id)
                 .values(**update_dict)
             )
         else:
             # Insert new metrics
             await self.db.execute(
-                text("""
-                INSERT INTO ai_coach_metrics
-                (id, user_id, conversation_id, message_count, avg_response_time_ms, avg_rating, total_ratings)
-                VALUES (:id, :user_id, :conversation_id, :message_count, :avg_response_time_ms, :avg_rating, :total_ratings)
-                """),
-                {
-                    "id": uuid4(),
-                    "user_id": user_id,
-                    "conversation_id": conversation_id,
-                    "message_count": 1 if event_type in {EventType.AI_MESSAGE_SENT, EventType.AI_MESSAGE_RECEIVED} else 0,
-                    "avg_response_time_ms": response_time_ms if response_time_ms else None,
-                    "avg_rating": float(rating) if rating else None,
-                    "total_ratings": 1 if rating else 0,
-                },
-            )
-
-
-# Import json for achievement storage
-import json
\ No newline at end of file
+                insert(AICoachMetrics).values(
+                    id=uuid4(),
+                    user_id=user_id,
+                    conversation_id=conversation_id,
+                    message_count=1 if event_type in {EventType.AI_MESSAGE_SENT, EventType.AI_MESSAGE_RECEIVED} else 0,
+                    avg_response_time_ms=response_time_ms if response_time_ms else None,
+                    avg_rating=float(rating) if rating else None,
+                    total_ratings=1 if rating else 0,
+                )
+            )
\ No newline at end of file
@@ -0,0 +1,145 @@
+"""Background refresh of the dashboard materialized views.
+
+The views (migrations 009-011) cover every user, so they are refreshed here
+on a timer instead of on each per-user cache invalidation. Readers check
+``view_refresher.is_fresh()`` and fall back to the live tables when the views
+can't be trusted (refresher not running, or its refreshes failing).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import datetime
+import logging
+import time
+from typing import Dict, Optional
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+logger = logging.getLogger(__name__)
+
+MATERIALIZED_VIEWS = (
+    "user_window_stats", "topic_mastery_radar", "monthly_user_stats"
+)
+
+# Seconds between refresh checks; activity within one interval shares a refresh
+REFRESH_INTERVAL_SECONDS = 60.0
+
+# Views older than this many intervals are treated as stale by readers
+_FRESH_INTERVALS = 5
+
+
+class MaterializedViewRefresher:
+    """Refresh the dashboard materialized views off the request path.
+
+    invalidate_cache marks the views dirty; a background loop refreshes them
+    at most once per interval, on its own session, and at least once a day
+    so the date-anchored windows roll over. Users whose activity was waiting
+    on the refresh get their analytics cache cleared again afterwards, so
+    results built from the old views don't outlive it.
+    """
+
+    def __init__(self, interval: float = REFRESH_INTERVAL_SECONDS):
+        self._interval = interval
+        self._session_factory: Optional[async_sessionmaker] = None
+        # user_id.hex -> cache to clear once the views include their activity
+        self._pending: Dict[str, object] = {}
+        self._dirty = False
+        self._refreshed_on: Optional[datetime.date] = None
+        self._refreshed_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def is_fresh(self) -> bool:
+        """Whether this process refreshed the views within the last few intervals."""
+        return (
+            self._task is not None
+            and self._refreshed_at is not None
+            and time.monotonic() - self._refreshed_at
+            < self._interval * _FRESH_INTERVALS
+        )
+
+    def mark_dirty(self, user_id: UUID, cache=None) -> None:
+        """Schedule a refresh that includes this user's latest activity.
+
+        A no-op while the loop isn't running: nothing would drain the queue,
+        and readers skip the views then anyway.
+        """
+        if self._task is None:
+            return
+        self._dirty = True
+        self._pending[user_id.hex] = cache
+
+    async def start(self, session_factory: async_sessionmaker) -> None:
+        """Start the background refresh loop."""
+        if not self._task:
+            self._session_factory = session_factory
+            self._task = asyncio.create_task(self._refresh_loop())
+            logger.info("Materialized view refresher started")
+
+    async def stop(self) -> None:
+        """Stop the background refresh loop."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._refreshed_at = None
+            self._pending = {}
+            logger.info("Materialized view refresher stopped")
+
+    async def _refresh_loop(self) -> None:
+        """Refresh when dirty or when the UTC date has moved on."""
+        while True:
+            try:
+                today = datetime.datetime.now(datetime.timezone.utc).date()
+                if self._dirty or self._refreshed_on != today:
+                    await self.refresh()
+                    self._refreshed_on = today
+                else:
+                    # Nothing changed, so the views are still current
+                    self._refreshed_at = time.monotonic()
+                await asyncio.sleep(self._interval)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.warning(f"Materialized view refresh failed: {e}")
+                await asyncio.sleep(self._interval)
+
+    async def refresh(self) -> None:
+        """Refresh every view now, then clear the waiting users' caches.
+
+        CONCURRENTLY keeps dashboard reads unblocked during the refresh. On
+        failure the views stay dirty and the waiting users stay queued.
+        """
+        pending, self._pending = self._pending, {}
+        self._dirty = False
+        try:
+            async with self._session_factory() as db:
+                conn = await db.connection()
+                if conn.dialect.name == "postgresql":
+                    for view in MATERIALIZED_VIEWS:
+                        await db.execute(
+                            text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view}")
+                        )
+                    await db.commit()
+        except BaseException:
+            self._dirty = True
+            self._pending = {**pending, **self._pending}
+            raise
+        self._refreshed_at = time.monotonic()
+
+        for user_hex, cache in pending.items():
+            if not cache:
+                continue
+            try:
+                await cache.unlink_pattern(f"analytics:*:{user_hex}:*")
+            except Exception as e:
+                logger.warning(f"Cache invalidation failed: {e}")
+
+
+# One per process; started and stopped by the app lifespan (app.core.startup)
+view_refresher = MaterializedViewRefresher()
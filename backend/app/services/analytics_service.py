@@ -13,23 +13,456 @@ Design:
 
 from __future__ import annotations
 
+import asyncio
 import datetime
+import hashlib
+import json
 import logging
-from typing import Dict, List, Optional
+import time
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from operator import attrgetter
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
 from uuid import UUID
 
-from sqlalchemy import select, and_, func, case
-from sqlalchemy.ext.asyncio import AsyncSession
+import msgpack
+from sqlalchemy import (
+    Date, Float, Numeric, String, select, and_, bindparam, case, cast, func,
+    literal, text, union_all
+)
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from app.models.analytics_aggregates import (
     TopicDailyStats,
     DailyUserStats,
+    UserLearningMetrics,
+    monthly_user_stats,
+    topic_mastery_radar,
+    user_window_stats,
 )
 from app.models.analytics_events import StudySession, QuestionAttempt
 from app.models.topics import Topic, TopicMastery
+from app.services.analytics.view_refresher import view_refresher
 
 logger = logging.getLogger(__name__)
 
+# Strong references to in-flight background revalidations (see _revalidate)
+_revalidation_tasks: set = set()
+
+# Computes one cacheable result on the given service: returns (data, ttl)
+_Build = Callable[["AnalyticsService"], Awaitable[Tuple[object, int]]]
+
+
+# User IDs in cache keys are the 32-char undashed hex: shorter keys, and no
+# UUID.__str__ formatting per key
+_uuid_str = attrgetter("hex")
+
+
+def _cache_key(endpoint: str, user_id: UUID, *params) -> str:
+    """Build a fixed-width cache key: analytics:{endpoint}:{user_id.hex}:{hash}.
+
+    Callers pass already-normalized params so equivalent requests share a key.
+    """
+    digest = hashlib.blake2b(repr(params).encode(), digest_size=8).hexdigest()
+    return f"analytics:{endpoint}:{_uuid_str(user_id)}:{digest}"
+
+
+# Caller-supplied bounds; anything outside is clamped or dropped so one request
+# can't turn into a full-history scan
+_MAX_WINDOW_DAYS = 365
+_MAX_WINDOWS = 5
+_MAX_RADAR_TOPICS = 50
+_MAX_MIN_ATTEMPTS = 10_000
+
+# Windows pre-aggregated by the user_window_stats materialized view (migration 009)
+_MATERIALIZED_WINDOWS = frozenset({7, 30, 90})
+_WINDOW_VIEW_COLUMNS = (
+    "questions", "correct", "minutes", "sessions", "topics",
+    "first_attempts", "first_correct",
+)
+
+# Hot dashboard reads issued straight to asyncpg (see _fetch_json). Each
+# returns the response list as one JSON array, already in the dict shape
+# the methods below build in Python on the fallback path.
+_RADAR_JSON_TEMPLATE = """
+SELECT coalesce(json_agg(json_build_object(
+    'topic_id', topic_id::text,
+    'topic_name', topic_name,
+    'mastery_score', round(mastery_score::numeric, 2),
+    'accuracy_rate', round(retention_rate::numeric, 2),
+    'questions_attempted', questions_attempted,
+    'avg_response_time_seconds',
+        round(nullif(avg_response_time_seconds, 0)::numeric, 1),
+    'last_studied_at',
+        to_char(last_studied_at AT TIME ZONE 'UTC', 'YYYY-MM-DD"T"HH24:MI:SS"Z"')
+) ORDER BY questions_attempted DESC, mastery_score DESC), '[]')
+FROM (
+    SELECT * FROM {source}
+    WHERE user_id = $1 AND questions_attempted >= $2
+    ORDER BY questions_attempted DESC, mastery_score DESC
+    LIMIT $3
+) top
+"""
+# The topic_mastery_radar view's definition (migration 010), read live while
+# the view isn't being refreshed
+_RADAR_LIVE_SOURCE = """(
+    SELECT tm.user_id, tm.topic_id, t.name AS topic_name, tm.mastery_score,
+           tm.retention_rate, tm.questions_attempted,
+           tm.avg_response_time_seconds, tm.last_studied_at
+    FROM topic_mastery tm
+    JOIN topics t ON tm.topic_id = t.id
+) radar"""
+_RADAR_JSON_SQL = _RADAR_JSON_TEMPLATE.format(source="topic_mastery_radar")
+_RADAR_LIVE_JSON_SQL = _RADAR_JSON_TEMPLATE.format(source=_RADAR_LIVE_SOURCE)
+
+_SESSIONS_JSON_SQL = """
+SELECT coalesce(json_agg(json_build_object(
+    'session_id', id::text,
+    'started_at', started_at,
+    'duration_minutes', round(duration_seconds / 60.0, 1),
+    'questions_attempted', questions_attempted,
+    'accuracy_rate', CASE WHEN questions_attempted > 0
+        THEN round(questions_correct::numeric / questions_attempted, 2) END,
+    'materials_viewed', materials_viewed,
+    'xp_earned', xp_earned
+) ORDER BY started_at DESC), '[]')
+FROM (
+    SELECT * FROM study_sessions
+    WHERE user_id = $1 AND started_at >= $2 AND is_active = false
+    ORDER BY started_at DESC
+    LIMIT $3
+) recent
+"""
+
+_TOPIC_DAILY_JSON_SQL = """
+SELECT coalesce(json_agg(json_build_object(
+    'date', stat_date,
+    'questions_attempted', questions_attempted,
+    'accuracy_rate', round(accuracy_rate::numeric, 2),
+    'study_minutes', study_minutes,
+    'mastery_change', round(mastery_change::numeric, 2)
+) ORDER BY stat_date), '[]')
+FROM topic_daily_stats
+WHERE user_id = $1 AND topic_id = $2 AND stat_date >= $3 AND stat_date <= $4
+"""
+
+
+# Response keys, in the select-list order of the matching statements below;
+# rows are zipped straight onto them instead of building dicts per field
+_RADAR_KEYS = (
+    "topic_id", "topic_name", "mastery_score", "accuracy_rate",
+    "questions_attempted", "avg_response_time_seconds", "last_studied_at",
+)
+_TOPIC_MASTERY_KEYS = (
+    "topic_name", "mastery_score", "questions_attempted", "accuracy_rate",
+    "avg_response_time_seconds", "last_studied_at",
+)
+_DAILY_TOPIC_KEYS = (
+    "date", "questions_attempted", "accuracy_rate", "study_minutes",
+    "mastery_change",
+)
+
+
+def _rounded(column, digits: int):
+    """ROUND() in SQL, returned as a float (not Decimal) so rows need no fixup."""
+    return cast(func.round(cast(column, Numeric), digits), Float)
+
+
+# Every stat_date predicate is closed on both sides (start <= stat_date <=
+# today). daily_user_stats / topic_daily_stats are candidates for monthly
+# RANGE partitioning on stat_date; a two-sided range lets the planner prune
+# to the partitions a window actually covers, including future ones.
+#
+# Core statements for the non-asyncpg paths, built once at import so each
+# call only binds parameters instead of rebuilding the select() tree. Values
+# come back already rounded/stringified in the response shape.
+_RADAR_STMT = (
+    select(
+        cast(TopicMastery.topic_id, String).label("topic_id"),
+        Topic.name.label("topic_name"),
+        _rounded(TopicMastery.mastery_score, 2).label("mastery_score"),
+        _rounded(TopicMastery.retention_rate, 2).label("accuracy_rate"),
+        TopicMastery.questions_attempted,
+        _rounded(
+            func.nullif(TopicMastery.avg_response_time_seconds, 0), 1
+        ).label("avg_response_time_seconds"),
+        TopicMastery.last_studied_at
+    )
+    .join(Topic, TopicMastery.topic_id == Topic.id)
+    .where(
+        and_(
+            TopicMastery.user_id == bindparam("user_id"),
+            TopicMastery.questions_attempted >= bindparam("min_attempts")
+        )
+    )
+    .order_by(
+        TopicMastery.questions_attempted.desc(),  # Most practiced topics
+        TopicMastery.mastery_score.desc()  # Then by mastery
+    )
+    .limit(bindparam("limit"))
+)
+
+_RADAR_VIEW_STMT = (
+    select(
+        cast(topic_mastery_radar.c.topic_id, String).label("topic_id"),
+        topic_mastery_radar.c.topic_name,
+        _rounded(topic_mastery_radar.c.mastery_score, 2).label("mastery_score"),
+        _rounded(topic_mastery_radar.c.retention_rate, 2).label("accuracy_rate"),
+        topic_mastery_radar.c.questions_attempted,
+        _rounded(
+            func.nullif(topic_mastery_radar.c.avg_response_time_seconds, 0), 1
+        ).label("avg_response_time_seconds"),
+        # Postgres-only statement, so the ISO-8601 string is built with to_char
+        func.to_char(
+            func.timezone("UTC", topic_mastery_radar.c.last_studied_at),
+            'YYYY-MM-DD"T"HH24:MI:SS"Z"'
+        ).label("last_studied_at")
+    )
+    .where(
+        and_(
+            topic_mastery_radar.c.user_id == bindparam("user_id"),
+            topic_mastery_radar.c.questions_attempted >= bindparam("min_attempts")
+        )
+    )
+    .order_by(
+        topic_mastery_radar.c.questions_attempted.desc(),
+        topic_mastery_radar.c.mastery_score.desc()
+    )
+    .limit(bindparam("limit"))
+)
+
+# Rows from a refresh on an earlier day cover shifted windows, so they're skipped
+_WINDOW_VIEW_STMT = (
+    select(user_window_stats)
+    .where(
+        user_window_stats.c.user_id == bindparam("user_id"),
+        user_window_stats.c.as_of == bindparam("today"),
+    )
+)
+
+_SESSIONS_STMT = (
+    select(
+        StudySession.id,
+        StudySession.started_at,
+        StudySession.duration_seconds,
+        StudySession.questions_attempted,
+        StudySession.questions_correct,
+        StudySession.materials_viewed,
+        StudySession.xp_earned
+    )
+    .where(
+        and_(
+            StudySession.user_id == bindparam("user_id"),
+            StudySession.started_at >= bindparam("since"),
+            StudySession.is_active == False  # Only completed sessions
+        )
+    )
+    .order_by(StudySession.started_at.desc())
+    .limit(bindparam("limit"))
+)
+
+_TOPIC_MASTERY_STMT = (
+    select(
+        Topic.name.label("topic_name"),
+        _rounded(TopicMastery.mastery_score, 2).label("mastery_score"),
+        TopicMastery.questions_attempted,
+        _rounded(TopicMastery.retention_rate, 2).label("accuracy_rate"),
+        _rounded(
+            func.nullif(TopicMastery.avg_response_time_seconds, 0), 1
+        ).label("avg_response_time_seconds"),
+        TopicMastery.last_studied_at
+    )
+    .join(Topic, TopicMastery.topic_id == Topic.id)
+    .where(
+        and_(
+            TopicMastery.user_id == bindparam("user_id"),
+            TopicMastery.topic_id == bindparam("topic_id")
+        )
+    )
+)
+
+_DAILY_TOPIC_STMT = (
+    select(
+        cast(TopicDailyStats.stat_date, String).label("date"),
+        TopicDailyStats.questions_attempted,
+        _rounded(TopicDailyStats.accuracy_rate, 2).label("accuracy_rate"),
+        TopicDailyStats.study_minutes,
+        _rounded(TopicDailyStats.mastery_change, 2).label("mastery_change")
+    )
+    .where(
+        and_(
+            TopicDailyStats.user_id == bindparam("user_id"),
+            TopicDailyStats.topic_id == bindparam("topic_id"),
+            TopicDailyStats.stat_date >= bindparam("since"),
+            TopicDailyStats.stat_date <= bindparam("today")
+        )
+    )
+    .order_by(TopicDailyStats.stat_date.asc())
+)
+
+# One row per user: the TopicMastery sums plus the (single) UserLearningMetrics
+# row, so streak/level/XP ride along on the same round trip
+_OVERALL_STATS_STMT = (
+    select(
+        func.sum(TopicMastery.total_study_minutes).label("total_minutes"),
+        func.sum(TopicMastery.questions_attempted).label("total_questions"),
+        func.sum(TopicMastery.questions_correct).label("total_correct"),
+        func.sum(
+            case((TopicMastery.mastery_score >= 0.8, 1), else_=0)
+        ).label("topics_mastered"),
+        func.sum(
+            case(
+                (and_(
+                    TopicMastery.mastery_score >= 0.3,
+                    TopicMastery.mastery_score < 0.8
+                ), 1),
+                else_=0
+            )
+        ).label("topics_in_progress"),
+        func.max(UserLearningMetrics.current_streak_days).label("current_streak_days"),
+        func.max(UserLearningMetrics.current_level).label("level"),
+        func.max(UserLearningMetrics.xp_total).label("xp")
+    )
+    .select_from(TopicMastery)
+    .outerjoin(
+        UserLearningMetrics, TopicMastery.user_id == UserLearningMetrics.user_id
+    )
+    .where(TopicMastery.user_id == bindparam("user_id"))
+)
+
+
+@lru_cache(maxsize=32)
+def _window_stmt(windows: Tuple[int, ...], rollup: bool = False):
+    """Build (once per window set) the conditional-SUM window aggregate.
+
+    Window boundaries are bound as ``w{days}_start`` / ``w{days}_mid``
+    alongside ``user_id``, ``earliest_start`` and ``today``. Each window gets
+    its totals plus its first trend half; the second half is the total minus
+    the first.
+
+    With ``rollup``, the calendar months bound as ``months`` (see
+    _rollup_months) are read as one monthly_user_stats row each instead of
+    their daily rows. A month row is dated by its first day, which is exact
+    because no window boundary falls inside those months.
+    """
+    day_rows = (
+        select(
+            DailyUserStats.stat_date,
+            DailyUserStats.questions_attempted,
+            DailyUserStats.questions_correct,
+            DailyUserStats.total_study_minutes,
+            DailyUserStats.sessions_count,
+            literal(1).label("active_days")
+        )
+        .where(
+            and_(
+                DailyUserStats.user_id == bindparam("user_id"),
+                DailyUserStats.stat_date >= bindparam("earliest_start"),
+                DailyUserStats.stat_date <= bindparam("today")
+            )
+        )
+    )
+    if rollup:
+        months = bindparam("months", expanding=True)
+        month_rows = (
+            select(
+                monthly_user_stats.c.month_start.label("stat_date"),
+                monthly_user_stats.c.questions_attempted,
+                monthly_user_stats.c.questions_correct,
+                monthly_user_stats.c.total_study_minutes,
+                monthly_user_stats.c.sessions_count,
+                monthly_user_stats.c.active_days
+            )
+            .where(
+                and_(
+                    monthly_user_stats.c.user_id == bindparam("user_id"),
+                    monthly_user_stats.c.month_start.in_(months)
+                )
+            )
+        )
+        day_month = cast(func.date_trunc("month", DailyUserStats.stat_date), Date)
+        day_rows = day_rows.where(day_month.not_in(months))
+        source = union_all(day_rows, month_rows).subquery("window_source")
+    else:
+        source = day_rows.subquery("window_source")
+
+    columns = []
+    for window_days in windows:
+        in_window = source.c.stat_date >= bindparam(f"w{window_days}_start")
+        first_half = and_(
+            in_window, source.c.stat_date < bindparam(f"w{window_days}_mid")
+        )
+        columns.extend([
+            func.sum(case((in_window, source.c.questions_attempted))).label(f"w{window_days}_questions"),
+            func.sum(case((in_window, source.c.questions_correct))).label(f"w{window_days}_correct"),
+            func.sum(case((in_window, source.c.total_study_minutes))).label(f"w{window_days}_minutes"),
+            func.sum(case((in_window, source.c.sessions_count))).label(f"w{window_days}_sessions"),
+            func.sum(case((in_window, source.c.active_days))).label(f"w{window_days}_topics"),
+            func.sum(case((first_half, source.c.questions_attempted))).label(f"w{window_days}_first_attempts"),
+            func.sum(case((first_half, source.c.questions_correct))).label(f"w{window_days}_first_correct"),
+        ])
+
+    return select(*columns)
+
+
+def _rollup_months(
+    bounds: Dict[int, Tuple[datetime.date, datetime.date]],
+    today: datetime.date
+) -> List[datetime.date]:
+    """First days of the complete calendar months a window aggregate can read
+    from monthly_user_stats.
+
+    A month qualifies when it lies inside [earliest start, today) and no
+    window start or midpoint falls strictly inside it, so every
+    ``stat_date >= bound`` / ``< bound`` test gives the same answer for all of
+    its days.
+    """
+    cuts = {day for pair in bounds.values() for day in pair}
+    earliest_start = min(start for start, _ in bounds.values())
+
+    months = []
+    month = earliest_start.replace(day=1)
+    if month < earliest_start:
+        month = (month + datetime.timedelta(days=32)).replace(day=1)
+    while True:
+        next_month = (month + datetime.timedelta(days=32)).replace(day=1)
+        if next_month > today:
+            break
+        if not any(month < cut < next_month for cut in cuts):
+            months.append(month)
+        month = next_month
+    return months
+
+
+def _trend_from_halves(
+    first_attempts: Optional[int],
+    first_correct: Optional[int],
+    second_attempts: Optional[int],
+    second_correct: Optional[int],
+) -> str:
+    """Classify a performance trend from first-half vs second-half totals.
+
+    Returns:
+        "improving", "stable", or "declining"
+    """
+    # Insufficient data in either half
+    if not first_attempts or first_attempts < 5:
+        return "stable"
+    if not second_attempts or second_attempts < 5:
+        return "stable"
+
+    first_accuracy = (first_correct or 0) / first_attempts
+    second_accuracy = (second_correct or 0) / second_attempts
+
+    # Threshold: 5% change
+    change = second_accuracy - first_accuracy
+    if change > 0.05:
+        return "improving"
+    elif change < -0.05:
+        return "declining"
+    else:
+        return "stable"
+
 
 class AnalyticsService:
     """Service for dashboard analytics queries.
@@ -41,16 +474,185 @@ class AnalyticsService:
     All queries are optimized for < 500ms response time.
     """
 
-    def __init__(self, db: AsyncSession, cache=None):
+    def __init__(
+        self,
+        db: AsyncSession,
+        cache=None,
+        session_factory: Optional[async_sessionmaker] = None
+    ):
         """Initialize analytics service.
 
         Args:
             db: Async database session
-            cache: Optional Redis cache instance (from cache.py)
+            cache: Optional Redis cache instance (from cache.py); values are
+                stored msgpack-encoded
+            session_factory: Optional session factory (e.g. SessionLocal). When
+                provided, independent queries run concurrently on their own
+                short-lived sessions instead of sequentially on ``db``, and
+                stale cache entries are served while they are refreshed in
+                the background.
         """
         self.db = db
         self.cache = cache
+        self._session_factory = session_factory
         self._cache_ttl = 300  # 5 minutes
+        self._sparse_cache_ttl = 60  # Short TTL for empty/partial results
+        self._activity_marker_ttl = 86400  # 1 day
+        self._stale_ttl = 600  # How long past freshness an entry may be served
+        self._revalidate_lock_ttl = 30
+
+    async def _cache_get(self, cache_key: str):
+        """Read and decode a cached value; None on miss or cache failure."""
+        if not self.cache:
+            return None
+        try:
+            packed = await self.cache.get(cache_key)
+            if packed:
+                return msgpack.unpackb(packed, raw=False)
+        except Exception as e:
+            logger.warning(f"Cache read failed: {e}")
+        return None
+
+    async def _cache_set(self, cache_key: str, data, ttl: int) -> None:
+        """Encode and store a value; cache failures are logged, not raised."""
+        if not self.cache:
+            return
+        try:
+            await self.cache.set(
+                cache_key, msgpack.packb(data, use_bin_type=True), ttl=ttl
+            )
+        except Exception as e:
+            logger.warning(f"Cache write failed: {e}")
+
+    async def _cache_get_many(self, cache_keys: List[str]) -> List:
+        """Read and decode several values in one MGET; None for each miss."""
+        if not self.cache:
+            return [None] * len(cache_keys)
+        try:
+            packed_values = await self.cache.get_many(cache_keys)
+            return [
+                msgpack.unpackb(packed, raw=False) if packed else None
+                for packed in packed_values
+            ]
+        except Exception as e:
+            logger.warning(f"Cache read failed: {e}")
+        return [None] * len(cache_keys)
+
+    async def _cached(self, cache_key: str, build: _Build):
+        """Return the cached result for ``cache_key``, building it on a miss."""
+        cached = await self._fresh_or_stale(
+            cache_key, await self._cache_get(cache_key), build
+        )
+        if cached is not None:
+            logger.debug(f"Cache hit: {cache_key}")
+            return cached
+
+        data, ttl = await build(self)
+        await self._cache_store(cache_key, data, ttl)
+        return data
+
+    async def _fresh_or_stale(self, cache_key: str, entry, build: _Build):
+        """Unwrap a cache entry, stale-while-revalidate.
+
+        Fresh entries are returned as-is. Stale entries (past fresh_until but
+        not yet expired) are returned too, and ``build`` is scheduled in the
+        background. Without a session factory there is no session to refresh
+        on after the request ends, so a stale entry counts as a miss.
+        """
+        if entry is None:
+            return None
+        if time.time() >= entry["fresh_until"]:
+            if self._session_factory is None:
+                return None
+            await self._revalidate(cache_key, build)
+        return entry["data"]
+
+    def _cache_entry(self, data, ttl: int) -> Tuple[bytes, int]:
+        """Encode a result as fresh for ``ttl`` seconds, then stale for a while."""
+        entry = {"data": data, "fresh_until": time.time() + ttl}
+        return msgpack.packb(entry, use_bin_type=True), ttl + self._stale_ttl
+
+    async def _cache_store(self, cache_key: str, data, ttl: int) -> None:
+        """Cache one result; failures are logged, not raised."""
+        if not self.cache:
+            return
+        try:
+            packed, cache_ttl = self._cache_entry(data, ttl)
+            await self.cache.set(cache_key, packed, ttl=cache_ttl)
+        except Exception as e:
+            logger.warning(f"Cache write failed: {e}")
+
+    async def _cache_store_many(self, results: Dict[str, Tuple[object, int]]) -> None:
+        """Cache several (data, ttl) results in one pipelined round trip."""
+        if not self.cache or not results:
+            return
+        try:
+            await self.cache.set_many({
+                cache_key: self._cache_entry(data, ttl)
+                for cache_key, (data, ttl) in results.items()
+            })
+        except Exception as e:
+            logger.warning(f"Cache write failed: {e}")
+
+    async def _revalidate(self, cache_key: str, build: _Build) -> None:
+        """Refresh a stale entry in the background, once across workers.
+
+        A SET NX lock single-flights the refresh, which runs ``build`` on its
+        own session and re-caches the result. Locks live under their own
+        analytics_lock: prefix so invalidate_cache's analytics:*:{user_id.hex}:*
+        pattern can't unlink one while it is held.
+        """
+        lock_key = f"analytics_lock:{cache_key}"
+        if not await self.cache.acquire_lock(lock_key, ttl=self._revalidate_lock_ttl):
+            return
+
+        async def run() -> None:
+            try:
+                async with self._session_factory() as db:
+                    data, ttl = await build(AnalyticsService(db, cache=self.cache))
+                await self._cache_store(cache_key, data, ttl)
+            except Exception as e:
+                logger.warning(f"Background cache refresh failed for {cache_key}: {e}")
+            finally:
+                await self.cache.delete(lock_key)
+
+        task = asyncio.create_task(run())
+        _revalidation_tasks.add(task)
+        task.add_done_callback(_revalidation_tasks.discard)
+
+    async def _build_on_own_session(self, build: _Build) -> Tuple[object, int]:
+        """Run ``build`` on a fresh session from the factory (for gather)."""
+        async with self._session_factory() as db:
+            return await build(
+                AnalyticsService(db, self.cache, self._session_factory)
+            )
+
+    @asynccontextmanager
+    async def _session_scope(self) -> AsyncIterator[AsyncSession]:
+        """Yield a session for one independent query.
+
+        An AsyncSession cannot run two statements at once, so concurrent
+        queries each get their own session from the factory when available.
+        """
+        if self._session_factory is None:
+            yield self.db
+            return
+        async with self._session_factory() as session:
+            yield session
+
+    async def _fetch_json(self, db: AsyncSession, sql: str, *args) -> Optional[List]:
+        """Run a json_agg query directly on the asyncpg connection.
+
+        Postgres assembles the whole response list, so there is no
+        SQLAlchemy row construction or per-row dict building in Python.
+        Returns the decoded list, or None when the session is not backed by
+        asyncpg so the caller can fall back to its Core statement.
+        """
+        conn = await db.connection()
+        if conn.dialect.name != "postgresql" or conn.dialect.driver != "asyncpg":
+            return None
+        raw = await conn.get_raw_connection()
+        return json.loads(await raw.driver_connection.fetchval(sql, *args))
 
     async def get_question_mastery_radar(
         self,
@@ -65,7 +667,8 @@ class AnalyticsService:
 
         Args:
             user_id: User ID
-            limit: Number of topics to return (default 8 for radar chart)
+            limit: Number of topics to return (default 8 for radar chart,
+                clamped to 1-50)
             min_attempts: Minimum question attempts required (default 5)
 
         Returns:
@@ -80,84 +683,69 @@ class AnalyticsService:
                 "last_studied_at": "2025-01-15T10:30:00Z"
             }
 
-        Cache Key: analytics:radar:{user_id}:{limit}:{min_attempts}
-        TTL: 5 minutes
+        Cache Key: analytics:radar:{user_id.hex}:{hash(limit, min_attempts)}
+        TTL: 5 minutes (1 minute when fewer than 3 topics qualify), then
+            served stale for up to 10 minutes while it refreshes
         """
-        # Try cache first
-        cache_key = f"analytics:radar:{user_id}:{limit}:{min_attempts}"
-        if self.cache:
-            try:
-                cached = await self.cache.get(cache_key)
-                if cached:
-                    logger.debug(f"Cache hit for radar chart: {user_id}")
-                    return cached
-            except Exception as e:
-                logger.warning(f"Cache read failed: {e}")
+        limit = max(1, min(limit, _MAX_RADAR_TOPICS))
+        min_attempts = max(1, min(min_attempts, _MAX_MIN_ATTEMPTS))
 
-        # Query TopicMastery with Topic names
-        stmt = (
-            select(
-                TopicMastery.topic_id,
-                Topic.name.label("topic_name"),
-                TopicMastery.mastery_score,
-                TopicMastery.retention_rate.label("accuracy_rate"),
-                TopicMastery.questions_attempted,
-                TopicMastery.avg_response_time_seconds,
-                TopicMastery.last_studied_at
-            )
-            .join(Topic, TopicMastery.topic_id == Topic.id)
-            .where(
-                and_(
-                    TopicMastery.user_id == user_id,
-                    TopicMastery.questions_attempted >= min_attempts
-                )
-            )
-            .order_by(
-                TopicMastery.questions_attempted.desc(),  # Most practiced topics
-                TopicMastery.mastery_score.desc()  # Then by mastery
-            )
-            .limit(limit)
+        # An empty list is a valid cached result
+        return await self._cached(
+            _cache_key("radar", user_id, limit, min_attempts),
+            lambda service: service._build_radar(user_id, limit, min_attempts)
         )
 
-        result = await self.db.execute(stmt)
-        rows = result.all()
-
-        # Format response
-        radar_data = []
-        for row in rows:
-            radar_data.append({
-                "topic_id": str(row.topic_id),
-                "topic_name": row.topic_name,
-                "mastery_score": round(row.mastery_score, 2),
-                "accuracy_rate": round(row.accuracy_rate, 2),
-                "questions_attempted": row.questions_attempted,
-                "avg_response_time_seconds": (
-                    round(row.avg_response_time_seconds, 1)
-                    if row.avg_response_time_seconds else None
-                ),
-                "last_studied_at": (
-                    row.last_studied_at.isoformat()
-                    if row.last_studied_at else None
-                )
-            })
+    async def _build_radar(
+        self,
+        user_id: UUID,
+        limit: int,
+        min_attempts: int
+    ) -> Tuple[List[Dict], int]:
+        """Compute the radar chart; returns (radar_data, cache ttl)."""
+        # Query TopicMastery with Topic names, from the view while it's current
+        radar_sql = (
+            _RADAR_JSON_SQL if view_refresher.is_fresh() else _RADAR_LIVE_JSON_SQL
+        )
+        radar_data = await self._fetch_json(
+            self.db, radar_sql, user_id, min_attempts, limit
+        )
+        if radar_data is None:
+            radar_data = await self._query_radar_rows(user_id, limit, min_attempts)
 
-        # Handle insufficient data
+        # Handle insufficient data: cache briefly so new users don't re-query
         if len(radar_data) < 3:
             logger.info(
                 f"Insufficient radar data for user {user_id}: "
                 f"{len(radar_data)} topics with {min_attempts}+ attempts"
             )
-            # Return what we have with a flag
-            return radar_data
-
-        # Cache result
-        if self.cache:
-            try:
-                await self.cache.set(cache_key, radar_data, ttl=self._cache_ttl)
-            except Exception as e:
-                logger.warning(f"Cache write failed: {e}")
+            return radar_data, self._sparse_cache_ttl
 
         logger.info(f"Radar chart for user {user_id}: {len(radar_data)} topics")
+        return radar_data, self._cache_ttl
+
+    async def _query_radar_rows(
+        self,
+        user_id: UUID,
+        limit: int,
+        min_attempts: int
+    ) -> List[Dict]:
+        """Radar query through SQLAlchemy Core (non-asyncpg fallback).
+
+        Reads the topic_mastery_radar view on Postgres while the refresher
+        keeps it current; otherwise joins TopicMastery to Topic directly.
+        """
+        params = {"user_id": user_id, "min_attempts": min_attempts, "limit": limit}
+        conn = await self.db.connection()
+        if conn.dialect.name == "postgresql" and view_refresher.is_fresh():
+            result = await self.db.execute(_RADAR_VIEW_STMT, params)
+            return [dict(zip(_RADAR_KEYS, row)) for row in result]
+
+        result = await self.db.execute(_RADAR_STMT, params)
+        radar_data = [dict(zip(_RADAR_KEYS, row)) for row in result]
+        for topic in radar_data:
+            if topic["last_studied_at"]:
+                topic["last_studied_at"] = topic["last_studied_at"].isoformat()
         return radar_data
 
     async def get_performance_windows(
@@ -169,11 +757,12 @@ class AnalyticsService:
         """Get performance metrics over multiple time windows.
 
         Calculates accuracy, volume, and trends for 7-day, 30-day, 90-day windows.
-        Uses DailyUserStats for efficient aggregation.
+        Uses one conditional-aggregate query over DailyUserStats for all windows.
 
         Args:
             user_id: User ID
-            windows: List of day windows to calculate (default [7, 30, 90])
+            windows: List of day windows to calculate (default [7, 30, 90]);
+                at most 5 distinct windows of 1-365 days are used
             include_sessions: Include detailed session breakdown
 
         Returns:
@@ -193,170 +782,174 @@ class AnalyticsService:
                 "90d": {...}
             }
 
-        Cache Key: analytics:windows:{user_id}:{windows}:{include_sessions}
-        TTL: 5 minutes
+        Cache Key: analytics:windows:{user_id.hex}:{hash(sorted windows, include_sessions)}
+        TTL: 5 minutes, then served stale for up to 10 minutes while it refreshes
         """
-        # Try cache first
-        cache_key = f"analytics:windows:{user_id}:{','.join(map(str, windows))}:{include_sessions}"
-        if self.cache:
-            try:
-                cached = await self.cache.get(cache_key)
-                if cached:
-                    logger.debug(f"Cache hit for performance windows: {user_id}")
-                    return cached
-            except Exception as e:
-                logger.warning(f"Cache read failed: {e}")
+        # Drop duplicate and out-of-range windows, keeping the caller's order
+        windows = [
+            w for w in dict.fromkeys(windows) if 1 <= w <= _MAX_WINDOW_DAYS
+        ][:_MAX_WINDOWS]
+
+        if not windows:
+            return {}
+
+        # Window order doesn't change the result
+        return await self._cached(
+            _cache_key(
+                "windows", user_id, tuple(sorted(windows)), include_sessions
+            ),
+            lambda service: service._build_performance_windows(
+                user_id, windows, include_sessions
+            )
+        )
 
+    async def _build_performance_windows(
+        self,
+        user_id: UUID,
+        windows: List[int],
+        include_sessions: bool
+    ) -> Tuple[Dict[str, Dict], int]:
+        """Compute performance windows; returns (result, cache ttl)."""
         now = datetime.datetime.now(datetime.timezone.utc)
-        result = {}
-
-        for window_days in windows:
-            window_start = now - datetime.timedelta(days=window_days)
-            window_key = f"{window_days}d"
+        today = now.date()
+
+        # Window boundaries: start of window and midpoint used for the trend
+        # split, as whole UTC days so they match user_window_stats exactly
+        bounds = {
+            window_days: (
+                today - datetime.timedelta(days=window_days),
+                today - datetime.timedelta(days=window_days // 2),
+            )
+            for window_days in windows
+        }
 
-            # Query DailyUserStats for this window
-            stmt = (
-                select(
-                    func.sum(DailyUserStats.questions_attempted).label("total_questions"),
-                    func.sum(DailyUserStats.questions_correct).label("total_correct"),
-                    func.sum(DailyUserStats.total_study_minutes).label("total_minutes"),
-                    func.sum(DailyUserStats.sessions_count).label("total_sessions"),
-                    func.count(DailyUserStats.unique_topics_studied).label("unique_topics"),
-                    func.avg(DailyUserStats.accuracy_rate).label("avg_accuracy")
-                )
-                .where(
-                    and_(
-                        DailyUserStats.user_id == user_id,
-                        DailyUserStats.stat_date >= window_start.date()
-                    )
+        # Sessions for the widest window; narrower windows are a prefix of it
+        recent_sessions: List[Dict] = []
+        if include_sessions and self._session_factory is not None:
+            row, recent_sessions = await asyncio.gather(
+                self._fetch_window_row(user_id, bounds, today),
+                self._get_recent_sessions(
+                    user_id,
+                    now - datetime.timedelta(days=max(windows)),
+                    limit=20
                 )
             )
+        else:
+            row = await self._fetch_window_row(user_id, bounds, today)
+            if include_sessions:
+                recent_sessions = await self._get_recent_sessions(
+                    user_id,
+                    now - datetime.timedelta(days=max(windows)),
+                    limit=20
+                )
 
-            query_result = await self.db.execute(stmt)
-            row = query_result.first()
+        result = {}
+        for window_days in windows:
+            window_key = f"{window_days}d"
+            total_questions = row.get(f"w{window_days}_questions")
 
             # Handle no data
-            if not row or row.total_questions is None or row.total_questions == 0:
+            if not total_questions:
                 result[window_key] = self._empty_window_data()
                 continue
 
-            # Calculate accuracy
-            accuracy = (
-                row.total_correct / row.total_questions
-                if row.total_questions > 0 else 0.0
+            total_correct = row.get(f"w{window_days}_correct") or 0
+            # float() so a numeric SUM (Decimal) can't reach msgpack or the response
+            accuracy = float(total_correct) / float(total_questions)
+
+            # Trend: compare first half vs second half of window
+            first_attempts = row.get(f"w{window_days}_first_attempts") or 0
+            first_correct = row.get(f"w{window_days}_first_correct") or 0
+            trend = _trend_from_halves(
+                first_attempts,
+                first_correct,
+                total_questions - first_attempts,
+                total_correct - first_correct,
             )
 
-            # Calculate trend (compare first half vs second half of window)
-            trend = await self._calculate_trend(user_id, window_start, now)
-
             window_data = {
                 "accuracy_rate": round(accuracy, 2),
-                "questions_attempted": int(row.total_questions or 0),
-                "questions_correct": int(row.total_correct or 0),
-                "study_minutes": int(row.total_minutes or 0),
-                "sessions_count": int(row.total_sessions or 0),
-                "topics_studied": int(row.unique_topics or 0),
+                "questions_attempted": int(total_questions),
+                "questions_correct": int(total_correct),
+                "study_minutes": int(row.get(f"w{window_days}_minutes") or 0),
+                "sessions_count": int(row.get(f"w{window_days}_sessions") or 0),
+                "topics_studied": int(row.get(f"w{window_days}_topics") or 0),
                 "trend": trend
             }
 
             # Add session breakdown if requested
             if include_sessions:
-                sessions = await self._get_recent_sessions(
-                    user_id,
-                    window_start,
-                    limit=20
-                )
-                window_data["sessions"] = sessions
+                window_since = now - datetime.timedelta(days=window_days)
+                window_data["sessions"] = [
+                    session for session in recent_sessions
+                    if datetime.datetime.fromisoformat(session["started_at"]) >= window_since
+                ]
 
             result[window_key] = window_data
 
-        # Cache result
-        if self.cache:
-            try:
-                await self.cache.set(cache_key, result, ttl=self._cache_ttl)
-            except Exception as e:
-                logger.warning(f"Cache write failed: {e}")
-
         # Log summary
         window_summary = ', '.join([
             f"{w}d={result[f'{w}d']['questions_attempted']}q"
             for w in windows
         ])
         logger.info(f"Performance windows for user {user_id}: {window_summary}")
-        return result
+        return result, self._cache_ttl
 
-    async def _calculate_trend(
+    async def _fetch_window_row(
         self,
         user_id: UUID,
-        window_start: datetime.datetime,
-        window_end: datetime.datetime
-    ) -> str:
-        """Calculate performance trend over a window.
-
-        Compares first half vs second half accuracy.
+        bounds: Dict[int, Tuple[datetime.date, datetime.date]],
+        today: datetime.date
+    ) -> Dict:
+        """Get window totals, reading the coarsest rollup that answers exactly.
 
-        Args:
-            user_id: User ID
-            window_start: Start of window
-            window_end: End of window
+        7/30/90-day window sets come from the user_window_stats view when it
+        was refreshed today. Other windows, and a view still anchored to an
+        earlier day, run the conditional-SUM aggregate (one round trip for
+        every window plus its first trend half); on Postgres it reads whole
+        months from monthly_user_stats and only the edge months from daily rows.
+        Neither view is read unless the refresher is keeping them current.
 
-        Returns:
-            "improving", "stable", or "declining"
+        Returns a flat mapping keyed like the live aggregate
+        (``w{days}_questions``, ``w{days}_first_attempts``, ...).
         """
-        # Split window in half
-        window_midpoint = window_start + (window_end - window_start) / 2
-
-        # First half accuracy
-        stmt_first = (
-            select(
-                func.sum(DailyUserStats.questions_attempted).label("attempts"),
-                func.sum(DailyUserStats.questions_correct).label("correct")
+        async with self._session_scope() as db:
+            conn = await db.connection()
+            use_views = (
+                conn.dialect.name == "postgresql" and view_refresher.is_fresh()
             )
-            .where(
-                and_(
-                    DailyUserStats.user_id == user_id,
-                    DailyUserStats.stat_date >= window_start.date(),
-                    DailyUserStats.stat_date < window_midpoint.date()
+            if use_views and set(bounds) <= _MATERIALIZED_WINDOWS:
+                result = await db.execute(
+                    _WINDOW_VIEW_STMT, {"user_id": user_id, "today": today}
                 )
-            )
-        )
-        result_first = await self.db.execute(stmt_first)
-        first_half = result_first.first()
+                view_rows = result.mappings().all()
+                # No rows means no activity or a stale view; the live
+                # aggregate answers both (and is cheap for the former)
+                if view_rows:
+                    return {
+                        f"w{view_row['window_days']}_{column}": view_row[column]
+                        for view_row in view_rows
+                        for column in _WINDOW_VIEW_COLUMNS
+                    }
+
+            params = {
+                "user_id": user_id,
+                "earliest_start": min(start for start, _ in bounds.values()),
+                "today": today
+            }
+            for window_days, (window_start, midpoint) in bounds.items():
+                params[f"w{window_days}_start"] = window_start
+                params[f"w{window_days}_mid"] = midpoint
 
-        # Second half accuracy
-        stmt_second = (
-            select(
-                func.sum(DailyUserStats.questions_attempted).label("attempts"),
-                func.sum(DailyUserStats.questions_correct).label("correct")
-            )
-            .where(
-                and_(
-                    DailyUserStats.user_id == user_id,
-                    DailyUserStats.stat_date >= window_midpoint.date(),
-                    DailyUserStats.stat_date <= window_end.date()
-                )
+            months = _rollup_months(bounds, today) if use_views else []
+            if months:
+                params["months"] = months
+
+            # Shared by every call with the same window set (see _window_stmt)
+            result = await db.execute(
+                _window_stmt(tuple(bounds), rollup=bool(months)), params
             )
-        )
-        result_second = await self.db.execute(stmt_second)
-        second_half = result_second.first()
-
-        # Calculate accuracies
-        if not first_half or not first_half.attempts or first_half.attempts < 5:
-            return "stable"  # Insufficient data for first half
-        if not second_half or not second_half.attempts or second_half.attempts < 5:
-            return "stable"  # Insufficient data for second half
-
-        first_accuracy = first_half.correct / first_half.attempts
-        second_accuracy = second_half.correct / second_half.attempts
-
-        # Threshold: 5% change
-        change = second_accuracy - first_accuracy
-        if change > 0.05:
-            return "improving"
-        elif change < -0.05:
-            return "declining"
-        else:
-            return "stable"
+            return dict(result.mappings().first() or {})
 
     async def _get_recent_sessions(
         self,
@@ -374,48 +967,45 @@ class AnalyticsService:
         Returns:
             List of session dicts with basic metrics
         """
-        stmt = (
-            select(
-                StudySession.id,
-                StudySession.started_at,
-                StudySession.duration_seconds,
-                StudySession.questions_attempted,
-                StudySession.questions_correct,
-                StudySession.materials_viewed,
-                StudySession.xp_earned
-            )
-            .where(
-                and_(
-                    StudySession.user_id == user_id,
-                    StudySession.started_at >= since,
-                    StudySession.is_active == False  # Only completed sessions
-                )
+        async with self._session_scope() as db:
+            sessions = await self._fetch_json(
+                db, _SESSIONS_JSON_SQL, user_id, since, limit
             )
-            .order_by(StudySession.started_at.desc())
-            .limit(limit)
-        )
-
-        result = await self.db.execute(stmt)
-        rows = result.all()
+            if sessions is not None:
+                return sessions
+            rows = await self._query_session_rows(db, user_id, since, limit)
 
         sessions = []
         for row in rows:
             accuracy = (
-                row.questions_correct / row.questions_attempted
-                if row.questions_attempted > 0 else None
+                row["questions_correct"] / row["questions_attempted"]
+                if row["questions_attempted"] > 0 else None
             )
             sessions.append({
-                "session_id": str(row.id),
-                "started_at": row.started_at.isoformat(),
-                "duration_minutes": round(row.duration_seconds / 60, 1),
-                "questions_attempted": row.questions_attempted,
+                "session_id": str(row["id"]),
+                "started_at": row["started_at"].isoformat(),
+                "duration_minutes": round(row["duration_seconds"] / 60, 1),
+                "questions_attempted": row["questions_attempted"],
                 "accuracy_rate": round(accuracy, 2) if accuracy is not None else None,
-                "materials_viewed": row.materials_viewed,
-                "xp_earned": row.xp_earned
+                "materials_viewed": row["materials_viewed"],
+                "xp_earned": row["xp_earned"]
             })
 
         return sessions
 
+    async def _query_session_rows(
+        self,
+        db: AsyncSession,
+        user_id: UUID,
+        since: datetime.datetime,
+        limit: int
+    ) -> List:
+        """Recent-sessions query through SQLAlchemy Core (non-asyncpg fallback)."""
+        result = await db.execute(
+            _SESSIONS_STMT, {"user_id": user_id, "since": since, "limit": limit}
+        )
+        return result.mappings().all()
+
     def _empty_window_data(self) -> Dict:
         """Return empty window data structure for no-data case."""
         return {
@@ -442,7 +1032,7 @@ class AnalyticsService:
         Args:
             user_id: User ID
             topic_id: Topic ID
-            days: Number of days to analyze
+            days: Number of days to analyze (clamped to 1-365)
 
         Returns:
             Dict with detailed topic performance:
@@ -466,23 +1056,12 @@ class AnalyticsService:
             }
         """
         # Get topic info and current mastery
-        stmt_mastery = (
-            select(
-                TopicMastery,
-                Topic.name.label("topic_name")
-            )
-            .join(Topic, TopicMastery.topic_id == Topic.id)
-            .where(
-                and_(
-                    TopicMastery.user_id == user_id,
-                    TopicMastery.topic_id == topic_id
-                )
-            )
+        result = await self.db.execute(
+            _TOPIC_MASTERY_STMT, {"user_id": user_id, "topic_id": topic_id}
         )
-        result = await self.db.execute(stmt_mastery)
-        mastery_row = result.first()
+        row = result.first()
 
-        if not mastery_row:
+        if row is None:
             # No data for this topic
             return {
                 "topic_id": str(topic_id),
@@ -493,53 +1072,42 @@ class AnalyticsService:
                 "daily_stats": []
             }
 
-        mastery = mastery_row[0]
-        topic_name = mastery_row.topic_name
-
         # Get daily stats for this topic
-        window_start = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=days)
+        days = max(1, min(days, _MAX_WINDOW_DAYS))
+        today = datetime.datetime.now(datetime.timezone.utc).date()
+        window_start = today - datetime.timedelta(days=days)
 
-        stmt_daily = (
-            select(TopicDailyStats)
-            .where(
-                and_(
-                    TopicDailyStats.user_id == user_id,
-                    TopicDailyStats.topic_id == topic_id,
-                    TopicDailyStats.stat_date >= window_start.date()
-                )
-            )
-            .order_by(TopicDailyStats.stat_date.asc())
+        daily_stats = await self._fetch_json(
+            self.db, _TOPIC_DAILY_JSON_SQL, user_id, topic_id, window_start, today
         )
+        if daily_stats is None:
+            daily_stats = await self._query_topic_daily_stats(
+                user_id, topic_id, window_start, today
+            )
 
-        result_daily = await self.db.execute(stmt_daily)
-        daily_rows = result_daily.scalars().all()
-
-        daily_stats = []
-        for day in daily_rows:
-            daily_stats.append({
-                "date": day.stat_date.isoformat(),
-                "questions_attempted": day.questions_attempted,
-                "accuracy_rate": round(day.accuracy_rate, 2),
-                "study_minutes": day.study_minutes,
-                "mastery_change": round(day.mastery_change, 2)
-            })
+        detail = {"topic_id": str(topic_id)}
+        detail.update(zip(_TOPIC_MASTERY_KEYS, row))
+        if detail["last_studied_at"]:
+            detail["last_studied_at"] = detail["last_studied_at"].isoformat()
+        detail["daily_stats"] = daily_stats
+        return detail
 
-        return {
-            "topic_id": str(topic_id),
-            "topic_name": topic_name,
-            "mastery_score": round(mastery.mastery_score, 2),
-            "questions_attempted": mastery.questions_attempted,
-            "accuracy_rate": round(mastery.retention_rate, 2),
-            "avg_response_time_seconds": (
-                round(mastery.avg_response_time_seconds, 1)
-                if mastery.avg_response_time_seconds else None
-            ),
-            "last_studied_at": (
-                mastery.last_studied_at.isoformat()
-                if mastery.last_studied_at else None
-            ),
-            "daily_stats": daily_stats
-        }
+    async def _query_topic_daily_stats(
+        self,
+        user_id: UUID,
+        topic_id: UUID,
+        since: datetime.date,
+        today: datetime.date
+    ) -> List[Dict]:
+        """Topic daily-stats query through SQLAlchemy Core (non-asyncpg fallback)."""
+        result_daily = await self.db.execute(
+            _DAILY_TOPIC_STMT,
+            {
+                "user_id": user_id, "topic_id": topic_id,
+                "since": since, "today": today
+            }
+        )
+        return [dict(zip(_DAILY_TOPIC_KEYS, day)) for day in result_daily]
 
     async def get_overall_stats(self, user_id: UUID) -> Dict:
         """Get high-level overview statistics for dashboard header.
@@ -561,30 +1129,19 @@ class AnalyticsService:
                 "level": 15,
                 "xp": 12500
             }
+
+        Cache Key: analytics:overall:{user_id.hex}:{hash()}
+        TTL: 5 minutes, then served stale for up to 10 minutes while it refreshes
         """
-        # Get from TopicMastery aggregates
-        stmt = (
-            select(
-                func.sum(TopicMastery.total_study_minutes).label("total_minutes"),
-                func.sum(TopicMastery.questions_attempted).label("total_questions"),
-                func.sum(TopicMastery.questions_correct).label("total_correct"),
-                func.sum(
-                    case((TopicMastery.mastery_score >= 0.8, 1), else_=0)
-                ).label("topics_mastered"),
-                func.sum(
-                    case(
-                        (and_(
-                            TopicMastery.mastery_score >= 0.3,
-                            TopicMastery.mastery_score < 0.8
-                        ), 1),
-                        else_=0
-                    )
-                ).label("topics_in_progress")
-            )
-            .where(TopicMastery.user_id == user_id)
+        return await self._cached(
+            _cache_key("overall", user_id),
+            lambda service: service._build_overall_stats(user_id)
         )
 
-        result = await self.db.execute(stmt)
+    async def _build_overall_stats(self, user_id: UUID) -> Tuple[Dict, int]:
+        """Compute the dashboard header stats; returns (stats, cache ttl)."""
+        # TopicMastery aggregates plus streak/XP from UserLearningMetrics
+        result = await self.db.execute(_OVERALL_STATS_STMT, {"user_id": user_id})
         row = result.first()
 
         # Calculate overall accuracy
@@ -592,39 +1149,130 @@ class AnalyticsService:
         if row and row.total_questions and row.total_questions > 0:
             overall_accuracy = row.total_correct / row.total_questions
 
-        # Get recent stats for streak (would come from UserLearningMetrics in full impl)
-        # For now, return basic data
-        return {
+        stats = {
             "total_study_minutes": int(row.total_minutes or 0) if row else 0,
             "total_questions": int(row.total_questions or 0) if row else 0,
             "overall_accuracy": round(overall_accuracy, 2),
-            "current_streak_days": 0,  # TODO: Implement with UserLearningMetrics
+            "current_streak_days": int(row.current_streak_days or 0) if row else 0,
             "topics_mastered": int(row.topics_mastered or 0) if row else 0,
             "topics_in_progress": int(row.topics_in_progress or 0) if row else 0,
-            "level": 1,  # TODO: Implement with gamification
-            "xp": 0  # TODO: Implement with gamification
+            "level": int(row.level or 1) if row else 1,
+            "xp": int(row.xp or 0) if row else 0
+        }
+        return stats, self._cache_ttl
+
+    async def get_dashboard(self, user_id: UUID) -> Dict:
+        """Get the radar, performance windows and overall stats together.
+
+        The dashboard loads all three at once, so their cache entries are read
+        with a single MGET. Only the misses are computed (concurrently when a
+        session factory is available) and they are written back in one
+        pipeline. Uses the same keys, and default arguments, as the
+        individual methods.
+
+        Args:
+            user_id: User ID
+
+        Returns:
+            {"radar": [...], "windows": {...}, "overall": {...}}
+        """
+        windows = [7, 30, 90]
+        parts: Dict[str, Tuple[str, _Build]] = {
+            "radar": (
+                _cache_key("radar", user_id, 8, 5),
+                lambda service: service._build_radar(user_id, 8, 5)
+            ),
+            "windows": (
+                _cache_key("windows", user_id, tuple(windows), True),
+                lambda service: service._build_performance_windows(
+                    user_id, windows, True
+                )
+            ),
+            "overall": (
+                _cache_key("overall", user_id),
+                lambda service: service._build_overall_stats(user_id)
+            ),
         }
 
-    async def invalidate_cache(self, user_id: UUID) -> None:
+        dashboard: Dict = {}
+        missing: Dict[str, Tuple[str, _Build]] = {}
+        entries = await self._cache_get_many([key for key, _ in parts.values()])
+        for (name, (cache_key, build)), entry in zip(parts.items(), entries):
+            data = await self._fresh_or_stale(cache_key, entry, build)
+            if data is None:
+                missing[name] = (cache_key, build)
+            else:
+                dashboard[name] = data
+
+        if not missing:
+            return dashboard
+
+        builds = [build for _, build in missing.values()]
+        if self._session_factory is not None:
+            built = await asyncio.gather(
+                *(self._build_on_own_session(build) for build in builds)
+            )
+        else:
+            built = [await build(self) for build in builds]
+
+        for name, result in zip(missing, built):
+            dashboard[name] = result[0]
+        await self._cache_store_many({
+            cache_key: result
+            for (cache_key, _), result in zip(missing.values(), built)
+        })
+        return dashboard
+
+    async def invalidate_cache(
+        self,
+        user_id: UUID,
+        last_activity_at: Optional[datetime.datetime] = None
+    ) -> None:
         """Invalidate all cached analytics for a user.
 
         Call this after study sessions or when real-time updates are needed.
 
         Args:
             user_id: User ID to invalidate cache for
+            last_activity_at: Timestamp of the activity that triggered this call.
+                When given, invalidation is skipped if nothing newer than the
+                last invalidation has happened.
         """
-        if not self.cache:
+        if last_activity_at is not None and not await self._activity_changed(
+            user_id, last_activity_at
+        ):
+            logger.debug(f"Analytics cache already current for user {user_id}")
             return
 
-        # Delete all analytics cache keys for this user
-        patterns = [
-            f"analytics:radar:{user_id}:*",
-            f"analytics:windows:{user_id}:*"
-        ]
+        # The views cover every user, so refreshing them here would cost a
+        # full rebuild per activity; the app's refresher batches them instead
+        view_refresher.mark_dirty(user_id, self.cache)
 
+        if not self.cache:
+            return
+
+        # Delete all analytics cache keys for this user in one SCAN/UNLINK pass
         try:
-            for pattern in patterns:
-                await self.cache.delete_pattern(pattern)
+            await self.cache.unlink_pattern(f"analytics:*:{_uuid_str(user_id)}:*")
             logger.info(f"Invalidated analytics cache for user {user_id}")
         except Exception as e:
             logger.warning(f"Cache invalidation failed: {e}")
+
+    async def _activity_changed(
+        self,
+        user_id: UUID,
+        last_activity_at: datetime.datetime
+    ) -> bool:
+        """Record the latest activity timestamp; False if it was already seen.
+
+        The marker key (analytics:activity:{user_id.hex}) has no trailing
+        segment, so invalidate_cache's analytics:*:{user_id.hex}:* pattern
+        leaves it intact.
+        """
+        marker_key = f"analytics:activity:{_uuid_str(user_id)}"
+        stamp = last_activity_at.timestamp()
+        seen = await self._cache_get(marker_key)
+        if seen is not None and seen >= stamp:
+            return False
+        await self._cache_set(marker_key, stamp, ttl=self._activity_marker_ttl)
+        return True
@@ -6,15 +6,22 @@ and performance tracking.
 
 from __future__ import annotations
 
-import hashlib
-import json
+import asyncio
+import base64
+import io
 import logging
+import math
 import pickle
-import zlib
+import struct
+import time
 from datetime import timedelta
-from typing import Any, Callable, Optional, TypeVar, Union
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar, Union
+from uuid import UUID
 
+import orjson
 import redis.asyncio as redis
+import xxhash
+import zstandard
 from pydantic import BaseModel
 
 from app.config import settings
@@ -23,6 +30,134 @@ logger = logging.getLogger(__name__)
 
 T = TypeVar("T")
 
+# Two-byte header on every stored value: payload format, then compression.
+_FORMAT_JSON = b"J"
+_FORMAT_PICKLE = b"P"
+_FORMAT_RAW = b"R"
+_FORMAT_STR = b"S"
+_CODEC_NONE = b"0"
+_CODEC_ZSTD = b"Z"
+
+# Exact types orjson round-trips unchanged; containers of only these go to
+# orjson, anything else (UUID, Enum, tuple, datetime, ...) to pickle
+_JSON_SCALAR_TYPES = frozenset({str, bool, type(None)})
+
+# Compression contexts are reused across calls instead of rebuilt per value.
+_ZSTD_COMPRESSOR = zstandard.ZstdCompressor(level=3)
+_ZSTD_DECOMPRESSOR = zstandard.ZstdDecompressor()
+
+# Payloads at least this large are compressed straight into the output buffer
+_STREAM_COMPRESS_MIN = 64 * 1024
+
+# How long get_metrics reuses the last INFO memory reading
+_MEMORY_INFO_TTL_SECONDS = 5.0
+
+# Payloads larger than the sample get a trial compression of their first
+# bytes; if that barely shrinks (high-entropy data such as packed float
+# arrays or already-compressed blobs) the value is stored uncompressed.
+_ENTROPY_SAMPLE_SIZE = 4096
+_INCOMPRESSIBLE_RATIO = 0.9
+_ZSTD_PROBE = zstandard.ZstdCompressor(
+    level=1, write_content_size=False, write_checksum=False
+)
+
+
+def _is_plain_json(value: Any) -> bool:
+    """Whether orjson would load value back as an equal value of the same types."""
+    value_type = type(value)
+    if value_type in _JSON_SCALAR_TYPES:
+        return True
+    if value_type is int:
+        # orjson rejects ints past 64 bits
+        return -(2**63) <= value < 2**64
+    if value_type is float:
+        # orjson writes NaN and infinities as null
+        return math.isfinite(value)
+    if value_type is list:
+        return all(map(_is_plain_json, value))
+    if value_type is dict:
+        return all(type(key) is str for key in value) and all(
+            map(_is_plain_json, value.values())
+        )
+    return False
+
+
+def _looks_incompressible(payload: bytes) -> bool:
+    """Trial-compress a leading sample and report whether it barely shrank."""
+    if len(payload) <= _ENTROPY_SAMPLE_SIZE:
+        return False
+    sample = memoryview(payload)[:_ENTROPY_SAMPLE_SIZE]
+    probe = _ZSTD_PROBE.compress(sample)
+    return len(probe) > _ENTROPY_SAMPLE_SIZE * _INCOMPRESSIBLE_RATIO
+
+_PACK_INT = struct.Struct("<q").pack
+_PACK_FLOAT = struct.Struct("<d").pack
+_PACK_LEN = struct.Struct("<I").pack
+_INT64_MIN, _INT64_MAX = -(2**63), 2**63 - 1
+
+
+def _hash_key_part(h: xxhash.xxh3_64, value: Any) -> None:
+    """Feed one key argument into a running hash.
+
+    Every value starts with a type tag and variable-length data is length
+    prefixed, so ("ab", "c") and ("a", "bc") - or 1 and "1" - never collide.
+    Anything unrecognised hashes as str(value), like the old json default.
+    """
+    if value is None:
+        h.update(b"N")
+    elif value is True:
+        h.update(b"T")
+    elif value is False:
+        h.update(b"F")
+    elif type(value) is int and _INT64_MIN <= value <= _INT64_MAX:
+        h.update(b"i")
+        h.update(_PACK_INT(value))
+    elif type(value) is float:
+        h.update(b"f")
+        h.update(_PACK_FLOAT(value))
+    elif isinstance(value, UUID):
+        h.update(b"u")
+        h.update(value.bytes)
+    elif isinstance(value, (list, tuple)):
+        h.update(b"[")
+        for item in value:
+            _hash_key_part(h, item)
+        h.update(b"]")
+    elif isinstance(value, dict):
+        h.update(b"{")
+        for key in sorted(value, key=str):
+            _hash_key_part(h, key)
+            _hash_key_part(h, value[key])
+        h.update(b"}")
+    else:
+        if isinstance(value, bytes):
+            h.update(b"b")
+            data = value
+        else:
+            h.update(b"s")
+            data = (value if isinstance(value, str) else str(value)).encode()
+        h.update(_PACK_LEN(len(data)))
+        h.update(data)
+
+
+def _call_key(
+    prefix: str, seeded: xxhash.xxh3_64, args: tuple, kwargs: Dict[str, Any]
+) -> str:
+    """Hash call arguments onto a copy of a namespace-seeded hasher.
+
+    The namespace prefix and seed are built once by the caller (per `cached`
+    decorator), so each call only hashes its own arguments.
+    """
+    # Hash the arguments structurally instead of via an intermediate JSON string
+    h = seeded.copy()
+    _hash_key_part(h, args)
+    h.update(b"\x00")
+    for name in sorted(kwargs):
+        _hash_key_part(h, name)
+        _hash_key_part(h, kwargs[name])
+    # 8 raw digest bytes as unpadded base64url: 11 chars instead of 16 hex
+    return prefix + base64.urlsafe_b64encode(h.digest())[:11].decode()
+
 
 class CacheMetrics(BaseModel):
     """Cache performance metrics."""
@@ -33,6 +168,9 @@ class CacheMetrics(BaseModel):
     avg_hit_time_ms: float = 0
     avg_miss_time_ms: float = 0
     memory_used_mb: float = 0
+    keyspace_hits: int = 0
+    keyspace_misses: int = 0
+    key_count: int = 0
 
 
 class CacheService:
@@ -44,7 +182,7 @@ class CacheService:
         port: int = settings.REDIS_PORT,
         db: int = settings.REDIS_DB,
         password: Optional[str] = settings.REDIS_PASSWORD,
-        max_connections: int = 50,
+        max_connections: int = settings.REDIS_POOL_SIZE,
         decode_responses: bool = False,
     ):
         """Initialize cache service with connection pooling.
@@ -64,9 +202,33 @@ class CacheService:
             password=password,
             max_connections=max_connections,
             decode_responses=decode_responses,
+            socket_keepalive=True,
+            # PING connections idle this long before reuse, so a dropped
+            # socket is replaced up front instead of failing a cache call
+            health_check_interval=30,
         )
-        self.client: Optional[redis.Redis] = None
+        self.client = None
         self._metrics = CacheMetrics()
+        self._memory_checked_at = float("-inf")
+        # Cache misses currently being computed by `cached`, keyed by cache key
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    @property
+    def client(self) -> Optional[redis.Redis]:
+        """Connected Redis client, or None while disconnected."""
+        return self._client
+
+    @client.setter
+    def client(self, client: Optional[redis.Redis]) -> None:
+        self._client = client
+        # Bound methods for the get/set hot path, rebound whenever the client
+        # changes so those calls skip the attribute chain and the None check
+        if client is None:
+            self._get = self._set = self._setex = None
+        else:
+            self._get = client.get
+            self._set = client.set
+            self._setex = client.setex
 
     async def connect(self) -> None:
         """Establish Redis connection."""
@@ -99,56 +261,67 @@ class CacheService:
         Returns:
             Unique cache key
         """
-        # Create a stable hash from arguments
-        key_data = {
-            "namespace": namespace,
-            "args": args,
-            "kwargs": sorted(kwargs.items()),
-        }
-        key_str = json.dumps(key_data, sort_keys=True, default=str)
-        key_hash = hashlib.sha256(key_str.encode()).hexdigest()[:16]
-        return f"{namespace}:{key_hash}"
-
-    async def get(
-        self,
-        key: str,
-        decompress: bool = True,
-    ) -> Optional[Any]:
+        seeded = xxhash.xxh3_64(namespace.encode())
+        return _call_key(namespace + ":", seeded, args, kwargs)
+
+    async def get(self, key: str) -> Optional[Any]:
         """Get value from cache with automatic decompression.
 
         Args:
             key: Cache key
-            decompress: Whether to decompress value
 
         Returns:
             Cached value or None if not found
         """
-        if not self.client:
+        get = self._get
+        if get is None:
             return None
 
         try:
-            value = await self.client.get(key)
+            value = await get(key)
             if value is None:
                 self._metrics.misses += 1
                 return None
 
             self._metrics.hits += 1
-
-            # Decompress if needed
-            if decompress and isinstance(value, bytes):
-                try:
-                    value = zlib.decompress(value)
-                except zlib.error:
-                    # Value wasn't compressed
-                    pass
-
-            # Deserialize
-            return pickle.loads(value) if isinstance(value, bytes) else value
+            return self._deserialize(value)
 
         except Exception as e:
             logger.error(f"Cache get error for key {key}: {e}")
             return None
 
+    async def get_many(self, keys: List[str]) -> List[Optional[Any]]:
+        """Get several values in one round trip (MGET).
+
+        Args:
+            keys: Cache keys
+
+        Returns:
+            Values in key order, None for each miss
+        """
+        if not self.client or not keys:
+            return [None] * len(keys)
+
+        try:
+            values = await self.client.mget(keys)
+        except Exception as e:
+            logger.error(f"Cache get_many error: {e}")
+            return [None] * len(keys)
+
+        results: List[Optional[Any]] = []
+        for key, value in zip(keys, values):
+            if value is None:
+                self._metrics.misses += 1
+                results.append(None)
+                continue
+            self._metrics.hits += 1
+            try:
+                results.append(self._deserialize(value))
+            except Exception as e:
+                logger.error(f"Cache get error for key {key}: {e}")
+                results.append(None)
+        return results
+
     async def set(
         self,
         key: str,
@@ -161,7 +334,8 @@ class CacheService:
 
         Args:
             key: Cache key
-            value: Value to cache
+            value: Value to cache; it is read back with the same types
+                (plain JSON via orjson, anything else pickled)
             ttl: Time to live in seconds
             compress: Whether to compress value
             compress_threshold: Minimum size in bytes to trigger compression
@@ -169,22 +343,17 @@ class CacheService:
         Returns:
             Success status
         """
-        if not self.client:
+        if self._set is None:
             return False
 
         try:
-            # Serialize
-            serialized = pickle.dumps(value)
-
-            # Compress if over threshold
-            if compress and len(serialized) > compress_threshold:
-                serialized = zlib.compress(serialized, level=6)
+            serialized = self._serialize(value, compress, compress_threshold)
 
             # Set with optional TTL
             if ttl:
-                await self.client.setex(key, ttl, serialized)
+                await self._setex(key, ttl, serialized)
             else:
-                await self.client.set(key, serialized)
+                await self._set(key, serialized)
 
             return True
 
@@ -192,6 +361,112 @@ class CacheService:
             logger.error(f"Cache set error for key {key}: {e}")
             return False
 
+    async def set_many(
+        self,
+        items: Dict[str, Tuple[Any, Optional[int]]],
+        compress: bool = True,
+        compress_threshold: int = 1024,
+    ) -> bool:
+        """Set several values in one pipelined round trip.
+
+        Args:
+            items: Mapping of cache key to (value, ttl); ttl may be None
+            compress: Whether to compress values
+            compress_threshold: Minimum size in bytes to trigger compression
+
+        Returns:
+            Success status
+        """
+        if not self.client or not items:
+            return False
+
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                for key, (value, ttl) in items.items():
+                    serialized = self._serialize(value, compress, compress_threshold)
+                    if ttl:
+                        pipe.setex(key, ttl, serialized)
+                    else:
+                        pipe.set(key, serialized)
+                await pipe.execute()
+            return True
+
+        except Exception as e:
+            logger.error(f"Cache set_many error: {e}")
+            return False
+
+    @staticmethod
+    def _serialize(
+        value: Any, compress: bool, compress_threshold: int
+    ) -> Union[bytes, memoryview]:
+        """Encode as orjson (pickle if not plain JSON), zstd over the threshold.
+
+        bytes and str are already serialized and are stored as-is (str as
+        UTF-8). orjson only gets dicts, lists and scalars it loads back as the
+        same types; everything else, subclasses included, is pickled, so a
+        cached value always comes back as it went in.
+        """
+        value_type = type(value)
+        if value_type is bytes:
+            payload = value
+            fmt = _FORMAT_RAW
+        elif value_type is str:
+            payload = value.encode()
+            fmt = _FORMAT_STR
+        elif _is_plain_json(value):
+            payload = orjson.dumps(value)
+            fmt = _FORMAT_JSON
+        else:
+            payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            fmt = _FORMAT_PICKLE
+
+        # Compress if over threshold, unless the payload is high-entropy
+        if (
+            compress
+            and len(payload) > compress_threshold
+            and not _looks_incompressible(payload)
+        ):
+            header = fmt + _CODEC_ZSTD
+            if len(payload) < _STREAM_COMPRESS_MIN:
+                compressed = _ZSTD_COMPRESSOR.compress(payload)
+                if len(compressed) < len(payload):
+                    return header + compressed
+                return fmt + _CODEC_NONE + payload
+
+            # Large values: write the frame after the header in one buffer and
+            # hand redis-py a view of it, rather than copying the output again
+            out = io.BytesIO()
+            out.write(header)
+            with _ZSTD_COMPRESSOR.stream_writer(
+                out, size=len(payload), closefd=False
+            ) as writer:
+                writer.write(payload)
+            return out.getbuffer()
+        return fmt + _CODEC_NONE + payload
+
+    @staticmethod
+    def _deserialize(value: Any) -> Any:
+        """Reverse _serialize by dispatching on the two-byte header."""
+        if not isinstance(value, bytes):
+            return value
+
+        # A view skips copying the payload out from behind the header
+        fmt, codec, payload = value[:1], value[1:2], memoryview(value)[2:]
+        if codec == _CODEC_ZSTD:
+            payload = _ZSTD_DECOMPRESSOR.decompress(payload)
+        elif codec != _CODEC_NONE:
+            raise ValueError(f"Unknown cache value header {value[:2]!r}")
+
+        if fmt == _FORMAT_JSON:
+            return orjson.loads(payload)
+        if fmt == _FORMAT_RAW:
+            return bytes(payload)
+        if fmt == _FORMAT_STR:
+            return str(payload, "utf-8")
+        if fmt == _FORMAT_PICKLE:
+            return pickle.loads(payload)
+        raise ValueError(f"Unknown cache value header {value[:2]!r}")
+
     async def delete(self, *keys: str) -> int:
         """Delete one or more keys from cache.
 
@@ -247,6 +522,25 @@ class CacheService:
             logger.error(f"Cache expire error for key {key}: {e}")
             return False
 
+    async def acquire_lock(self, key: str, ttl: int) -> bool:
+        """Take a short-lived lock (SET NX EX); False if someone else holds it.
+
+        Args:
+            key: Lock key
+            ttl: Seconds until the lock expires on its own
+
+        Returns:
+            Whether the lock was acquired
+        """
+        if not self.client:
+            return False
+
+        try:
+            return bool(await self.client.set(key, b"1", nx=True, ex=ttl))
+        except Exception as e:
+            logger.error(f"Cache lock error for key {key}: {e}")
+            return False
+
     async def clear_namespace(self, namespace: str) -> int:
         """Clear all keys in a namespace.
 
@@ -256,21 +550,58 @@ class CacheService:
         Returns:
             Number of keys deleted
         """
+        return await self.unlink_pattern(f"{namespace}:*")
+
+    async def unlink_pattern(self, pattern: str, batch_size: int = 500) -> int:
+        """Remove all keys matching a glob pattern without blocking Redis.
+
+        Keys are collected with SCAN and removed with pipelined UNLINK in
+        batches, so memory is reclaimed off the Redis main thread.
+
+        Args:
+            pattern: Glob pattern (e.g. 'analytics:*:{user_id}:*')
+            batch_size: SCAN page hint and UNLINK batch size
+
+        Returns:
+            Number of keys removed
+        """
+        return await self.unlink_patterns([pattern], batch_size)
+
+    async def unlink_patterns(self, patterns: List[str], batch_size: int = 500) -> int:
+        """Remove all keys matching any of several glob patterns.
+
+        Like unlink_pattern, but every pattern feeds the same pipeline, so a
+        handful of near-empty patterns cost one round-trip instead of one each.
+
+        Args:
+            patterns: Glob patterns to remove
+            batch_size: SCAN page hint and UNLINK batch size
+
+        Returns:
+            Number of keys removed
+        """
         if not self.client:
             return 0
 
         try:
-            pattern = f"{namespace}:*"
-            keys = []
-            async for key in self.client.scan_iter(pattern):
-                keys.append(key)
-
-            if keys:
-                return await self.client.delete(*keys)
-            return 0
+            removed = 0
+            async with self.client.pipeline(transaction=False) as pipe:
+                batch = 0
+                for pattern in patterns:
+                    async for key in self.client.scan_iter(
+                        match=pattern, count=batch_size
+                    ):
+                        pipe.unlink(key)
+                        batch += 1
+                        if batch >= batch_size:
+                            removed += sum(await pipe.execute())
+                            batch = 0
+                if batch:
+                    removed += sum(await pipe.execute())
+            return removed
 
         except Exception as e:
-            logger.error(f"Cache clear namespace error for {namespace}: {e}")
+            logger.error(f"Cache unlink pattern error for {patterns}: {e}")
             return 0
 
     async def get_metrics(self) -> CacheMetrics:
@@ -279,7 +610,10 @@ class CacheService:
         Returns:
             Current cache metrics
         """
-        if self.client:
+        # INFO is not free server-side; frequent scrapes reuse a recent reading
+        now = time.monotonic()
+        if self.client and now - self._memory_checked_at >= _MEMORY_INFO_TTL_SECONDS:
+            self._memory_checked_at = now
             try:
                 info = await self.client.info("memory")
                 self._metrics.memory_used_mb = info.get("used_memory", 0) / (1024 * 1024)
@@ -288,6 +622,34 @@ class CacheService:
 
         return self._metrics
 
+    async def get_metrics_bundle(self) -> CacheMetrics:
+        """Get cache metrics plus server-side stats in a single round-trip.
+
+        INFO memory, INFO stats and DBSIZE go out in one pipeline and are
+        folded into the same CacheMetrics that get_metrics returns.
+
+        Returns:
+            Current cache metrics
+        """
+        if self.client:
+            try:
+                async with self.client.pipeline(transaction=False) as pipe:
+                    pipe.info("memory")
+                    pipe.info("stats")
+                    pipe.dbsize()
+                    memory, stats, key_count = await pipe.execute()
+
+                self._metrics.memory_used_mb = memory.get("used_memory", 0) / (1024 * 1024)
+                self._memory_checked_at = time.monotonic()
+                self._metrics.evictions = stats.get("evicted_keys", 0)
+                self._metrics.keyspace_hits = stats.get("keyspace_hits", 0)
+                self._metrics.keyspace_misses = stats.get("keyspace_misses", 0)
+                self._metrics.key_count = key_count
+            except Exception:
+                pass
+
+        return self._metrics
+
     # Decorator for automatic caching
     def cached(
         self,
@@ -308,6 +670,9 @@ class CacheService:
             Decorated function
         """
 
+        key_prefix = namespace + ":"
+        key_seed = xxhash.xxh3_64(namespace.encode())
+
         def decorator(func: Callable) -> Callable:
             async def wrapper(*args, **kwargs):
                 # Build cache key
@@ -316,7 +681,7 @@ class CacheService:
                 else:
                     # Skip 'self' for methods
                     cache_args = args[1:] if args and hasattr(args[0], "__class__") else args
-                    cache_key = self._generate_key(namespace, *cache_args, **kwargs)
+                    cache_key = _call_key(key_prefix, key_seed, cache_args, kwargs)
 
                 # Try to get from cache
                 cached_value = await self.get(cache_key)
@@ -324,15 +689,36 @@ class CacheService:
                     logger.debug(f"Cache hit for {cache_key}")
                     return cached_value
 
-                # Execute function
-                result = await func(*args, **kwargs)
-
-                # Cache result if condition met
-                if condition is None or condition(result):
-                    await self.set(cache_key, result, ttl=ttl)
-                    logger.debug(f"Cached result for {cache_key}")
+                # Another caller is already computing this key; share its result.
+                # shield() keeps a cancelled waiter from cancelling the leader.
+                inflight = self._inflight.get(cache_key)
+                if inflight is not None:
+                    return await asyncio.shield(inflight)
 
-                return result
+                fut = asyncio.get_running_loop().create_future()
+                self._inflight[cache_key] = fut
+                try:
+                    # Execute function
+                    try:
+                        result = await func(*args, **kwargs)
+                    except asyncio.CancelledError:
+                        fut.cancel()
+                        raise
+                    except Exception as e:
+                        fut.set_exception(e)
+                        # Mark retrieved so asyncio doesn't warn when nobody waited
+                        fut.exception()
+                        raise
+                    fut.set_result(result)
+
+                    # Cache result if condition met
+                    if condition is None or condition(result):
+                        await self.set(cache_key, result, ttl=ttl)
+                        logger.debug(f"Cached result for {cache_key}")
+
+                    return result
+                finally:
+                    self._inflight.pop(cache_key, None)
 
             return wrapper
 
@@ -378,16 +764,22 @@ async def invalidate_user_cache(user_id: str) -> None:
         f"session:*:{user_id}:*",
     ]
 
-    for pattern in patterns:
-        await cache_service.clear_namespace(pattern.replace(":*", ""))
+    await cache_service.unlink_patterns(patterns)
 
 
-async def warmup_cache(user_id: str) -> None:
+async def warmup_cache(
+    user_id: str,
+    entries: Optional[Dict[str, Tuple[Any, Optional[int]]]] = None,
+) -> None:
     """Pre-warm cache for better user experience.
 
     Args:
         user_id: User ID to warm cache for
+        entries: Precomputed values to store, as cache key -> (value, ttl);
+            written together in one pipelined set_many round trip
     """
     # This would typically call your service methods to pre-populate cache
     logger.info(f"Warming up cache for user {user_id}")
-    # Implementation depends on your specific services
\ No newline at end of file
+    # Implementation depends on your specific services
+    if entries:
+        await cache_service.set_many(entries)
\ No newline at end of file
@@ -5,12 +5,16 @@ Solo dev optimization: Cache RAG queries to reduce feedback loop time from 500ms
 Perfect for iterating on AI coach responses without waiting for vector search every time.
 """
 
-import hashlib
-import json
 import logging
-from typing import Any, Dict, List, Optional
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
 from uuid import UUID
 
+import orjson
+import xxhash
+import zstandard
+from cachetools import TTLCache
+
 try:
     from redis.asyncio import Redis
 except ImportError:
@@ -18,6 +22,77 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Keys per pipelined UNLINK when invalidating a user's queries
+_UNLINK_BATCH_SIZE = 512
+
+# In-process L1 in front of Redis for the hottest repeated queries
+_L1_MAXSIZE = 1024
+_L1_TTL_SECONDS = 300
+
+# One L1 per TTL, shared by every RagCacheService in the process (chat
+# creates a service per websocket). Values are the uncompressed chunk JSON,
+# so each hit decodes its own list and callers can't mutate a cached entry.
+_L1_BY_TTL: Dict[int, TTLCache] = {}
+
+# Stored values start with a format byte. Entries written before it existed
+# are bare JSON arrays, so they start with "[" and still decode.
+_FORMAT_ZSTD = b"Z"
+_FORMAT_ZSTD_DICT = b"D"
+
+# Zstd dictionary trained on real cached chunk lists by
+# scripts/train_rag_cache_dict.py. Chunk JSON repeats the same keys and
+# metadata shapes, which a dictionary compresses far better than level 3
+# alone. Without the file, values are compressed dictionary-less.
+ZSTD_DICT_PATH = Path(__file__).with_name("rag_cache.zdict")
+
+
+def _load_zstd_dict() -> Optional[zstandard.ZstdCompressionDict]:
+    try:
+        return zstandard.ZstdCompressionDict(ZSTD_DICT_PATH.read_bytes())
+    except FileNotFoundError:
+        return None
+
+
+_ZSTD_DICT = _load_zstd_dict()
+_ZSTD_COMPRESSOR = zstandard.ZstdCompressor(level=3, dict_data=_ZSTD_DICT)
+_ZSTD_DECOMPRESSOR = zstandard.ZstdDecompressor()
+_ZSTD_DICT_DECOMPRESSOR = (
+    zstandard.ZstdDecompressor(dict_data=_ZSTD_DICT) if _ZSTD_DICT else None
+)
+
+
+def _encode_chunks(chunks_json: bytes) -> bytes:
+    """Compress serialized chunk JSON, with the dictionary when loaded."""
+    fmt = _FORMAT_ZSTD_DICT if _ZSTD_DICT else _FORMAT_ZSTD
+    return fmt + _ZSTD_COMPRESSOR.compress(chunks_json)
+
+
+def _chunks_json(raw: bytes) -> bytes:
+    """Reverse _encode_chunks; also reads uncompressed legacy entries."""
+    fmt = raw[:1]
+    if fmt == _FORMAT_ZSTD:
+        return _ZSTD_DECOMPRESSOR.decompress(memoryview(raw)[1:])
+    if fmt == _FORMAT_ZSTD_DICT:
+        # The frame carries its dictionary ID, so an entry compressed with a
+        # rotated-out dictionary fails here and is treated as a miss
+        if _ZSTD_DICT_DECOMPRESSOR is None:
+            raise ValueError("RAG cache entry needs the zstd dictionary, not loaded")
+        return _ZSTD_DICT_DECOMPRESSOR.decompress(memoryview(raw)[1:])
+    return raw
+
+
+def _decode_chunks(raw: bytes) -> List[Dict[str, Any]]:
+    """Decode a stored Redis value into a chunk list."""
+    return orjson.loads(_chunks_json(raw))
+
+
+def _shared_l1(ttl_seconds: int) -> TTLCache:
+    """Return the process-wide L1 for entries living ``ttl_seconds``."""
+    l1 = _L1_BY_TTL.get(ttl_seconds)
+    if l1 is None:
+        l1 = _L1_BY_TTL[ttl_seconds] = TTLCache(maxsize=_L1_MAXSIZE, ttl=ttl_seconds)
+    return l1
+
 
 class RagCacheService:
     """Caches RAG query results in Redis for fast subsequent lookups."""
@@ -33,6 +108,8 @@ class RagCacheService:
         self.redis = redis_client
         self.ttl = ttl_seconds
         self.enabled = redis_client is not None
+        # Never outlives the Redis entry it mirrors
+        self._l1 = _shared_l1(min(_L1_TTL_SECONDS, ttl_seconds))
 
         if not self.enabled:
             logger.warning(
@@ -43,10 +120,16 @@ class RagCacheService:
         """
         Generate a deterministic cache key for a RAG query.
 
-        Uses MD5 hash of query to keep key length reasonable while avoiding collisions.
+        Uses a 64-bit xxh3 hash of the query to keep key length reasonable while
+        avoiding collisions; the hash is scoped per user, so 64 bits is plenty.
         """
-        query_hash = hashlib.md5(query.encode("utf-8")).hexdigest()
-        return f"rag:u:{user_id}:q:{query_hash}:k:{top_k}"
+        return self._make_query_key(f"rag:u:{user_id}:q:", query, top_k)
+
+    @staticmethod
+    def _make_query_key(user_prefix: str, query: str, top_k: int) -> str:
+        """Build a cache key from a precomputed per-user prefix."""
+        query_hash = xxhash.xxh3_64_hexdigest(query.encode("utf-8"))
+        return f"{user_prefix}{query_hash}:k:{top_k}"
 
     async def get_cached_chunks(
         self, user_id: UUID, query: str, top_k: int
@@ -62,10 +145,15 @@ class RagCacheService:
 
         cache_key = self._make_cache_key(user_id, query, top_k)
 
+        chunks_json = self._l1.get(cache_key)
+        if chunks_json is not None:
+            return orjson.loads(chunks_json)
+
         try:
             cached_data = await self.redis.get(cache_key)
             if cached_data:
-                chunks = json.loads(cached_data)
+                chunks_json = self._l1[cache_key] = _chunks_json(cached_data)
+                chunks = orjson.loads(chunks_json)
                 logger.info(
                     "rag_cache_hit",
                     extra={
@@ -98,6 +186,60 @@ class RagCacheService:
             )
             return None
 
+    async def mget_chunks(
+        self, user_id: UUID, queries: List[Tuple[str, int]]
+    ) -> List[Optional[List[Dict[str, Any]]]]:
+        """
+        Retrieve cached chunks for several (query, top_k) pairs in one MGET.
+
+        Returns:
+            One entry per query, in order: the chunk list if cached, else None
+        """
+        if not queries:
+            return []
+        if not self.enabled or not self.redis:
+            return [None] * len(queries)
+
+        user_prefix = f"rag:u:{user_id}:q:"
+        cache_keys = [
+            self._make_query_key(user_prefix, query, top_k) for query, top_k in queries
+        ]
+        cached = [self._l1.get(key) for key in cache_keys]
+        results = [
+            None if chunks_json is None else orjson.loads(chunks_json)
+            for chunks_json in cached
+        ]
+        missing = [i for i, result in enumerate(results) if result is None]
+
+        try:
+            if missing:
+                raw_values = await self.redis.mget([cache_keys[i] for i in missing])
+                for i, raw in zip(missing, raw_values):
+                    if raw:
+                        chunks_json = self._l1[cache_keys[i]] = _chunks_json(raw)
+                        results[i] = orjson.loads(chunks_json)
+
+            logger.debug(
+                "rag_cache_mget",
+                extra={
+                    "user_id": str(user_id),
+                    "queries": len(queries),
+                    "hits": sum(result is not None for result in results),
+                },
+            )
+            return results
+
+        except Exception as exc:
+            logger.warning(
+                "rag_cache_mget_failed",
+                extra={
+                    "user_id": str(user_id),
+                    "error": str(exc),
+                    "queries": len(queries),
+                },
+            )
+            return [None] * len(queries)
+
     async def set_cached_chunks(
         self, user_id: UUID, query: str, top_k: int, chunks: List[Dict[str, Any]]
     ) -> bool:
@@ -113,8 +255,9 @@ class RagCacheService:
         cache_key = self._make_cache_key(user_id, query, top_k)
 
         try:
-            serialized = json.dumps(chunks)
-            await self.redis.setex(cache_key, self.ttl, serialized)
+            chunks_json = orjson.dumps(chunks)
+            await self.redis.setex(cache_key, self.ttl, _encode_chunks(chunks_json))
+            self._l1[cache_key] = chunks_json
 
             logger.debug(
                 "rag_cache_set",
@@ -149,13 +292,26 @@ class RagCacheService:
         if not self.enabled or not self.redis:
             return 0
 
-        pattern = f"rag:u:{user_id}:*"
+        prefix = f"rag:u:{user_id}:"
+        for l1 in _L1_BY_TTL.values():
+            for cache_key in [key for key in l1 if key.startswith(prefix)]:
+                l1.pop(cache_key, None)
+
+        pattern = prefix + "*"
 
         try:
             deleted_count = 0
-            async for key in self.redis.scan_iter(match=pattern, count=100):
-                await self.redis.delete(key)
-                deleted_count += 1
+            batch: List[Any] = []
+            async with self.redis.pipeline(transaction=False) as pipe:
+                async for key in self.redis.scan_iter(match=pattern, count=500):
+                    batch.append(key)
+                    if len(batch) >= _UNLINK_BATCH_SIZE:
+                        pipe.unlink(*batch)
+                        deleted_count += sum(await pipe.execute())
+                        batch.clear()
+                if batch:
+                    pipe.unlink(*batch)
+                    deleted_count += sum(await pipe.execute())
 
             logger.info(
                 "rag_cache_invalidated",
@@ -7,54 +7,151 @@ Security:
 - CLI path whitelist validation
 - Prompt sanitization and length limits
 - Shell metacharacter filtering
-- Safe subprocess argument passing with shlex.quote
+- Argument-list subprocess execution (no shell)
 - Comprehensive security event logging
 """
 
 import asyncio
-import json
 import logging
 import os
 import re
-import shlex
+import string
+from functools import lru_cache
 from pathlib import Path
 from time import perf_counter
-from typing import Any, AsyncGenerator, Dict, List, Optional
+from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple
+
+import orjson
 
 from app.config import settings
+from app.services.tokenizer import get_encoder
 
 logger = logging.getLogger(__name__)
 
+
 # Security constants - CLI path whitelist
-ALLOWED_CLI_PATHS = frozenset({
-    "/opt/homebrew/bin/codex",
-    "/usr/local/bin/codex",
-    "/usr/bin/codex",
-    str(Path.home() / ".local" / "bin" / "codex"),
-})
+@lru_cache(maxsize=1)
+def _allowed_cli_paths() -> frozenset[str]:
+    """
+    Build the CLI path whitelist on first use.
+
+    Deferred so importing this module (e.g., with LLM_PROVIDER=openai_*)
+    never looks up the home directory, which fails in containers that have
+    neither HOME nor a passwd entry for the user.
+    """
+    return frozenset({
+        "/opt/homebrew/bin/codex",
+        "/usr/local/bin/codex",
+        "/usr/bin/codex",
+        str(Path.home() / ".local" / "bin" / "codex"),
+    })
+
+
+def __getattr__(name: str) -> Any:
+    # Keep `from app.services.codex_llm import ALLOWED_CLI_PATHS` working
+    if name == "ALLOWED_CLI_PATHS":
+        return _allowed_cli_paths()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 # Shell metacharacters that could be used for injection
-# Note: We use shlex.quote() + subprocess.exec (no shell=True) which makes many characters safe
+# Note: We use subprocess.exec (no shell=True), which makes many characters safe
 # Safe characters: () [] {} ; (cannot be used for injection without shell interpretation)
 # Blocked characters: & | ` $ < > \ (could potentially be dangerous even with our protections)
 DANGEROUS_SHELL_CHARS = re.compile(r'[&|`$<>\\]')
 
-# Allowed model name pattern (alphanumeric, dots, hyphens, underscores only)
-ALLOWED_MODEL_PATTERN = re.compile(r'^[a-zA-Z0-9._-]+$')
+# Null byte or any DANGEROUS_SHELL_CHARS character, for a single-pass check
+_FORBIDDEN_RE = re.compile(r'[\x00&|`$<>\\]')
+
+# Byte marker present in every Codex "item.completed" event line
+_ITEM_COMPLETED_MARKER = b'"item.completed"'
+
+# Bytes requested per stdout read; one read usually carries many JSON events
+_STREAM_READ_SIZE = 64 * 1024
+
+# StreamReader buffer limit for the CLI's stdout. asyncio pauses the pipe once
+# twice this much is buffered; the 64 KiB default would pause and resume it
+# around nearly every bulk read.
+_STREAM_BUFFER_LIMIT = 1 << 20
+
+# ASCII control characters other than tab, newline and carriage return.
+# For ASCII text this is exactly what str.isprintable() rejects.
+_CONTROL_RE = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]')
+
+# Allowed model name characters (alphanumeric, dots, hyphens, underscores only)
+_ALLOWED_MODEL_CHARS = frozenset(string.ascii_letters + string.digits + "._-")
+
+# Prompt templates, built once; filled with str.format per request
+_QGEN_TEMPLATE = (
+    "Generate {n} NBME-style USMLE Step 1 multiple choice questions about {topic}.\n"
+    "{ctx}"
+    "Difficulty level: {diff}/5\n"
+    "Format: Return JSON array with objects containing: question, options (array of 4), correct_index, explanation.\n"
+)
+_QGEN_CONTEXT_TEMPLATE = "Context (from the student's materials):\n{context}\n\n"
+
+_TEACH_TEMPLATE = """You are a medical educator using the Socratic method.
+
+Context from medical texts:
+{context}
+
+Student question: {question}
+Student level: {user_level}/5 (1=beginner, 5=expert)
+
+Provide a teaching response that:
+1. Doesn't directly answer, but guides thinking
+2. Asks clarifying questions
+3. Relates to clinical scenarios
+4. Adjusts complexity to student level
+
+Response:"""
 
 
-def _estimate_token_count(text: str, usage: Optional[Dict[str, Any]] = None) -> int:
-    """Estimate tokens generated, preferring explicit usage stats when available."""
-    if usage:
-        for key in ("completion_tokens", "total_tokens"):
-            value = usage.get(key)
-            if isinstance(value, (int, float)):
-                return int(value)
-    if not text:
-        return 0
-    # Fall back to heuristic: assume ~4 characters per token, minimum 1 token
-    approx = max(1, int(len(text) / 4))
-    return approx
+def _agent_message_text(line: bytes) -> str:
+    """Return the agent message text carried by a Codex JSON event line, if any."""
+    # Only item.completed events are consumed; skip every other
+    # event (progress, tool calls, ...) without parsing it
+    if _ITEM_COMPLETED_MARKER not in line:
+        return ""
+
+    # Parse JSON line (orjson reads the bytes without a decode copy)
+    try:
+        event = orjson.loads(line)
+    except orjson.JSONDecodeError:
+        # Skip non-JSON lines
+        return ""
+
+    # Extract agent message text from item.completed events
+    if event.get("type") == "item.completed":
+        item = event.get("item", {})
+        if item.get("type") == "agent_message":
+            return item.get("text", "")
+    return ""
+
+
+def _count_tokens(text: str, model: Optional[str]) -> int:
+    """Token count for a streamed message, via tiktoken when available."""
+    encoder = get_encoder(model)
+    if encoder is None:
+        return _estimate_tokens_from_chars(len(text))
+    return len(encoder.encode_ordinary(text))
+
+
+def _estimate_tokens_from_chars(char_count: int) -> int:
+    """Heuristic token count for text of the given length."""
+    # Assume ~4 characters per token, minimum 1 token for non-empty text
+    return max(1, char_count >> 2) if char_count else 0
+
+
+@lru_cache(maxsize=8)
+def _resolve_cli_path(cli_path: str) -> Tuple[str, str]:
+    """
+    Return the absolute and symlink-resolved forms of a CLI path.
+
+    Cached because realpath() walks and stats every path component, and the
+    same configured path is validated on every service construction.
+    """
+    return os.path.abspath(cli_path), os.path.realpath(cli_path)
 
 
 def _validate_cli_path(cli_path: str) -> str:
@@ -74,24 +171,25 @@ def _validate_cli_path(cli_path: str) -> str:
         ValueError: If CLI path is not in the whitelist or doesn't exist
     """
     # Get both the original and resolved paths
-    original_path = str(Path(cli_path).absolute())
-    resolved_path = str(Path(cli_path).resolve())
+    original_path, resolved_path = _resolve_cli_path(cli_path)
+
+    allowed_paths = _allowed_cli_paths()
 
     # Check if either the original path or resolved path is in whitelist
     # This allows symlinks (e.g., /opt/homebrew/bin/codex) to work
-    if original_path not in ALLOWED_CLI_PATHS and resolved_path not in ALLOWED_CLI_PATHS:
+    if allowed_paths.isdisjoint((original_path, resolved_path)):
         logger.error(
             "security_cli_path_blocked",
             extra={
                 "attempted_path": cli_path,
                 "original_path": original_path,
                 "resolved_path": resolved_path,
-                "allowed_paths": list(ALLOWED_CLI_PATHS),
+                "allowed_paths": list(allowed_paths),
             }
         )
         raise ValueError(
             f"CLI path not in whitelist: {cli_path}. "
-            f"Allowed paths: {', '.join(ALLOWED_CLI_PATHS)}"
+            f"Allowed paths: {', '.join(allowed_paths)}"
         )
 
     # Verify file exists and is executable (check original path)
@@ -136,9 +234,13 @@ def _sanitize_prompt(prompt: str, user_id: Optional[str] = None) -> str:
     if not prompt:
         raise ValueError("Prompt cannot be empty")
 
-    # Check length limit
-    prompt_length = len(prompt.encode('utf-8'))
+    # Check length limit. UTF-8 needs at most 4 bytes per character, so
+    # short prompts are within the byte limit without encoding them, and
+    # ASCII prompts (isascii() is O(1) on str) are exactly one byte per char.
     max_length = settings.CODEX_MAX_PROMPT_LENGTH
+    prompt_length = len(prompt)
+    if prompt_length * 4 > max_length and not prompt.isascii():
+        prompt_length = len(prompt.encode('utf-8'))
     if prompt_length > max_length:
         logger.error(
             "security_prompt_too_long",
@@ -152,8 +254,12 @@ def _sanitize_prompt(prompt: str, user_id: Optional[str] = None) -> str:
             f"Prompt exceeds maximum length: {prompt_length} bytes > {max_length} bytes"
         )
 
+    # One scan for both null bytes and shell metacharacters; the specific
+    # checks below only run once something forbidden was found
+    forbidden = _FORBIDDEN_RE.search(prompt)
+
     # Check for null bytes (common injection technique)
-    if '\x00' in prompt:
+    if forbidden and (forbidden.group() == '\x00' or '\x00' in prompt):
         logger.error(
             "security_null_byte_detected",
             extra={
@@ -164,7 +270,7 @@ def _sanitize_prompt(prompt: str, user_id: Optional[str] = None) -> str:
         raise ValueError("Prompt contains null bytes")
 
     # Check for dangerous shell metacharacters
-    if DANGEROUS_SHELL_CHARS.search(prompt):
+    if forbidden:
         dangerous_chars = set(DANGEROUS_SHELL_CHARS.findall(prompt))
         logger.error(
             "security_shell_metacharacters_detected",
@@ -181,18 +287,26 @@ def _sanitize_prompt(prompt: str, user_id: Optional[str] = None) -> str:
 
     # Remove control characters (except tab, newline, carriage return)
     # Allow common whitespace but block other control chars
-    sanitized = ''.join(
-        char for char in prompt
-        if char.isprintable() or char in {'\t', '\n', '\r', ' '}
-    )
+    if prompt.isascii():
+        # Common case: one C-level regex pass instead of a per-char genexpr
+        sanitized = _CONTROL_RE.sub('', prompt)
+    else:
+        # Non-ASCII text also drops Unicode format/separator chars (e.g. bidi
+        # overrides) that isprintable() rejects and the ASCII class misses
+        sanitized = ''.join(
+            char for char in prompt
+            if char.isprintable() or char in {'\t', '\n', '\r', ' '}
+        )
 
-    if len(sanitized) != len(prompt):
+    removed = len(prompt) - len(sanitized)
+    if removed:
         logger.warning(
             "security_control_chars_removed",
             extra={
                 "user_id": user_id,
                 "original_length": len(prompt),
                 "sanitized_length": len(sanitized),
+                "removed_count": removed,
             }
         )
 
@@ -218,7 +332,7 @@ def _validate_model_name(model: Optional[str], user_id: Optional[str] = None) ->
     if model is None:
         return None
 
-    if not ALLOWED_MODEL_PATTERN.match(model):
+    if not model or not _ALLOWED_MODEL_CHARS.issuperset(model):
         logger.error(
             "security_invalid_model_name",
             extra={
@@ -254,10 +368,12 @@ def _build_safe_command(
     profile: Optional[str] = None,
 ) -> List[str]:
     """
-    Build command arguments with proper shell escaping.
+    Build the argument list for the Codex CLI.
 
-    Security: Use list-based subprocess.exec to avoid shell interpretation.
-    Each argument is properly escaped with shlex.quote for defense in depth.
+    Security: The list goes to create_subprocess_exec, so no shell ever sees
+    it; each element reaches the CLI verbatim through execve, and that
+    boundary is what keeps the prompt inert. shlex.quote only makes sense
+    for shell=True - here it would just wrap the prompt in literal quotes.
 
     Args:
         cli_path: Validated CLI path
@@ -269,7 +385,8 @@ def _build_safe_command(
     Returns:
         List of command arguments (safe for subprocess.exec)
     """
-    # Build command as list (no shell interpretation)
+    # Build command as list (no shell interpretation); optional flags are
+    # appended as tuples so no temporary lists are built
     cmd = [
         cli_path,  # Already validated against whitelist
         "exec",
@@ -277,7 +394,7 @@ def _build_safe_command(
 
     # Use profile if specified (preferred over individual config)
     if profile:
-        cmd.extend(["--profile", profile])
+        cmd += ("--profile", profile)
 
     # JSON mode for clean structured output (no parsing needed)
     if json_mode:
@@ -285,18 +402,24 @@ def _build_safe_command(
 
     # Model override (usually not needed with profiles)
     if model:
-        cmd.extend(["--model", model])
+        cmd += ("--model", model)
 
-    # Add prompt with proper escaping (defense in depth)
-    # Using shlex.quote even though we're using exec to prevent any
-    # potential issues if the CLI itself uses shell commands internally
-    cmd.append(shlex.quote(prompt))
+    # Prompt is passed as a single argv entry, unquoted
+    cmd.append(prompt)
 
     return cmd
 
 
 class CodexLLMService:
-    """Service for calling LLM operations via Codex CLI with security validations."""
+    """
+    Service for calling LLM operations via Codex CLI with security validations.
+
+    Each completion spawns its own `codex exec` process. `codex exec` runs a
+    single prompt and exits - it has no batch or stdin job mode - so there is
+    no long-lived process to keep warm and reuse across calls. Where process
+    startup matters, set LLM_PROVIDER=openai_* to use OpenAILLMService, which
+    keeps one pooled HTTP client for the app's lifetime.
+    """
 
     def __init__(self, cli_path: str | None = None):
         """
@@ -405,73 +528,6 @@ class CodexLLMService:
         ):
             yield chunk
 
-    async def _generate_completion(
-        self,
-        *,
-        prompt: str,
-        model: Optional[str],
-        max_tokens: int,
-        temperature: float,
-        user_id: Optional[str],
-    ) -> tuple[str, Dict[str, Any]]:
-        """
-        Internal method for non-streaming completions.
-
-        Security: Assumes prompt and model are already validated by public method.
-        """
-        # Build safe command (assumes inputs already validated)
-        cmd = _build_safe_command(
-            cli_path=self.cli_path,
-            prompt=prompt,
-            model=model,
-            json_mode=True,
-            profile=None,  # Not used for non-streaming
-        )
-
-        # Note: Codex CLI doesn't support --max-tokens or --temperature flags
-        # These settings are applied by the CLI based on the model defaults
-
-        # Security: Using create_subprocess_exec (not shell=True) to prevent shell injection
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-        )
-
-        stdout, stderr = await process.communicate()
-
-        if process.returncode != 0:
-            error_msg = stderr.decode() if stderr else "Unknown error"
-            logger.error(
-                "codex_cli_error",
-                extra={
-                    "user_id": user_id,
-                    "model": model,
-                    "return_code": process.returncode,
-                    "stderr": error_msg,
-                },
-            )
-            raise RuntimeError(f"Codex CLI error: {error_msg}")
-
-        # Parse JSON output
-        try:
-            result = json.loads(stdout.decode())
-            if isinstance(result, dict):
-                text = result.get("output") or result.get("content") or ""
-                metadata: Dict[str, Any] = {
-                    "usage": result.get("usage"),
-                    "model": result.get("model") or model,
-                }
-                if not text:
-                    text = str(result)
-                return text, metadata
-            # Non-dict JSON, treat as string content
-            text_repr = str(result)
-            return text_repr, {"usage": None, "model": model}
-        except json.JSONDecodeError:
-            # If not JSON, return raw output
-            return stdout.decode().strip(), {"usage": None, "model": model}
-
     async def _stream_completion(
         self,
         *,
@@ -508,21 +564,42 @@ class CodexLLMService:
             *cmd,
             stdout=asyncio.subprocess.PIPE,
             stderr=asyncio.subprocess.PIPE,
+            limit=_STREAM_BUFFER_LIMIT,
         )
 
-        accumulated_text: List[str] = []
+        # Only sizes are needed after the stream ends, so chunks aren't kept
+        tokens_generated = 0
+        accumulated_bytes = 0
+        received_chunks = 0
         first_token_logged = False
+        # Skip INFO-only work (token counting, timing math, extra dicts)
+        # when those records would be dropped anyway
+        log_info = logger.isEnabledFor(logging.INFO)
 
         try:
             if not process.stdout:
                 return
 
+            # Load the tokenizer off the event loop (it may download its encoding
+            # on first use) while the CLI starts up; cached after the first stream
+            if log_info:
+                await asyncio.to_thread(get_encoder, model)
+
+            # Split lines ourselves so one read (and one timeout) covers
+            # a whole block of events instead of a single line
+            buffer = bytearray()
+            # Read settings once; the loop body runs per event
+            stream_timeout = settings.CODEX_STREAM_TIMEOUT
+            max_response_size = settings.CODEX_MAX_RESPONSE_SIZE
+            # An unterminated event can't be split into lines, so cap it here
+            # the way readline() capped it with the StreamReader limit
+            pending_limit = max(max_response_size, _STREAM_BUFFER_LIMIT)
             while True:
                 # Add timeout protection to prevent hanging on slow/stalled streams
                 try:
-                    line = await asyncio.wait_for(
-                        process.stdout.readline(),
-                        timeout=settings.CODEX_STREAM_TIMEOUT
+                    block = await asyncio.wait_for(
+                        process.stdout.read(_STREAM_READ_SIZE),
+                        timeout=stream_timeout
                     )
                 except asyncio.TimeoutError:
                     logger.error(
@@ -531,65 +608,86 @@ class CodexLLMService:
                             "user_id": user_id,
                             "model": model,
                             "duration_ms": round((perf_counter() - invocation_start) * 1000, 2),
-                            "timeout_seconds": settings.CODEX_STREAM_TIMEOUT,
+                            "timeout_seconds": stream_timeout,
                         }
                     )
                     raise RuntimeError(
-                        f"LLM streaming timeout - no response in {settings.CODEX_STREAM_TIMEOUT} seconds"
+                        f"LLM streaming timeout - no response in {stream_timeout} seconds"
                     )
 
-                if not line:
+                if block:
+                    # Only the new block is searched, so a long event isn't
+                    # rescanned (and re-copied) on every read
+                    newline = block.rfind(b"\n")
+                    if newline == -1:
+                        buffer += block
+                        lines = []
+                    else:
+                        buffer += memoryview(block)[:newline]
+                        lines = buffer.split(b"\n")
+                        buffer = bytearray(memoryview(block)[newline + 1:])
+                    if len(buffer) > pending_limit:
+                        logger.error(
+                            "codex_response_too_large",
+                            extra={
+                                "user_id": user_id,
+                                "model": model,
+                                "pending_bytes": len(buffer),
+                                "limit_bytes": pending_limit,
+                            }
+                        )
+                        raise RuntimeError("LLM response exceeded size limit")
+                else:
+                    # EOF: the last event may not end with a newline
+                    lines = [buffer] if buffer else []
+
+                for line in lines:
+                    text = _agent_message_text(line)
+                    if text:
+                        if log_info:
+                            tokens_generated += _count_tokens(text, model)
+                        received_chunks += 1
+
+                        # Add response size limit (running total, not a re-sum);
+                        # ASCII text is its own UTF-8 length, so skip the encode
+                        accumulated_bytes += (
+                            len(text) if text.isascii() else len(text.encode("utf-8"))
+                        )
+                        if accumulated_bytes > max_response_size:
+                            logger.error(
+                                "codex_response_too_large",
+                                extra={
+                                    "user_id": user_id,
+                                    "model": model,
+                                    "accumulated_bytes": accumulated_bytes,
+                                    "limit_bytes": max_response_size,
+                                }
+                            )
+                            raise RuntimeError(
+                                f"LLM response exceeded size limit"
+                            )
+
+                        if log_info and not first_token_logged:
+                            first_token_ms = round((perf_counter() - invocation_start) * 1000, 2)
+                            logger.info(
+                                "codex_first_token",
+                                extra={
+                                    "user_id": user_id,
+                                    "model": model,
+                                    "duration_ms": first_token_ms,
+                                    "stream": True,
+                                    "prompt_chars": prompt_chars,
+                                    "temperature": temperature,
+                                    "max_tokens": max_tokens,
+                                },
+                            )
+                            first_token_logged = True
+
+                        yield text
+
+                if not block:
                     break
 
-                # Parse JSON line
-                try:
-                    event = json.loads(line.decode("utf-8", errors="ignore"))
-                except json.JSONDecodeError:
-                    # Skip non-JSON lines
-                    continue
-
-                # Extract agent message text from item.completed events
-                if event.get("type") == "item.completed":
-                    item = event.get("item", {})
-                    if item.get("type") == "agent_message":
-                        text = item.get("text", "")
-                        if text:
-                            accumulated_text.append(text)
-
-                            # Add response size limit
-                            accumulated_size = sum(len(t.encode("utf-8")) for t in accumulated_text)
-                            if accumulated_size > settings.CODEX_MAX_RESPONSE_SIZE:
-                                logger.error(
-                                    "codex_response_too_large",
-                                    extra={
-                                        "user_id": user_id,
-                                        "model": model,
-                                        "accumulated_bytes": accumulated_size,
-                                        "limit_bytes": settings.CODEX_MAX_RESPONSE_SIZE,
-                                    }
-                                )
-                                raise RuntimeError(
-                                    f"LLM response exceeded size limit"
-                                )
-
-                            if not first_token_logged:
-                                first_token_ms = round((perf_counter() - invocation_start) * 1000, 2)
-                                logger.info(
-                                    "codex_first_token",
-                                    extra={
-                                        "user_id": user_id,
-                                        "model": model,
-                                        "duration_ms": first_token_ms,
-                                        "stream": True,
-                                        "prompt_chars": prompt_chars,
-                                        "temperature": temperature,
-                                        "max_tokens": max_tokens,
-                                    },
-                                )
-                                first_token_logged = True
-
-                            yield text
-
             returncode = await process.wait()
             if returncode != 0:
                 stderr_bytes = await process.stderr.read() if process.stderr else b""
@@ -605,6 +703,9 @@ class CodexLLMService:
                 )
                 raise RuntimeError(f"Codex CLI streaming error: {error_msg}")
 
+            if not log_info:
+                return
+
             total_duration_ms = round((perf_counter() - invocation_start) * 1000, 2)
             if not first_token_logged:
                 logger.info(
@@ -619,8 +720,6 @@ class CodexLLMService:
                         "max_tokens": max_tokens,
                     },
                 )
-            response_text = "".join(accumulated_text)
-            tokens_generated = _estimate_token_count(response_text, usage=None)
             tokens_per_sec = (
                 round(tokens_generated / (total_duration_ms / 1000), 2)
                 if tokens_generated and total_duration_ms
@@ -636,7 +735,7 @@ class CodexLLMService:
                     "tokens_generated": tokens_generated,
                     "tokens_per_sec": tokens_per_sec,
                     "stream": True,
-                    "received_chunks": len(accumulated_text),
+                    "received_chunks": received_chunks,
                     "prompt_chars": prompt_chars,
                     "temperature": temperature,
                     "max_tokens": max_tokens,
@@ -693,13 +792,10 @@ class CodexLLMService:
         Returns:
             List of question dictionaries
         """
-        base = f"Generate {num_questions} NBME-style USMLE Step 1 multiple choice questions about {topic}.\n"
-        ctx = f"Context (from the student's materials):\n{context}\n\n" if context else ""
-        guide = (
-            "Difficulty level: "
-            f"{difficulty}/5\nFormat: Return JSON array with objects containing: question, options (array of 4), correct_index, explanation.\n"
+        ctx = _QGEN_CONTEXT_TEMPLATE.format(context=context) if context else ""
+        prompt = _QGEN_TEMPLATE.format(
+            n=num_questions, topic=topic, ctx=ctx, diff=difficulty
         )
-        prompt = f"""{base}{ctx}{guide}"""
         # Collect all chunks from the async generator
         chunks = []
         async for chunk in self.generate_completion(prompt, model="gpt-5"):
@@ -710,13 +806,14 @@ class CodexLLMService:
             # Try to parse as JSON
             if isinstance(response, str):
                 # Extract JSON from response if wrapped in markdown
-                if "```json" in response:
-                    json_str = response.split("```json")[1].split("```")[0].strip()
+                _, fence, rest = response.partition("```json")
+                if fence:
+                    json_str = rest.partition("```")[0].strip()
                 else:
                     json_str = response
-                return json.loads(json_str)
+                return orjson.loads(json_str)
             return response
-        except (json.JSONDecodeError, IndexError):
+        except orjson.JSONDecodeError:
             raise ValueError(f"Failed to parse questions from Codex response: {response}")
 
     async def generate_teaching_response(
@@ -736,21 +833,9 @@ class CodexLLMService:
         Returns:
             Teaching response string
         """
-        prompt = f"""You are a medical educator using the Socratic method.
-
-Context from medical texts:
-{context}
-
-Student question: {question}
-Student level: {user_level}/5 (1=beginner, 5=expert)
-
-Provide a teaching response that:
-1. Doesn't directly answer, but guides thinking
-2. Asks clarifying questions
-3. Relates to clinical scenarios
-4. Adjusts complexity to student level
-
-Response:"""
+        prompt = _TEACH_TEMPLATE.format_map(
+            {"context": context, "question": question, "user_level": user_level}
+        )
 
         # Collect all chunks from the async generator
         chunks = []
@@ -788,12 +873,34 @@ def get_codex_llm() -> CodexLLMService:
         return _codex_llm_instance
 
 
+# Service the codex_llm proxy resolved to; cleared by reset_codex_llm()
+_codex_llm_resolved: Optional[Any] = None
+
+
+def reset_codex_llm() -> None:
+    """
+    Drop the cached LLM service so the next access re-reads LLM_PROVIDER.
+
+    The codex_llm proxy resolves its provider once; call this after changing
+    the provider at runtime (e.g., in tests).
+    """
+    global _codex_llm_instance, _codex_llm_resolved
+    _codex_llm_instance = None
+    _codex_llm_resolved = None
+
+
 # Backwards compatibility property-style access
 class _CodexLLMLazyProxy:
     """Lazy proxy for codex_llm singleton to defer initialization until first use."""
 
+    __slots__ = ()
+
     def __getattr__(self, name):
-        return getattr(get_codex_llm(), name)
+        global _codex_llm_resolved
+        service = _codex_llm_resolved
+        if service is None:
+            service = _codex_llm_resolved = get_codex_llm()
+        return getattr(service, name)
 
 
 codex_llm = _CodexLLMLazyProxy()
@@ -1,8 +1,12 @@
 from __future__ import annotations
 
 import logging
+import re
 from pathlib import Path
-from typing import List
+from typing import Any, Iterator, List
+
+from app.config import settings
+from app.services.tokenizer import get_encoder
 
 logger = logging.getLogger(__name__)
 
@@ -11,6 +15,38 @@ try:  # pragma: no cover - dependency guard
 except ImportError as exc:  # pragma: no cover - raised when dependency missing
     raise RuntimeError("PyPDF2 must be installed to extract PDF text.") from exc
 
+try:  # pragma: no cover - optional C++ (PDFium) extractor, PyPDF2 is the fallback
+    import pypdfium2 as pdfium
+except ImportError:  # pragma: no cover
+    pdfium = None  # type: ignore
+
+# Chunkers split/encode this much text at a time; \s matches what str.split() splits on
+_SPLIT_WINDOW_CHARS = 1 << 20
+_SPACE_RE = re.compile(r"\s")
+
+
+def _extract_with_pdfium(path: Path) -> str:
+    pdf = pdfium.PdfDocument(str(path))
+    try:
+        pages = []
+        for index in range(len(pdf)):
+            page = pdf[index]
+            try:
+                textpage = page.get_textpage()
+                pages.append(textpage.get_text_range())
+                textpage.close()
+            except pdfium.PdfiumError as exc:  # pragma: no cover - malformed pages
+                logger.warning(
+                    "pdf_page_extraction_failed",
+                    extra={"file_path": str(path), "page": index, "error": str(exc)},
+                )
+                pages.append("")
+            finally:
+                page.close()
+        return "\n".join(pages).strip()
+    finally:
+        pdf.close()
+
 
 def extract_text_from_pdf(file_path: str | Path) -> str:
     path = Path(file_path)
@@ -19,6 +55,16 @@ def extract_text_from_pdf(file_path: str | Path) -> str:
 
     logger.debug("extracting_text_from_pdf", extra={"file_path": str(path)})
 
+    if pdfium is not None:
+        try:
+            return _extract_with_pdfium(path)
+        except pdfium.PdfiumError as exc:
+            # PDFium refused the file; PyPDF2 is more lenient with damaged PDFs
+            logger.warning(
+                "pdfium_extraction_failed",
+                extra={"file_path": str(path), "error": str(exc)},
+            )
+
     reader = PdfReader(str(path))
     pages = []
 
@@ -36,19 +82,121 @@ def extract_text_from_pdf(file_path: str | Path) -> str:
     return "\n".join(pages).strip()
 
 
-def chunk_text(text: str, chunk_size: int = 500) -> List[str]:
+def _iter_split_windows(text: str) -> Iterator[str]:
+    """Yield ~_SPLIT_WINDOW_CHARS slices of text, each ending at whitespace."""
+    pos, length = 0, len(text)
+    while pos < length:
+        end = pos + _SPLIT_WINDOW_CHARS
+        if end < length:
+            # Extend to the next whitespace so no word is cut in two
+            boundary = _SPACE_RE.search(text, end)
+            end = boundary.start() if boundary else length
+        yield text[pos:end]
+        pos = end
+
+
+def iter_text_chunks(text: str, chunk_size: int = 500) -> Iterator[str]:
+    """Yield chunk_size-word chunks without materializing every word at once."""
     if chunk_size <= 0:
         raise ValueError("chunk_size must be a positive integer")
 
-    words = text.split()
-    if not words:
-        return []
+    # str.split() one bounded window at a time: split's speed, but only a
+    # window's worth of word objects alive instead of the whole document's
+    words: List[str] = []
+    for window in _iter_split_windows(text):
+        words.extend(window.split())
+        full = len(words) - len(words) % chunk_size
+        for start in range(0, full, chunk_size):
+            yield " ".join(words[start:start + chunk_size])
+        words = words[full:]
 
-    chunks: List[str] = []
-    for start_index in range(0, len(words), chunk_size):
-        chunk_words = words[start_index : start_index + chunk_size]
-        chunk = " ".join(chunk_words).strip()
+    if words:
+        yield " ".join(words)
+
+
+def chunk_text(text: str, chunk_size: int = 500) -> List[str]:
+    return list(iter_text_chunks(text, chunk_size))
+
+
+def iter_token_chunks(
+    text: str, target_tokens: int | None = None, overlap_tokens: int | None = None
+) -> Iterator[str]:
+    """
+    Yield chunks of about target_tokens tokens, each repeating the last
+    overlap_tokens tokens of the previous chunk.
+
+    Sized in tokens, not words, so every chunk sits just under the embedding
+    model's input limit instead of wasting calls on short chunks or being
+    truncated. Edges move back to a character boundary when a token splits a
+    character, so a chunk can be a few tokens short. Without a tokenizer,
+    falls back to word chunks of similar size.
+    """
+    if target_tokens is None:
+        target_tokens = settings.EMBEDDING_CHUNK_TOKENS
+    if overlap_tokens is None:
+        overlap_tokens = settings.EMBEDDING_CHUNK_OVERLAP_TOKENS
+    if not 0 <= overlap_tokens < target_tokens:
+        raise ValueError("overlap_tokens must be between 0 and target_tokens")
+
+    encoder = get_encoder()
+    if encoder is None:
+        # ~0.75 English words per token
+        yield from iter_text_chunks(text, max(1, target_tokens * 3 // 4))
+        return
+
+    tokens: List[int] = []
+    # Tokens at the head of `tokens` already sent as the previous chunk's overlap
+    sent = 0
+    for window in _iter_split_windows(text):
+        tokens.extend(encoder.encode_ordinary(window))
+        start = 0
+        while len(tokens) - start >= target_tokens:
+            end = _snap_back(encoder, tokens, start + target_tokens, start + 1)
+            chunk = encoder.decode(tokens[start:end]).strip()
+            if chunk:
+                yield chunk
+            next_start = _snap_forward(encoder, tokens, end - overlap_tokens, end)
+            if next_start <= start:
+                next_start = end
+            sent = end - next_start
+            start = next_start
+        tokens = tokens[start:]
+
+    # The tail is only new text if it extends past the overlap already sent
+    if len(tokens) > sent:
+        chunk = encoder.decode(tokens).strip()
         if chunk:
-            chunks.append(chunk)
+            yield chunk
+
+
+def _splits_character(encoder: Any, tokens: List[int], index: int) -> bool:
+    """Whether a chunk edge before tokens[index] would cut a UTF-8 character.
+
+    Byte-level BPE tokens can hold part of a character (CJK, emoji, rare
+    symbols); the token holding the rest starts with a continuation byte.
+    decode() would turn each half into U+FFFD.
+    """
+    return (
+        0 < index < len(tokens)
+        and 0x80 <= encoder.decode_single_token_bytes(tokens[index])[0] < 0xC0
+    )
+
+
+def _snap_back(encoder: Any, tokens: List[int], index: int, floor: int) -> int:
+    """Move a chunk end back to a character boundary, not below floor."""
+    while index > floor and _splits_character(encoder, tokens, index):
+        index -= 1
+    return index
+
+
+def _snap_forward(encoder: Any, tokens: List[int], index: int, ceiling: int) -> int:
+    """Move a chunk start forward to a character boundary, not past ceiling."""
+    while index < ceiling and _splits_character(encoder, tokens, index):
+        index += 1
+    return index
+
 
-    return chunks
+def chunk_text_by_tokens(
+    text: str, target_tokens: int | None = None, overlap_tokens: int | None = None
+) -> List[str]:
+    return list(iter_token_chunks(text, target_tokens, overlap_tokens))
@@ -1,7 +1,15 @@
 from __future__ import annotations
 
+import asyncio
 import logging
-from typing import Any, Dict, List
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple
+
+import numpy as np
+import xxhash
 
 from app.config import settings
 
@@ -27,10 +35,168 @@ except ImportError as exc:  # pragma: no cover
     raise RuntimeError("chromadb package is required for vector storage.") from exc
 
 
-def _l2_normalize(vec: list[float]) -> list[float]:
-    s = sum(v * v for v in vec) or 1.0
-    norm = s ** 0.5
-    return [v / norm for v in vec]
+# Gemini accepts at most 100 texts per embed request
+EMBEDDING_BATCH_SIZE = 100
+
+# Document embeddings are cached by content hash next to the Chroma data, so
+# re-uploading or re-ingesting unchanged text skips the Gemini call
+EMBEDDING_CACHE_FILENAME = "embedding_cache.sqlite3"
+# Stay under SQLite's default 999 host-parameter limit
+_CACHE_LOOKUP_BATCH = 500
+# A hit rewrites its row's last-used time at most once a day
+_CACHE_TOUCH_SECONDS = 86400
+# Eviction trims the cache to this fraction of its cap, so it doesn't run on every put
+_CACHE_PRUNE_TARGET = 0.9
+
+
+def _l2_normalize_rows(vecs: Any) -> np.ndarray:
+    """L2-normalize each row of a batch of vectors (zero rows stay zero)."""
+    arr = np.asarray(vecs, dtype=np.float32)
+    norms = np.linalg.norm(arr, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    arr /= norms
+    return arr
+
+
+def _group_by_title(metadatas: List[Dict[str, Any]]) -> Dict[str | None, List[int]]:
+    """Group chunk positions by filename.
+
+    The filename is sent as the embedding title, and one API call takes a
+    single title, so each filename's chunks are embedded together.
+    """
+    by_title: Dict[str | None, List[int]] = {}
+    for i, metadata in enumerate(metadatas):
+        by_title.setdefault(metadata.get("filename") if metadata else None, []).append(i)
+    return by_title
+
+
+class _EmbeddingCache:
+    """SQLite key/value store of normalized vectors by content hash.
+
+    Vectors are stored as ``dtype`` bytes (float32 or float16) and always
+    read back as float32. Rows unused for ``ttl_days`` expire, and past
+    ``max_entries`` the least recently used rows are evicted; both happen on
+    open and whenever a put takes the cache over its cap.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        dtype: str = "float32",
+        *,
+        max_entries: int = 100_000,
+        ttl_days: int = 90,
+    ) -> None:
+        self._dtype = np.dtype(dtype)
+        self._max_entries = max_entries
+        self._ttl_seconds = ttl_days * 86400
+        # Called from threadpool workers: share one connection behind a lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "hash TEXT PRIMARY KEY, vec BLOB NOT NULL, used_at INTEGER NOT NULL DEFAULT 0)"
+            )
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(embeddings)")}
+            if "used_at" not in columns:
+                # Sidecar from before eviction: its rows start their TTL now
+                self._conn.execute(
+                    "ALTER TABLE embeddings ADD COLUMN used_at INTEGER NOT NULL DEFAULT 0"
+                )
+                self._conn.execute("UPDATE embeddings SET used_at = ?", (int(time.time()),))
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS embeddings_used_at ON embeddings (used_at)"
+            )
+            self._count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        self.prune()
+
+    def make_key(self, text: str, *, model: str, dim: int, task_type: str, title: str | None) -> str:
+        """Hash the text together with every input that changes its stored vector.
+
+        The storage dtype is part of the key, so switching it never decodes
+        old blobs with the wrong width; they simply miss.
+        """
+        hasher = xxhash.xxh3_128()
+        hasher.update(
+            f"{model}\0{dim}\0{task_type}\0{title or ''}\0{self._dtype.name}\0".encode("utf-8")
+        )
+        hasher.update(text.encode("utf-8"))
+        return hasher.hexdigest()
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        found: Dict[str, np.ndarray] = {}
+        now = int(time.time())
+        stale: List[str] = []
+        with self._lock, self._conn:
+            for start in range(0, len(keys), _CACHE_LOOKUP_BATCH):
+                batch = keys[start:start + _CACHE_LOOKUP_BATCH]
+                rows = self._conn.execute(
+                    f"SELECT hash, vec, used_at FROM embeddings WHERE hash IN ({','.join('?' * len(batch))})",
+                    batch,
+                ).fetchall()
+                for key, blob, used_at in rows:
+                    found[key] = self._dequantize(blob)
+                    if now - used_at >= _CACHE_TOUCH_SECONDS:
+                        stale.append(key)
+            if stale:
+                self._conn.executemany(
+                    "UPDATE embeddings SET used_at = ? WHERE hash = ?",
+                    [(now, key) for key in stale],
+                )
+        return found
+
+    def _quantize(self, vec: np.ndarray) -> bytes:
+        """Encode a float32 vector as storage-dtype bytes."""
+        return vec.astype(self._dtype, copy=False).tobytes()
+
+    def _dequantize(self, blob: bytes) -> np.ndarray:
+        """Decode stored bytes back into a float32 vector."""
+        return np.frombuffer(blob, dtype=self._dtype).astype(np.float32, copy=False)
+
+    def put_many(self, items: Iterable[Tuple[str, np.ndarray]]) -> None:
+        now = int(time.time())
+        rows = [(key, self._quantize(vec), now) for key, vec in items]
+        with self._lock, self._conn:
+            self._count += self._conn.executemany(
+                "INSERT OR IGNORE INTO embeddings (hash, vec, used_at) VALUES (?, ?, ?)", rows
+            ).rowcount
+        if self._count > self._max_entries:
+            self.prune()
+
+    def delete_many(self, keys: List[str]) -> None:
+        with self._lock, self._conn:
+            for start in range(0, len(keys), _CACHE_LOOKUP_BATCH):
+                batch = keys[start:start + _CACHE_LOOKUP_BATCH]
+                self._count -= self._conn.execute(
+                    f"DELETE FROM embeddings WHERE hash IN ({','.join('?' * len(batch))})",
+                    batch,
+                ).rowcount
+
+    def prune(self) -> int:
+        """Drop expired rows, then least recently used rows past the size cap.
+
+        Returns the number of rows removed.
+        """
+        removed = 0
+        with self._lock, self._conn:
+            if self._ttl_seconds > 0:
+                removed += self._conn.execute(
+                    "DELETE FROM embeddings WHERE used_at < ?",
+                    (int(time.time()) - self._ttl_seconds,),
+                ).rowcount
+            remaining = self._count - removed
+            if remaining > self._max_entries:
+                removed += self._conn.execute(
+                    "DELETE FROM embeddings WHERE hash IN "
+                    "(SELECT hash FROM embeddings ORDER BY used_at LIMIT ?)",
+                    (remaining - int(self._max_entries * _CACHE_PRUNE_TARGET),),
+                ).rowcount
+            self._count -= removed
+        if removed:
+            logger.info("embedding_cache_pruned", extra={"removed": removed, "remaining": self._count})
+        return removed
 
 
 class EmbeddingService:
@@ -49,104 +215,232 @@ class EmbeddingService:
 
         # Vector store (Chroma)
         self._client = PersistentClient(path=settings.CHROMA_PERSIST_DIR)
+        self._model = settings.GEMINI_EMBEDDING_MODEL
         self._dim = int(getattr(settings, "GEMINI_EMBEDDING_DIM", 1536) or 1536)
         coll_name = f"material_chunks_{self._dim}"
         self._collection = self._client.get_or_create_collection(
             name=coll_name,
             metadata={"hnsw:space": "cosine"},
         )
+        self._cache = _EmbeddingCache(
+            Path(settings.CHROMA_PERSIST_DIR) / EMBEDDING_CACHE_FILENAME,
+            settings.EMBEDDING_CACHE_DTYPE,
+            max_entries=settings.EMBEDDING_CACHE_MAX_ENTRIES,
+            ttl_days=settings.EMBEDDING_CACHE_TTL_DAYS,
+        )
+
+    def generate_embedding(self, text: str, *, is_query: bool = False, title: str | None = None) -> np.ndarray:
+        return self.generate_embeddings([text], is_query=is_query, title=title)[0]
+
+    def generate_embeddings(
+        self, texts: List[str], *, is_query: bool = False, title: str | None = None
+    ) -> np.ndarray:
+        """Embed several texts, sending up to EMBEDDING_BATCH_SIZE per API call.
+
+        Returns a (len(texts), dim) float32 array of L2-normalized rows.
 
-    def generate_embedding(self, text: str, *, is_query: bool = False, title: str | None = None) -> List[float]:
-        if not text.strip():
+        Document embeddings are served from the content-hash cache when
+        present; only the misses go to Gemini. Queries are not cached.
+        """
+        if any(not text.strip() for text in texts):
             raise ValueError("Cannot generate embeddings for empty text")
 
         # Use string constants for compatibility across SDK versions
         task_type = "RETRIEVAL_QUERY" if is_query else "RETRIEVAL_DOCUMENT"
-        dim = int(getattr(settings, "GEMINI_EMBEDDING_DIM", 1536) or 1536)
 
-        if _USE_NEW_SDK:
-            resp = self._gemini.models.embed_content(  # type: ignore[union-attr]
-                model=settings.GEMINI_EMBEDDING_MODEL,
-                contents=text,
-                config=genai_types.EmbedContentConfig(
-                    task_type=task_type,
-                    title=title or None,
-                    output_dimensionality=dim,
-                ),
-            )
-            try:
-                vec = resp.embeddings[0].values  # type: ignore[attr-defined]
-            except Exception as exc:  # pragma: no cover
-                raise RuntimeError(f"Unexpected embedding response: {resp!r}") from exc
-        else:
-            # google-generativeai compatibility path
-            resp = genai_old.embed_content(  # type: ignore[name-defined]
-                model=settings.GEMINI_EMBEDDING_MODEL,
-                content=text,
-                task_type=task_type,
-                title=title or None,
-                output_dimensionality=dim,
+        if is_query:
+            return self._embed_batches(texts, task_type=task_type, title=title)
+
+        keys = [
+            self._cache.make_key(
+                text, model=self._model, dim=self._dim, task_type=task_type, title=title
             )
-            # Response shape: { 'embedding': { 'values': [...] } } or {'embedding': [...]}
-            data = getattr(resp, 'embedding', None) or resp.get('embedding')
-            if isinstance(data, dict) and 'values' in data:
-                vec = data['values']
+            for text in texts
+        ]
+        cached = self._cache.get_many(keys)
+        vectors = np.empty((len(texts), self._dim), dtype=np.float32)
+        missing: List[int] = []
+        for i, key in enumerate(keys):
+            vector = cached.get(key)
+            if vector is None:
+                missing.append(i)
             else:
-                vec = data
+                vectors[i] = vector
+        if missing:
+            fresh = self._embed_batches([texts[i] for i in missing], task_type=task_type, title=title)
+            vectors[missing] = fresh
+            self._cache.put_many(zip([keys[i] for i in missing], fresh))
 
-        return _l2_normalize([float(v) for v in vec])
+        logger.debug(
+            "embedding_cache_lookup",
+            extra={"texts": len(texts), "hits": len(texts) - len(missing)},
+        )
+        return vectors
+
+    def _embed_batches(
+        self, texts: List[str], *, task_type: str, title: str | None
+    ) -> np.ndarray:
+        """Call Gemini for texts in EMBEDDING_BATCH_SIZE batches and normalize the results."""
+        parts: List[np.ndarray] = []
+        for start in range(0, len(texts), EMBEDDING_BATCH_SIZE):
+            batch = texts[start:start + EMBEDDING_BATCH_SIZE]
+            if _USE_NEW_SDK:
+                resp = self._gemini.models.embed_content(  # type: ignore[union-attr]
+                    model=self._model,
+                    contents=batch,
+                    config=genai_types.EmbedContentConfig(
+                        task_type=task_type,
+                        title=title or None,
+                        output_dimensionality=self._dim,
+                    ),
+                )
+                try:
+                    batch_vecs = [e.values for e in resp.embeddings]  # type: ignore[attr-defined]
+                except Exception as exc:  # pragma: no cover
+                    raise RuntimeError(f"Unexpected embedding response: {resp!r}") from exc
+            else:
+                # google-generativeai compatibility path
+                resp = genai_old.embed_content(  # type: ignore[name-defined]
+                    model=self._model,
+                    content=batch,
+                    task_type=task_type,
+                    title=title or None,
+                    output_dimensionality=self._dim,
+                )
+                # Response shape for list content: { 'embedding': [[...], ...] }
+                data = getattr(resp, 'embedding', None) or resp.get('embedding')
+                if isinstance(data, dict) and 'values' in data:
+                    data = data['values']
+                batch_vecs = data
+
+            if len(batch_vecs) != len(batch):
+                raise RuntimeError(
+                    f"Expected {len(batch)} embeddings, got {len(batch_vecs)}"
+                )
+            parts.append(_l2_normalize_rows(batch_vecs))
+
+        return parts[0] if len(parts) == 1 else np.concatenate(parts)
 
     def store_chunk_embedding(self, chunk_id: str, text: str, metadata: Dict[str, Any]) -> None:
-        embedding = self.generate_embedding(text, is_query=False, title=metadata.get("filename") if metadata else None)
+        self.store_chunk_embeddings([chunk_id], [text], [metadata])
 
+    def store_chunk_embeddings(
+        self, chunk_ids: List[str], texts: List[str], metadatas: List[Dict[str, Any]]
+    ) -> None:
+        """Embed and upsert several chunks with one Chroma write."""
+        if not chunk_ids:
+            return
+
+        by_title = _group_by_title(metadatas)
+        if len(by_title) == 1:
+            embeddings = self.generate_embeddings(texts, is_query=False, title=next(iter(by_title)))
+        else:
+            embeddings = np.empty((len(texts), self._dim), dtype=np.float32)
+            for title, indexes in by_title.items():
+                embeddings[indexes] = self.generate_embeddings(
+                    [texts[i] for i in indexes], is_query=False, title=title
+                )
+
+        self._upsert(chunk_ids, embeddings, texts, metadatas)
+
+    async def store_chunk_embeddings_async(
+        self, chunk_ids: List[str], texts: List[str], metadatas: List[Dict[str, Any]]
+    ) -> None:
+        """Embed chunks with up to EMBEDDING_CONCURRENCY batch requests in flight.
+
+        The Gemini SDK client is synchronous, so each batch runs on a worker
+        thread; all vectors are then written with one Chroma upsert.
+        """
+        if not chunk_ids:
+            return
+
+        embeddings = np.empty((len(texts), self._dim), dtype=np.float32)
+        semaphore = asyncio.Semaphore(max(1, settings.EMBEDDING_CONCURRENCY))
+
+        async def embed_batch(title: str | None, indexes: List[int]) -> None:
+            async with semaphore:
+                embeddings[indexes] = await asyncio.to_thread(
+                    self.generate_embeddings, [texts[i] for i in indexes], is_query=False, title=title
+                )
+
+        await asyncio.gather(
+            *(
+                embed_batch(title, indexes[start:start + EMBEDDING_BATCH_SIZE])
+                for title, indexes in _group_by_title(metadatas).items()
+                for start in range(0, len(indexes), EMBEDDING_BATCH_SIZE)
+            )
+        )
+        await asyncio.to_thread(self._upsert, chunk_ids, embeddings, texts, metadatas)
+
+    def _upsert(
+        self,
+        chunk_ids: List[str],
+        embeddings: np.ndarray,
+        texts: List[str],
+        metadatas: List[Dict[str, Any]],
+    ) -> None:
         logger.debug(
-            "store_chunk_embedding",
-            extra={"chunk_id": chunk_id, "material_id": metadata.get("material_id"), "chunk_index": metadata.get("chunk_index")},
+            "store_chunk_embeddings",
+            extra={
+                "chunk_count": len(chunk_ids),
+                "material_id": metadatas[0].get("material_id") if metadatas[0] else None,
+            },
         )
 
         self._collection.upsert(
-            ids=[chunk_id],
-            embeddings=[embedding],
-            documents=[text],
-            metadatas=[metadata],
+            ids=chunk_ids,
+            embeddings=embeddings,
+            documents=texts,
+            metadatas=metadatas,
         )
 
     def search_similar(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
         if top_k <= 0:
             raise ValueError("top_k must be greater than zero")
 
-        query_embedding = self.generate_embedding(query, is_query=True)
         results = self._collection.query(
-            query_embeddings=[query_embedding],
+            query_embeddings=self.generate_embeddings([query], is_query=True),
             n_results=top_k,
             include=["documents", "metadatas", "distances"],
         )
 
-        matches: List[Dict[str, Any]] = []
         if not results:
-            return matches
+            return []
 
         ids = results.get("ids", [[]])[0]
         documents = results.get("documents", [[]])[0]
         metadatas = results.get("metadatas", [[]])[0]
         distances = results.get("distances", [[]])[0]
 
-        for chunk_id, document, metadata, distance in zip(ids, documents, metadatas, distances):
-            matches.append(
-                {
-                    "id": chunk_id,
-                    "content": document,
-                    "metadata": metadata,
-                    "distance": distance,
-                }
-            )
-
-        return matches
+        # Callers read these as dicts; a comprehension builds them without a
+        # bound-method append call per match
+        return [
+            {"id": chunk_id, "content": document, "metadata": metadata, "distance": distance}
+            for chunk_id, document, metadata, distance in zip(ids, documents, metadatas, distances)
+        ]
 
     def delete_chunk_embeddings(self, chunk_ids: List[str]) -> None:
         if not chunk_ids:
             return
 
+        # Rebuild the chunks' cache keys from their stored text and filename,
+        # as store_chunk_embeddings computed them, so the sidecar drops them too
+        stored = self._collection.get(ids=chunk_ids, include=["documents", "metadatas"])
+        self._cache.delete_many(
+            [
+                self._cache.make_key(
+                    document,
+                    model=self._model,
+                    dim=self._dim,
+                    task_type="RETRIEVAL_DOCUMENT",
+                    title=metadata.get("filename") if metadata else None,
+                )
+                for document, metadata in zip(
+                    stored.get("documents") or [], stored.get("metadatas") or []
+                )
+                if document
+            ]
+        )
         self._collection.delete(ids=chunk_ids)
 
 
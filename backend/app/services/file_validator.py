@@ -1,13 +1,18 @@
 """Secure file validation utilities."""
 from __future__ import annotations
 
+import asyncio
 import hashlib
 import logging
+import os
+import socket
+import struct
 import zipfile
 from io import BytesIO
 from pathlib import Path
-from typing import Tuple
+from typing import Any, Dict, Tuple
 
+from cachetools import TTLCache
 from fastapi import HTTPException
 
 from app.config import settings
@@ -24,10 +29,164 @@ try:
 except ImportError:  # pragma: no cover - clamav optional at runtime
     clamd = None  # type: ignore
 
+try:
+    from magika import Magika  # type: ignore
+except ImportError:  # pragma: no cover - libmagic is the fallback detector
+    Magika = None  # type: ignore
+
+try:
+    from blake3 import blake3  # type: ignore
+except ImportError:  # pragma: no cover - SHA-256 is the fallback digest
+    blake3 = None  # type: ignore
+
 
 logger = logging.getLogger(__name__)
 security_logger = logging.getLogger("security")
 
+# Magika labels accepted as text/plain uploads
+_MAGIKA_PLAIN_TEXT_LABELS = frozenset({"txt", "markdown", "csv", "tsv", "rst"})
+
+# Verdicts for recently validated content, keyed by content digest. The TTL
+# bounds how long a file skips rescanning after ClamAV signatures update.
+_VERDICT_CACHE_MAXSIZE = 4096
+_VERDICT_CACHE_TTL_SECONDS = 3600
+
+# Below this size hashing takes less time than a thread-pool round trip
+_INLINE_HASH_MAX_BYTES = 64 * 1024
+# Above this size BLAKE3 also hashes chunks on its own thread pool
+_BLAKE3_MULTITHREAD_MIN_BYTES = 1024 * 1024
+
+
+def _sha256_hexdigest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _blake3_hexdigest(data: bytes) -> str:
+    if len(data) >= _BLAKE3_MULTITHREAD_MIN_BYTES:
+        return blake3(data, max_threads=blake3.AUTO).hexdigest()
+    return blake3(data).hexdigest()
+
+
+def _clamd_fildes_scan(socket_path: str, data: bytes, timeout: float | None) -> Dict[str, Any]:
+    """Scan bytes with clamd's FILDES command over its unix socket.
+
+    The upload goes into an anonymous memfd whose descriptor is passed to
+    clamd as SCM_RIGHTS ancillary data, so clamd reads it in place instead
+    of receiving it in INSTREAM frames. Returns the same {"stream": (status,
+    reason)} shape as clamd's instream.
+    """
+    fd = os.memfd_create("clamd-scan", os.MFD_CLOEXEC)
+    try:
+        with open(fd, "wb", closefd=False) as memfile:
+            memfile.write(data)
+        os.lseek(fd, 0, os.SEEK_SET)
+
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(socket_path)
+            sock.sendall(b"nFILDES\n")
+            # clamd needs at least one byte of regular data with the fd
+            socket.send_fds(sock, [b"\0"], [fd])
+            with sock.makefile("rb") as reply_file:
+                reply = reply_file.readline().decode("utf-8").strip()
+    finally:
+        os.close(fd)
+
+    # Replies look like "fd[10]: OK" or "fd[10]: Eicar-Signature FOUND"
+    _, _, result = reply.rpartition(": ")
+    if result == "OK":
+        return {"stream": ("OK", None)}
+    if result.endswith(" FOUND"):
+        return {"stream": ("FOUND", result[: -len(" FOUND")])}
+    raise ConnectionError(f"Unexpected clamd FILDES reply: {reply!r}")
+
+
+_ZIP_EOCD_SIGNATURE = b"PK\x05\x06"
+_ZIP_EOCD_SIZE = 22
+_ZIP_CD_SIGNATURE = b"PK\x01\x02"
+_ZIP64_LOCATOR_SIGNATURE = b"PK\x06\x07"
+_ZIP64_LOCATOR_SIZE = 20
+_ZIP_CD_HEADER_SIZE = 46
+_ZIP_MAX_COMMENT = 0xFFFF
+_VBA_PROJECT_NAME = b"vbaProject.bin"
+
+
+def _docx_has_vba(buf: bytes) -> bool:
+    """Return whether a DOCX (zip) archive contains a vbaProject.bin entry.
+
+    Walks only the central directory's file names, without building a
+    ZipFile and its ZipInfo objects. Raises zipfile.BadZipFile on a
+    malformed directory.
+    """
+    # The EOCD record ends the file unless an archive comment follows it; the
+    # comment may itself contain the signature, so check its length field
+    search_start = max(0, len(buf) - _ZIP_EOCD_SIZE - _ZIP_MAX_COMMENT)
+    eocd = buf.rfind(_ZIP_EOCD_SIGNATURE, search_start)
+    while eocd >= 0 and (
+        eocd + _ZIP_EOCD_SIZE > len(buf)
+        or eocd + _ZIP_EOCD_SIZE + struct.unpack_from("<H", buf, eocd + 20)[0] != len(buf)
+    ):
+        eocd = buf.rfind(_ZIP_EOCD_SIGNATURE, search_start, eocd)
+    if eocd < 0:
+        raise zipfile.BadZipFile("End of central directory not found")
+
+    entries, cd_size = struct.unpack_from("<HI", buf, eocd + 10)
+    if (
+        entries == 0xFFFF
+        or cd_size == 0xFFFFFFFF
+        or (
+            eocd >= _ZIP64_LOCATOR_SIZE
+            and buf.startswith(_ZIP64_LOCATOR_SIGNATURE, eocd - _ZIP64_LOCATOR_SIZE)
+        )
+    ):
+        # Zip64 archive: its end records sit between the directory and the
+        # EOCD record, so let zipfile parse them. Any failure fails closed.
+        try:
+            with zipfile.ZipFile(BytesIO(buf)) as archive:
+                return any(name.endswith("vbaProject.bin") for name in archive.namelist())
+        except zipfile.BadZipFile:
+            raise
+        except Exception as exc:
+            raise zipfile.BadZipFile(f"Unreadable zip64 archive: {exc}") from exc
+
+    # Like zipfile, locate the directory relative to the EOCD record so
+    # archives with prepended data still parse
+    offset = eocd - cd_size
+    if offset < 0:
+        raise zipfile.BadZipFile("Bad central directory size")
+
+    # Walk the whole directory, as zipfile does, rather than trusting the
+    # entry count, so an understated count cannot hide a trailing entry
+    found = False
+    seen = 0
+    while offset < eocd:
+        if offset + _ZIP_CD_HEADER_SIZE > eocd or not buf.startswith(_ZIP_CD_SIGNATURE, offset):
+            raise zipfile.BadZipFile("Bad central directory entry")
+        name_len, extra_len, comment_len = struct.unpack_from("<HHH", buf, offset + 28)
+        name_start = offset + _ZIP_CD_HEADER_SIZE
+        name_end = name_start + name_len
+        if name_end > eocd:
+            raise zipfile.BadZipFile("Central directory entry overruns the directory")
+        if buf.endswith(_VBA_PROJECT_NAME, name_start, name_end):
+            found = True
+        offset = name_end + extra_len + comment_len
+        seen += 1
+    if offset != eocd or seen != entries:
+        raise zipfile.BadZipFile("Central directory does not match the end record")
+    return found
+
+
+def _valid_extensions_by_mime(
+    extension_map: Dict[str, str], normalization: Dict[str, str]
+) -> Dict[str, frozenset[str]]:
+    """Map each MIME type to its canonical extension plus any aliases."""
+    return {
+        mime: frozenset(
+            {extension, *(alias for alias, canonical in normalization.items() if canonical == extension)}
+        )
+        for mime, extension in extension_map.items()
+    }
+
 
 class FileValidator:
     """Multi-layer file validation service."""
@@ -52,10 +211,33 @@ class FileValidator:
         ".jpeg": ".jpg",
     }
 
+    VALID_EXTENSIONS_BY_MIME = _valid_extensions_by_mime(EXTENSION_MAP, EXTENSION_NORMALIZATION)
+
     def __init__(self) -> None:
+        # python-magic serializes calls on one handle with its own lock, so a
+        # single detector is safe to call from worker threads
         self.mime_detector = magic.Magic(mime=True)
+        # Magika's content-type model is more accurate than libmagic's
+        # signature rules; it is used first when installed
+        self._magika = None
+        if Magika is not None:
+            try:
+                self._magika = Magika()
+            except Exception as exc:  # pragma: no cover - environment dependent
+                logger.warning("Magika unavailable, using libmagic: %s", exc)
         self.clamav_available = False
         self._clamd_client = None
+        # Each scan holds a clamd connection for its whole INSTREAM upload
+        self._scan_semaphore = asyncio.Semaphore(max(1, settings.CLAMAV_MAX_CONCURRENCY))
+        self._verdicts: TTLCache = TTLCache(
+            maxsize=_VERDICT_CACHE_MAXSIZE, ttl=_VERDICT_CACHE_TTL_SECONDS
+        )
+        # BLAKE3 is several times faster than SHA-256 and equally collision
+        # resistant; UPLOAD_DIGEST=sha256 keeps SHA-256 for callers that need it
+        if settings.UPLOAD_DIGEST == "blake3" and blake3 is not None:
+            self._digest_name, self._digest = "blake3", _blake3_hexdigest
+        else:
+            self._digest_name, self._digest = "sha256", _sha256_hexdigest
 
         if clamd is not None:  # pragma: no branch - simple capability check
             try:
@@ -73,8 +255,45 @@ class FileValidator:
                 self.clamav_available = False
                 logger.warning("ClamAV unavailable: %s", exc)
 
+    def _clamd_scan(self, file_content: bytes) -> Dict[str, Any]:
+        """Scan with FILDES on a local unix socket, else stream via INSTREAM."""
+        client = self._clamd_client
+        if hasattr(os, "memfd_create") and isinstance(client, clamd.ClamdUnixSocket):  # type: ignore[union-attr]
+            try:
+                return _clamd_fildes_scan(client.unix_socket, file_content, client.timeout)
+            except OSError as exc:
+                logger.warning("ClamAV FILDES scan failed, falling back to INSTREAM: %s", exc)
+        # instream reads the upload as a file object in INSTREAM-sized
+        # frames; BytesIO shares the bytes buffer rather than copying it
+        return client.instream(BytesIO(file_content))  # type: ignore[union-attr]
+
+    def _detect_mime(self, file_content: bytes) -> str:
+        """Detect the MIME type with Magika, falling back to libmagic."""
+        if self._magika is not None:
+            try:
+                output = self._magika.identify_bytes(file_content).output
+            except Exception as exc:  # pragma: no cover - defensive
+                logger.warning("Magika detection failed, using libmagic: %s", exc)
+            else:
+                label = str(output.label)
+                if output.mime_type in self.ALLOWED_MIMES:
+                    return output.mime_type
+                # Magika labels text by its format; only plain prose formats
+                # count as text/plain. HTML, SVG, scripts and other active
+                # text keep their own MIME type so the allow-list rejects them.
+                if label in _MAGIKA_PLAIN_TEXT_LABELS:
+                    return "text/plain"
+                if label != "unknown":
+                    return output.mime_type
+        return self.mime_detector.from_buffer(file_content[:2048])
+
     async def validate_file(self, file_content: bytes, original_filename: str | None) -> Tuple[str, str]:
-        """Validate uploaded file and return (mime_type, extension)."""
+        """Validate uploaded file and return (mime_type, extension).
+
+        Checks run cheapest first, so most rejected uploads never reach the
+        hash or the malware scan: size, MIME type, extension, then (for
+        content not validated recently) the DOCX macro probe and ClamAV.
+        """
 
         file_size = len(file_content)
         if file_size > settings.MAX_UPLOAD_SIZE:
@@ -83,8 +302,11 @@ class FileValidator:
         if file_size == 0:
             raise HTTPException(400, "Empty file uploaded")
 
+        safe_name = (Path(original_filename or "uploaded").name).replace("\x00", "")
+
         try:
-            actual_mime = self.mime_detector.from_buffer(file_content[:2048])
+            # MIME detection and clamd calls block, so run them off the event loop
+            actual_mime = await asyncio.to_thread(self._detect_mime, file_content)
         except Exception as exc:  # pragma: no cover - defensive
             logger.error("Magic number detection failed: %s", exc)
             raise HTTPException(400, "Unable to determine file type")
@@ -95,16 +317,12 @@ class FileValidator:
                 f"File type not allowed. Detected: {actual_mime}. Allowed: PDF, DOCX, TXT, PNG, JPEG",
             )
 
-        safe_name = (Path(original_filename or "uploaded").name).replace("\x00", "")
         original_extension = Path(safe_name).suffix.lower()
         normalized_original_extension = self.EXTENSION_NORMALIZATION.get(
             original_extension, original_extension
         )
         expected_extension = self.EXTENSION_MAP.get(actual_mime, ".bin")
-        valid_extensions = {expected_extension}
-        for alias, canonical in self.EXTENSION_NORMALIZATION.items():
-            if canonical == expected_extension:
-                valid_extensions.add(alias)
+        valid_extensions = self.VALID_EXTENSIONS_BY_MIME.get(actual_mime, frozenset({expected_extension}))
 
         if normalized_original_extension and normalized_original_extension not in valid_extensions:
             security_logger.warning(
@@ -121,9 +339,64 @@ class FileValidator:
                 "File extension does not match the detected file type. Please upload a valid file.",
             )
 
+        # Identical bytes that passed the scans recently are not rescanned.
+        # The key must be collision-resistant, or crafted content could
+        # inherit a clean verdict, so it is a cryptographic digest rather
+        # than a fast hash. Both digests release the GIL, so large uploads
+        # arriving together are hashed in parallel on worker threads.
+        if file_size <= _INLINE_HASH_MAX_BYTES:
+            checksum = self._digest(file_content)
+        else:
+            checksum = await asyncio.to_thread(self._digest, file_content)
+        cached = self._verdicts.get(checksum) == actual_mime
+
+        if not cached and await self._scan_content(file_content, actual_mime, safe_name, original_filename):
+            self._verdicts[checksum] = actual_mime
+
+        logger.debug(
+            "file_validated",
+            extra={
+                "filename": safe_name,
+                "mime": actual_mime,
+                "size": file_size,
+                self._digest_name: checksum,
+                "cached": cached,
+            },
+        )
+
+        return actual_mime, expected_extension
+
+    async def _scan_content(
+        self, file_content: bytes, actual_mime: str, safe_name: str, original_filename: str | None
+    ) -> bool:
+        """Run the macro and malware checks; return whether ClamAV scanned the file clean.
+
+        Only a True result may be cached: when ClamAV is unavailable, errors
+        or gives no verdict, the file passes unscanned and must be scanned
+        again on its next upload.
+        """
+        if actual_mime == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
+            # Basic macro detection for DOCX files – block if vba project present
+            try:
+                has_vba = _docx_has_vba(file_content)
+            except zipfile.BadZipFile:
+                raise HTTPException(400, "Corrupted document upload.")
+            if has_vba:
+                security_logger.warning(
+                    "docx_macro_blocked",
+                    extra={"filename": safe_name},
+                )
+                raise HTTPException(
+                    400,
+                    "Macro-enabled Word documents are not allowed. Please remove macros and try again.",
+                )
+
+        scanned_clean = False
+
         if self.clamav_available and self._clamd_client is not None:
             try:
-                scan_result = self._clamd_client.instream(file_content)  # type: ignore[attr-defined]
+                async with self._scan_semaphore:
+                    scan_result = await asyncio.to_thread(self._clamd_scan, file_content)
             except Exception as exc:  # pragma: no cover - environment dependent
                 logger.error("ClamAV scan failed: %s", exc)
             else:
@@ -145,36 +418,9 @@ class FileValidator:
                             400,
                             "File failed security scan. Please contact support if this persists.",
                         )
+                    scanned_clean = status == "OK"
 
-        if actual_mime == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
-            # Basic macro detection for DOCX files – block if vba project present
-            try:
-                with zipfile.ZipFile(BytesIO(file_content)) as archive:
-                    if any(name.endswith("vbaProject.bin") for name in archive.namelist()):
-                        security_logger.warning(
-                            "docx_macro_blocked",
-                            extra={"filename": safe_name},
-                        )
-                        raise HTTPException(
-                            400,
-                            "Macro-enabled Word documents are not allowed. Please remove macros and try again.",
-                        )
-            except zipfile.BadZipFile:
-                raise HTTPException(400, "Corrupted document upload.")
-
-        checksum = hashlib.sha256(file_content).hexdigest()
-        logger.debug(
-            "file_validated",
-            extra={
-                "filename": safe_name,
-                "mime": actual_mime,
-                "size": file_size,
-                "sha256": checksum,
-            },
-        )
-
-        extension = self.EXTENSION_MAP.get(actual_mime, ".bin")
-        return actual_mime, extension
+        return scanned_clean
 
 
 file_validator = FileValidator()
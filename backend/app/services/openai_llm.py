@@ -16,9 +16,18 @@ from typing import AsyncGenerator, Dict, Optional
 from app.config import settings
 
 try:  # pragma: no cover - import guard for environments without SDK
-    from openai import AsyncOpenAI
+    from openai import AsyncOpenAI, DefaultAsyncHttpxClient
 except Exception:  # pragma: no cover
     AsyncOpenAI = None  # type: ignore
+    DefaultAsyncHttpxClient = None  # type: ignore
+
+# httpx negotiates HTTP/2 via ALPN when h2 is installed (httpx[http2]);
+# plain-http endpoints such as a local ChatMock stay on HTTP/1.1
+try:  # pragma: no cover - optional dependency
+    import h2  # noqa: F401
+    _HTTP2_AVAILABLE = True
+except ImportError:  # pragma: no cover
+    _HTTP2_AVAILABLE = False
 
 
 class OpenAILLMService:
@@ -32,7 +41,13 @@ class OpenAILLMService:
 
         base_url = settings.OPENAI_BASE_URL or "http://127.0.0.1:8801/v1"
         api_key = settings.OPENAI_API_KEY or "x"  # ChatMock accepts any non-empty key
-        self.client = AsyncOpenAI(base_url=base_url, api_key=api_key)
+        # One keep-alive connection pool for the service's lifetime, so
+        # streamed requests multiplex over a warm connection
+        self.client = AsyncOpenAI(
+            base_url=base_url,
+            api_key=api_key,
+            http_client=DefaultAsyncHttpxClient(http2=_HTTP2_AVAILABLE),
+        )
 
     async def generate_completion(
         self,
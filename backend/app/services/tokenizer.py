@@ -0,0 +1,35 @@
+"""Shared tiktoken encoder lookup.
+
+tiktoken is optional: without it (or offline, before an encoding has been
+downloaded) get_encoder returns None and callers fall back to heuristics.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Any, Optional
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - optional dependency
+    tiktoken = None  # type: ignore
+
+DEFAULT_ENCODING = "o200k_base"
+
+
+@lru_cache(maxsize=8)
+def get_encoder(model: Optional[str] = None) -> Optional[Any]:
+    """Return the tiktoken encoding for a model, or None if unavailable."""
+    if tiktoken is None:
+        return None
+    try:
+        if model:
+            try:
+                return tiktoken.encoding_for_model(model)
+            except KeyError:
+                # Model unknown to this tiktoken release: use the current OpenAI encoding
+                pass
+        return tiktoken.get_encoding(DEFAULT_ENCODING)
+    except Exception:
+        # Encodings are downloaded on first use; offline hosts keep the heuristic
+        return None
@@ -0,0 +1,56 @@
+"""Materialized 7/30/90-day window rollups for the performance dashboard
+
+Revision ID: 009_user_window_stats
+Revises: 008_questions
+Create Date: 2026-10-16
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+
+revision = '009_user_window_stats'
+down_revision = '008_questions'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # One row per (user, window). The trend's first half ends at current_date - window/2;
+    # the second half is the window total minus the first half. as_of records the
+    # refresh date the windows are anchored to, so readers can tell a stale view.
+    op.execute(
+        """
+        CREATE MATERIALIZED VIEW user_window_stats AS
+        SELECT
+            d.user_id,
+            w.window_days,
+            current_date AS as_of,
+            SUM(d.questions_attempted) AS questions,
+            SUM(d.questions_correct) AS correct,
+            SUM(d.total_study_minutes) AS minutes,
+            SUM(d.sessions_count) AS sessions,
+            COUNT(d.unique_topics_studied) AS topics,
+            SUM(d.questions_attempted) FILTER (
+                WHERE d.stat_date < current_date - w.window_days / 2
+            ) AS first_attempts,
+            SUM(d.questions_correct) FILTER (
+                WHERE d.stat_date < current_date - w.window_days / 2
+            ) AS first_correct
+        FROM daily_user_stats d
+        JOIN (VALUES (7), (30), (90)) AS w(window_days)
+            ON d.stat_date >= current_date - w.window_days
+            AND d.stat_date <= current_date
+        GROUP BY d.user_id, w.window_days
+        """
+    )
+    # Unique index is required for REFRESH ... CONCURRENTLY
+    op.execute(
+        "CREATE UNIQUE INDEX ux_user_window_stats_user_window "
+        "ON user_window_stats (user_id, window_days)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS user_window_stats")
@@ -0,0 +1,49 @@
+"""Materialized radar view: topic mastery with topic names inlined
+
+Revision ID: 010_topic_mastery_radar
+Revises: 009_user_window_stats
+Create Date: 2026-10-16
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+
+revision = '010_topic_mastery_radar'
+down_revision = '009_user_window_stats'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        CREATE MATERIALIZED VIEW topic_mastery_radar AS
+        SELECT
+            tm.user_id,
+            tm.topic_id,
+            t.name AS topic_name,
+            tm.mastery_score,
+            tm.retention_rate,
+            tm.questions_attempted,
+            tm.avg_response_time_seconds,
+            tm.last_studied_at
+        FROM topic_mastery tm
+        JOIN topics t ON tm.topic_id = t.id
+        """
+    )
+    # Unique index is required for REFRESH ... CONCURRENTLY
+    op.execute(
+        "CREATE UNIQUE INDEX ux_topic_mastery_radar_user_topic "
+        "ON topic_mastery_radar (user_id, topic_id)"
+    )
+    # Matches the radar's ORDER BY so top-N is an index range scan, not a sort
+    op.execute(
+        "CREATE INDEX ix_topic_mastery_radar_user_rank "
+        "ON topic_mastery_radar (user_id, questions_attempted DESC, mastery_score DESC)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS topic_mastery_radar")
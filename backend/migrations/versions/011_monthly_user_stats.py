@@ -0,0 +1,48 @@
+"""Materialized calendar-month rollup of daily_user_stats
+
+Revision ID: 011_monthly_user_stats
+Revises: 010_topic_mastery_radar
+Create Date: 2026-10-16
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+
+revision = '011_monthly_user_stats'
+down_revision = '010_topic_mastery_radar'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # One row per (user, calendar month). Long ad-hoc performance windows read
+    # whole months from here and only the partial edge months from daily rows.
+    # Totals are cast back to integer so a UNION ALL with the int4 daily
+    # columns stays integer, and the window SUMs over it stay bigint rather
+    # than numeric.
+    op.execute(
+        """
+        CREATE MATERIALIZED VIEW monthly_user_stats AS
+        SELECT
+            d.user_id,
+            date_trunc('month', d.stat_date)::date AS month_start,
+            SUM(d.questions_attempted)::integer AS questions_attempted,
+            SUM(d.questions_correct)::integer AS questions_correct,
+            SUM(d.total_study_minutes)::integer AS total_study_minutes,
+            SUM(d.sessions_count)::integer AS sessions_count,
+            COUNT(d.unique_topics_studied)::integer AS active_days
+        FROM daily_user_stats d
+        GROUP BY d.user_id, date_trunc('month', d.stat_date)
+        """
+    )
+    # Unique index is required for REFRESH ... CONCURRENTLY
+    op.execute(
+        "CREATE UNIQUE INDEX ux_monthly_user_stats_user_month "
+        "ON monthly_user_stats (user_id, month_start)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS monthly_user_stats")
@@ -154,17 +154,22 @@ async def ingest_pdf(path: Path, enable_ocr: bool = False) -> None:
 
             # After commit, re-query chunks for IDs, then embed
             await session.refresh(material)
-            for chunk in material.chunks:
-                if chunk.content in chunks:  # simple heuristic to avoid re-embedding everything
-                    svc.store_chunk_embedding(
-                        chunk_id=str(chunk.id),
-                        text=chunk.content,
-                        metadata={
-                            "material_id": str(material.id),
-                            "chunk_index": int(chunk.chunk_index),
-                            "filename": material.filename,
-                        },
-                    )
+            page_chunks = [
+                c for c in material.chunks
+                if c.content in chunks  # simple heuristic to avoid re-embedding everything
+            ]
+            svc.store_chunk_embeddings(
+                chunk_ids=[str(c.id) for c in page_chunks],
+                texts=[c.content for c in page_chunks],
+                metadatas=[
+                    {
+                        "material_id": str(material.id),
+                        "chunk_index": int(c.chunk_index),
+                        "filename": material.filename,
+                    }
+                    for c in page_chunks
+                ],
+            )
 
         print(f"[ingest] Ingested {total_chunks} chunks from {path.name}")
 
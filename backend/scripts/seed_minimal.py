@@ -128,15 +128,14 @@ async def seed_materials(session) -> None:
         chunk_rows = [(str(i), c, int(idx)) for (i, c, idx) in result.all()]
 
         svc = get_embedding_service()
-        for chunk_id, content, idx in chunk_rows:
-            svc.store_chunk_embedding(
-                chunk_id=chunk_id,
-                text=content,
-                metadata={
-                    "material_id": str(material.id),
-                    "chunk_index": idx,
-                },
-            )
+        svc.store_chunk_embeddings(
+            chunk_ids=[chunk_id for chunk_id, _, _ in chunk_rows],
+            texts=[content for _, content, _ in chunk_rows],
+            metadatas=[
+                {"material_id": str(material.id), "chunk_index": idx}
+                for _, _, idx in chunk_rows
+            ],
+        )
         print("[seed] Stored embeddings for", len(material.chunks), "chunks.")
     except Exception as e:
         print("[seed] Skipped embeddings:", e)
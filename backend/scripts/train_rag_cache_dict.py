@@ -0,0 +1,71 @@
+"""
+Train the zstd dictionary used to compress cached RAG chunk lists.
+
+Samples existing rag:u:* entries from Redis, trains a 16 KB dictionary on
+their JSON and writes it to app/services/rag_cache.zdict, where
+RagCacheService picks it up on the next start.
+
+Usage:
+    python scripts/train_rag_cache_dict.py [max_samples]
+
+Retraining changes the dictionary ID, so entries compressed with the old
+dictionary read as cache misses until they expire.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # add backend/ to import path
+
+import orjson  # noqa: E402
+import zstandard  # noqa: E402
+from redis.asyncio import Redis  # noqa: E402
+
+from app.config import settings  # type: ignore  # noqa: E402
+from app.services.cache_rag import ZSTD_DICT_PATH, _decode_chunks  # type: ignore  # noqa: E402
+
+DICT_SIZE = 16 * 1024
+
+
+async def collect_samples(max_samples: int) -> list[bytes]:
+    client = Redis(
+        host=settings.REDIS_HOST,
+        port=settings.REDIS_PORT,
+        db=settings.REDIS_DB,
+        password=settings.REDIS_PASSWORD,
+    )
+    samples: list[bytes] = []
+    try:
+        async for key in client.scan_iter(match="rag:u:*", count=500):
+            raw = await client.get(key)
+            if not raw:
+                continue
+            try:
+                samples.append(orjson.dumps(_decode_chunks(raw)))
+            except Exception as e:
+                print("[dict] Skipped", key, e)
+            if len(samples) >= max_samples:
+                break
+    finally:
+        await client.aclose()
+    return samples
+
+
+async def main() -> None:
+    max_samples = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    samples = await collect_samples(max_samples)
+    print("[dict] Collected", len(samples), "cached chunk lists")
+
+    try:
+        trained = zstandard.train_dictionary(DICT_SIZE, samples)
+    except zstandard.ZstdError as e:
+        print("[dict] Training failed (need more cached queries?):", e)
+        sys.exit(1)
+
+    ZSTD_DICT_PATH.write_bytes(trained.as_bytes())
+    print("[dict] Wrote", ZSTD_DICT_PATH, "dict_id", trained.dict_id())
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -43,11 +43,55 @@ class StubResult:
         return self._value
 
 
+class StubPipeline:
+    def __init__(self, store):
+        self.store = store
+        self.queued = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_exc):
+        return False
+
+    def unlink(self, *keys):
+        self.queued.append(keys)
+
+    async def execute(self):
+        results = [
+            sum(self.store.pop(key, None) is not None for key in keys)
+            for keys in self.queued
+        ]
+        self.queued = []
+        return results
+
+
+class StubRedis:
+    """Redis client stub covering SCAN and pipelined UNLINK only."""
+
+    def __init__(self, keys):
+        self.store = dict.fromkeys(keys, b"")
+        self.get = self.set = self.setex = None
+
+    async def scan_iter(self, match, count):
+        prefix = match.rstrip("*")
+        for key in [key for key in self.store if key.startswith(prefix)]:
+            yield key
+
+    def pipeline(self, transaction):
+        return StubPipeline(self.store)
+
+
 @pytest.fixture
 def stub_session() -> StubSession:
     return StubSession()
 
 
+@pytest.fixture
+def stub_redis():
+    return StubRedis
+
+
 @pytest.fixture
 def client(monkeypatch, tmp_path, stub_session: StubSession) -> TestClient:
     upload_dir = Path(tmp_path) / "uploads"
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import os
+import uuid
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import ProgrammingError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+# (days ago, questions attempted, questions correct)
+DAILY_ROWS = [(1, 10, 8), (40, 20, 10), (100, 5, 5)]
+
+
+@pytest.mark.integration
+@pytest.mark.asyncio
+async def test_dashboard_views_return_integer_totals():  # pragma: no cover - requires database
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL not configured")
+
+    engine = create_async_engine(TEST_DATABASE_URL)
+    user_id = uuid.uuid4()
+
+    async with engine.connect() as connection:
+        # Everything, including the non-concurrent refreshes, is rolled back
+        transaction = await connection.begin()
+        try:
+            try:
+                await connection.execute(
+                    text(
+                        "INSERT INTO users (id, email, password_hash) "
+                        "VALUES (:id, :email, 'unused')"
+                    ),
+                    {"id": user_id, "email": f"{user_id.hex}@example.com"},
+                )
+                for days_ago, attempted, correct in DAILY_ROWS:
+                    await connection.execute(
+                        text(
+                            """
+                            INSERT INTO daily_user_stats (
+                                id, user_id, stat_date, questions_attempted, questions_correct
+                            ) VALUES (
+                                :id, :user_id, current_date - :days_ago, :attempted, :correct
+                            )
+                            """
+                        ),
+                        {
+                            "id": uuid.uuid4(),
+                            "user_id": user_id,
+                            "days_ago": days_ago,
+                            "attempted": attempted,
+                            "correct": correct,
+                        },
+                    )
+                for view in ("user_window_stats", "monthly_user_stats"):
+                    await connection.execute(text(f"REFRESH MATERIALIZED VIEW {view}"))
+            except ProgrammingError as exc:  # pragma: no cover - depends on schema state
+                pytest.skip(f"Analytics views unavailable: {exc}")
+
+            window_rows = (
+                await connection.execute(
+                    text(
+                        "SELECT window_days, questions, as_of = current_date AS current "
+                        "FROM user_window_stats WHERE user_id = :user_id"
+                    ),
+                    {"user_id": user_id},
+                )
+            ).all()
+
+            # The window aggregate unions daily rows with month rows (see _window_stmt)
+            rollup_total = (
+                await connection.execute(
+                    text(
+                        """
+                        SELECT SUM(questions_attempted) FROM (
+                            SELECT questions_attempted FROM daily_user_stats
+                            WHERE user_id = :user_id
+                            UNION ALL
+                            SELECT questions_attempted FROM monthly_user_stats
+                            WHERE user_id = :user_id
+                        ) source
+                        """
+                    ),
+                    {"user_id": user_id},
+                )
+            ).scalar_one()
+        finally:
+            await transaction.rollback()
+
+    await engine.dispose()
+
+    assert {row.window_days: row.questions for row in window_rows} == {7: 10, 30: 10, 90: 30}
+    assert all(row.current for row in window_rows)
+    assert isinstance(rollup_total, int)
+    assert rollup_total == 70
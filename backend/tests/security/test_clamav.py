@@ -69,3 +69,87 @@ def test_clean_file_passes_when_scanner_ok(monkeypatch):
     file_validator.mime_detector = original_mime_detector
     file_validator.clamav_available = original_clamav_available
     file_validator._clamd_client = original_client
+
+
+def test_scanner_receives_readable_stream(monkeypatch):
+    original_client = getattr(file_validator, "_clamd_client", None)
+    original_clamav_available = file_validator.clamav_available
+
+    monkeypatch.setattr(
+        file_validator,
+        "mime_detector",
+        SimpleNamespace(from_buffer=lambda _buffer: "text/plain"),
+    )
+
+    scanned = []
+
+    class RecordingClient:
+        def instream(self, buff):
+            # clamd reads the upload in fixed-size frames
+            chunk = buff.read(1024)
+            while chunk:
+                scanned.append(chunk)
+                chunk = buff.read(1024)
+            return {"stream": ("OK", None)}
+
+    file_validator.clamav_available = True
+    file_validator._clamd_client = RecordingClient()
+
+    content = b"plain text line\n" * 500
+    result = asyncio.run(file_validator.validate_file(content, "notes.txt"))
+    assert result == ("text/plain", ".txt")
+    assert b"".join(scanned) == content
+
+    file_validator.clamav_available = original_clamav_available
+    file_validator._clamd_client = original_client
+
+
+def test_repeat_upload_reuses_verdict(monkeypatch):
+    original_client = getattr(file_validator, "_clamd_client", None)
+    original_clamav_available = file_validator.clamav_available
+
+    monkeypatch.setattr(
+        file_validator,
+        "mime_detector",
+        SimpleNamespace(from_buffer=lambda _buffer: "text/plain"),
+    )
+
+    scans = []
+
+    class CountingClient:
+        def instream(self, buff):
+            scans.append(buff.read())
+            return {"stream": ("OK", None)}
+
+    file_validator.clamav_available = True
+    file_validator._clamd_client = CountingClient()
+
+    content = b"repeat upload body"
+    assert asyncio.run(file_validator.validate_file(content, "first.txt")) == ("text/plain", ".txt")
+    assert asyncio.run(file_validator.validate_file(content, "second.txt")) == ("text/plain", ".txt")
+    assert len(scans) == 1
+
+    file_validator.clamav_available = original_clamav_available
+    file_validator._clamd_client = original_client
+
+
+@pytest.mark.parametrize("scanner", ["unavailable", "error"])
+def test_unscanned_upload_verdict_not_cached(monkeypatch, scanner):
+    monkeypatch.setattr(
+        file_validator,
+        "mime_detector",
+        SimpleNamespace(from_buffer=lambda _buffer: "text/plain"),
+    )
+
+    class FailingClient:
+        def instream(self, _buff):
+            raise ConnectionError("clamd down")
+
+    monkeypatch.setattr(file_validator, "clamav_available", scanner != "unavailable")
+    monkeypatch.setattr(file_validator, "_clamd_client", FailingClient())
+
+    content = f"uploaded while clamd is {scanner}".encode()
+    assert asyncio.run(file_validator.validate_file(content, "notes.txt")) == ("text/plain", ".txt")
+
+    checksum = file_validator._digest(content)
+    assert checksum not in file_validator._verdicts
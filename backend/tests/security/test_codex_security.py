@@ -214,7 +214,7 @@ class TestModelNameValidation:
 
 
 class TestSafeCommandBuilder:
-    """Test safe command building with shlex.quote."""
+    """Test safe command building for argument-list exec."""
 
     def test_basic_command_building(self):
         """Test basic command construction."""
@@ -226,7 +226,7 @@ class TestSafeCommandBuilder:
 
         assert cmd[0] == cli_path
         assert cmd[1] == "exec"
-        # Prompt should be shell-quoted
+        # Prompt is passed as-is (no shell, so no quoting)
         assert "What is the heart?" in cmd[2]
         assert "--model" in cmd
         assert "gpt-5" in cmd[-1]
@@ -263,6 +263,9 @@ class TestCodexLLMServiceSecurity:
         mock_process.returncode = 0
         mock_process.stdout = AsyncMock()
         mock_process.stderr = AsyncMock()
+        # Real pipes return bytes; EOF unless a test feeds output
+        mock_process.stdout.read = AsyncMock(return_value=b"")
+        mock_process.stderr.read = AsyncMock(return_value=b"")
         mock_process.wait = AsyncMock(return_value=0)
         mock_process.kill = Mock()
         return mock_process
@@ -333,13 +336,56 @@ class TestCodexLLMServiceSecurity:
                 async for _ in service.generate_completion(huge_prompt):
                     pass
 
+    @pytest.mark.asyncio
+    async def test_unterminated_output_is_bounded(self, mock_subprocess):
+        """Test that output without newlines can't grow the buffer unbounded."""
+        valid_path = list(ALLOWED_CLI_PATHS)[0]
+
+        block = b"a" * (64 * 1024)
+        mock_subprocess.stdout.read = AsyncMock(side_effect=[block] * 1024 + [b""])
+
+        with patch("os.path.exists", return_value=True), \
+             patch("os.access", return_value=True), \
+             patch("asyncio.create_subprocess_exec", return_value=mock_subprocess):
+
+            service = CodexLLMService(cli_path=valid_path)
+
+            with pytest.raises(RuntimeError, match="exceeded size limit"):
+                async for _ in service.generate_completion("Normal prompt"):
+                    pass
+
+        # Rejected once past the limit, long before the stream was drained
+        assert mock_subprocess.stdout.read.await_count < 1024
+
+    @pytest.mark.asyncio
+    async def test_events_split_across_reads(self, mock_subprocess):
+        """Test that events are reassembled when reads split them mid-line."""
+        valid_path = list(ALLOWED_CLI_PATHS)[0]
+
+        events = b"".join(
+            b'{"type":"item.completed","item":{"type":"agent_message","text":"%s"}}\n' % text
+            for text in (b"first", b"second", b"third")
+        )
+        blocks = [events[:10], events[10:75], events[75:76], events[76:-1], events[-1:]]
+        mock_subprocess.stdout.read = AsyncMock(side_effect=blocks + [b""])
+
+        with patch("os.path.exists", return_value=True), \
+             patch("os.access", return_value=True), \
+             patch("asyncio.create_subprocess_exec", return_value=mock_subprocess):
+
+            service = CodexLLMService(cli_path=valid_path)
+
+            received = [text async for text in service.generate_completion("Normal prompt")]
+
+        assert received == ["first", "second", "third"]
+
     @pytest.mark.asyncio
     async def test_subprocess_exec_not_shell(self, mock_subprocess):
         """Test that subprocess uses exec mode (not shell=True)."""
         valid_path = list(ALLOWED_CLI_PATHS)[0]
 
         mock_create_subprocess = AsyncMock(return_value=mock_subprocess)
-        mock_subprocess.stdout.readline = AsyncMock(side_effect=[b"", b""])
+        mock_subprocess.stdout.read = AsyncMock(side_effect=[b"", b""])
 
         with patch("os.path.exists", return_value=True), \
              patch("os.access", return_value=True), \
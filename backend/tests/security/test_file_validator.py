@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import asyncio
+import io
+import struct
+import zipfile
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.services.file_validator import _docx_has_vba, file_validator
+
+
+HTML_PAYLOAD = b"<!DOCTYPE html>\n<html><body><script>alert(1)</script></body></html>\n"
+SVG_PAYLOAD = (
+    b'<?xml version="1.0"?>\n'
+    b'<svg xmlns="http://www.w3.org/2000/svg"><script>alert(1)</script></svg>\n'
+)
+
+
+class FakeMagika:
+    def __init__(self, label: str, mime_type: str, is_text: bool = True):
+        self._output = SimpleNamespace(label=label, mime_type=mime_type, is_text=is_text)
+
+    def identify_bytes(self, _content):
+        return SimpleNamespace(output=self._output)
+
+
+@pytest.fixture
+def no_clamav(monkeypatch):
+    monkeypatch.setattr(file_validator, "clamav_available", False)
+
+
+@pytest.mark.parametrize("payload", [HTML_PAYLOAD, SVG_PAYLOAD])
+def test_markup_named_txt_rejected_by_libmagic(monkeypatch, no_clamav, payload):
+    monkeypatch.setattr(file_validator, "_magika", None)
+
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(file_validator.validate_file(payload, "notes.txt"))
+
+    assert excinfo.value.status_code == 400
+    assert "not allowed" in str(excinfo.value.detail)
+
+
+@pytest.mark.parametrize(
+    ("payload", "label", "mime_type"),
+    [
+        (HTML_PAYLOAD, "html", "text/html"),
+        (SVG_PAYLOAD, "svg", "image/svg+xml"),
+        (b"#!/bin/sh\nrm -rf /tmp/x\n", "shell", "text/x-shellscript"),
+    ],
+)
+def test_active_text_named_txt_rejected_by_magika(monkeypatch, no_clamav, payload, label, mime_type):
+    monkeypatch.setattr(file_validator, "_magika", FakeMagika(label, mime_type))
+
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(file_validator.validate_file(payload, "notes.txt"))
+
+    assert excinfo.value.status_code == 400
+    assert mime_type in str(excinfo.value.detail)
+
+
+def test_markdown_accepted_as_plain_text(monkeypatch, no_clamav):
+    monkeypatch.setattr(file_validator, "_magika", FakeMagika("markdown", "text/markdown"))
+
+    result = asyncio.run(file_validator.validate_file(b"# Notes\n\n- item\n", "notes.txt"))
+
+    assert result == ("text/plain", ".txt")
+
+
+def _zip_bytes(names, comment: bytes = b"") -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name in names:
+            archive.writestr(name, "<xml/>")
+        archive.comment = comment
+    return buffer.getvalue()
+
+
+DOCX_NAMES = ["[Content_Types].xml", "_rels/.rels", "word/document.xml"]
+
+
+def test_docx_probe_clean_document():
+    assert _docx_has_vba(_zip_bytes(DOCX_NAMES)) is False
+
+
+def test_docx_probe_finds_vba_project():
+    assert _docx_has_vba(_zip_bytes(DOCX_NAMES + ["word/vbaProject.bin"])) is True
+
+
+def test_docx_probe_ignores_similar_names():
+    assert _docx_has_vba(_zip_bytes(DOCX_NAMES + ["word/vbaProject.bin.bak"])) is False
+
+
+def test_docx_probe_skips_eocd_signature_in_comment():
+    archive = _zip_bytes(DOCX_NAMES + ["word/vbaProject.bin"], comment=b"PK\x05\x06 not a record")
+    assert _docx_has_vba(archive) is True
+
+
+def test_docx_probe_handles_prepended_data():
+    archive = b"\x00" * 512 + _zip_bytes(DOCX_NAMES + ["word/vbaProject.bin"])
+    assert _docx_has_vba(archive) is True
+
+
+@pytest.mark.parametrize("with_vba", [False, True])
+def test_docx_probe_reads_zip64_archives(monkeypatch, with_vba):
+    # Force zipfile to write zip64 end records for a small archive
+    monkeypatch.setattr(zipfile, "ZIP_FILECOUNT_LIMIT", 1)
+    names = DOCX_NAMES + (["word/vbaProject.bin"] if with_vba else [])
+    archive = _zip_bytes(names)
+    assert b"PK\x06\x07" in archive
+
+    assert _docx_has_vba(archive) is with_vba
+
+
+def test_docx_probe_sees_entries_beyond_stated_count():
+    archive = bytearray(_zip_bytes(DOCX_NAMES + ["word/vbaProject.bin"]))
+    eocd = archive.rfind(b"PK\x05\x06")
+    # Understate both entry counts so the macro entry falls outside them
+    struct.pack_into("<HH", archive, eocd + 8, 1, 1)
+
+    with pytest.raises(zipfile.BadZipFile):
+        _docx_has_vba(bytes(archive))
+
+
+@pytest.mark.parametrize(
+    "mangle",
+    [
+        lambda data: data[:-10],  # truncated end record
+        lambda data: data[: len(data) // 2],  # truncated directory
+        lambda data: data.replace(b"PK\x01\x02", b"XX\x01\x02", 1),  # corrupt entry header
+        lambda data: b"not a zip archive at all",
+    ],
+)
+def test_docx_probe_fails_closed_on_corruption(mangle):
+    with pytest.raises(zipfile.BadZipFile):
+        _docx_has_vba(mangle(_zip_bytes(DOCX_NAMES + ["word/vbaProject.bin"])))
+
+
+def test_corrupt_docx_upload_rejected(monkeypatch, no_clamav):
+    docx_mime = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+    monkeypatch.setattr(file_validator, "_magika", None)
+    monkeypatch.setattr(
+        file_validator, "mime_detector", SimpleNamespace(from_buffer=lambda _buffer: docx_mime)
+    )
+
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(file_validator.validate_file(_zip_bytes(DOCX_NAMES)[:-10], "report.docx"))
+
+    assert excinfo.value.status_code == 400
+    assert "Corrupted" in str(excinfo.value.detail)
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import datetime
+import uuid
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import msgpack
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import InvalidRequestError
+
+from app.services.analytics.view_refresher import view_refresher
+
+try:
+    from app.services.analytics_service import AnalyticsService, _rollup_months, _window_stmt
+except InvalidRequestError as exc:  # pragma: no cover - depends on model registry
+    # app.models.questions and app.models.analytics_events both map question_attempts
+    pytest.skip(f"analytics models can't be imported together: {exc}", allow_module_level=True)
+
+
+TODAY = datetime.date(2026, 10, 16)
+
+
+def _bounds(*windows):
+    return {
+        days: (
+            TODAY - datetime.timedelta(days=days),
+            TODAY - datetime.timedelta(days=days // 2),
+        )
+        for days in windows
+    }
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def mappings(self):
+        return self
+
+    def all(self):
+        return self._rows
+
+    def first(self):
+        return self._rows[0] if self._rows else None
+
+
+class FakeSession:
+    def __init__(self):
+        self.statements = []
+
+    async def connection(self):
+        return SimpleNamespace(dialect=SimpleNamespace(name="postgresql", driver="asyncpg"))
+
+    async def execute(self, statement, _params=None):
+        self.statements.append(str(statement.compile(dialect=postgresql.dialect())))
+        return FakeResult([])
+
+
+@pytest.fixture
+def views_fresh(monkeypatch):
+    monkeypatch.setattr(view_refresher, "is_fresh", lambda: True)
+
+
+def test_rollup_months_only_whole_uncut_months():
+    # 90d window: start 2026-07-18, midpoint 2026-09-01 (a month boundary)
+    assert _rollup_months(_bounds(90), TODAY) == [
+        datetime.date(2026, 8, 1),
+        datetime.date(2026, 9, 1),
+    ]
+    # A 40d window (start 2026-09-06) cuts September, so only August rolls up
+    assert _rollup_months(_bounds(90, 40), TODAY) == [datetime.date(2026, 8, 1)]
+
+
+def test_window_stmt_rollup_reads_monthly_view():
+    plain = str(_window_stmt((120,)).compile(dialect=postgresql.dialect()))
+    rollup = str(_window_stmt((120,), rollup=True).compile(dialect=postgresql.dialect()))
+
+    assert "monthly_user_stats" not in plain
+    assert "monthly_user_stats" in rollup
+    assert "UNION ALL" in rollup
+
+
+@pytest.mark.asyncio
+async def test_window_metrics_are_floats_and_cacheable():
+    # Numeric SUMs come back from asyncpg as Decimal
+    row = {
+        "w120_questions": Decimal("40"),
+        "w120_correct": Decimal("30"),
+        "w120_minutes": Decimal("300"),
+        "w120_sessions": Decimal("6"),
+        "w120_topics": Decimal("5"),
+        "w120_first_attempts": Decimal("20"),
+        "w120_first_correct": Decimal("10"),
+    }
+    service = AnalyticsService(db=None)
+    service._fetch_window_row = AsyncMock(return_value=row)
+
+    result, _ttl = await service._build_performance_windows(uuid.uuid4(), [120], False)
+
+    window = result["120d"]
+    assert type(window["accuracy_rate"]) is float
+    assert window["accuracy_rate"] == 0.75
+    assert window["questions_attempted"] == 40
+    assert window["trend"] == "improving"
+    msgpack.packb(result, use_bin_type=True)
+
+
+@pytest.mark.asyncio
+async def test_window_row_skips_views_unless_refreshed():
+    session = FakeSession()
+    service = AnalyticsService(db=session)
+
+    await service._fetch_window_row(uuid.uuid4(), _bounds(7, 30, 90), TODAY)
+    await service._fetch_window_row(uuid.uuid4(), _bounds(120), TODAY)
+
+    assert not any("user_window_stats" in sql for sql in session.statements)
+    assert not any("monthly_user_stats" in sql for sql in session.statements)
+
+
+@pytest.mark.asyncio
+async def test_window_row_falls_back_when_view_has_no_current_rows(views_fresh):
+    session = FakeSession()
+    service = AnalyticsService(db=session)
+
+    await service._fetch_window_row(uuid.uuid4(), _bounds(7, 30, 90), TODAY)
+
+    view_sql, live_sql = session.statements
+    assert "user_window_stats" in view_sql
+    assert "as_of" in view_sql
+    assert "daily_user_stats" in live_sql
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fresh", [False, True])
+async def test_radar_reads_view_only_while_refreshed(monkeypatch, fresh):
+    monkeypatch.setattr(view_refresher, "is_fresh", lambda: fresh)
+    service = AnalyticsService(db=FakeSession())
+    service._fetch_json = AsyncMock(return_value=[])
+
+    await service._build_radar(uuid.uuid4(), limit=8, min_attempts=5)
+
+    sql = service._fetch_json.await_args.args[1]
+    assert ("FROM topic_mastery_radar" in sql) is fresh
+    assert ("JOIN topics" in sql) is not fresh
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import datetime
+import enum
+import uuid
+
+import pytest
+
+from app.services.cache import CacheService
+
+
+class Color(enum.Enum):
+    RED = "red"
+
+
+def _round_trip(value):
+    stored = CacheService._serialize(value, compress=True, compress_threshold=1024)
+    return bytes(stored)[:1], CacheService._deserialize(bytes(stored))
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        {"items": [1, 2.5, None, True, "text"]},
+        [{"content": "x" * 4096}],  # compressed
+        2**63 - 1,
+    ],
+)
+def test_plain_json_stored_as_json(value):
+    fmt, restored = _round_trip(value)
+
+    assert fmt == b"J"
+    assert restored == value
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        uuid.UUID(int=1),
+        Color.RED,
+        (1, "a"),
+        {"ids": [uuid.UUID(int=2)]},
+        [(1, 2)],
+        {1: "non-str key"},
+        datetime.datetime(2026, 10, 16, tzinfo=datetime.timezone.utc),
+        2**70,
+    ],
+)
+def test_other_values_keep_their_types(value):
+    fmt, restored = _round_trip(value)
+
+    assert fmt == b"P"
+    assert restored == value
+    assert type(restored) is type(value)
+
+
+def test_nan_keeps_its_value():
+    _fmt, restored = _round_trip(float("nan"))
+
+    assert restored != restored
+
+
+@pytest.mark.asyncio
+async def test_clear_namespace_unlinks_client_side(stub_redis):
+    client = stub_redis([f"rag:{i}" for i in range(5)] + ["other:1"])
+    service = CacheService()
+    service.client = client
+
+    assert await service.clear_namespace("rag") == 5
+    assert list(client.store) == ["other:1"]
@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+import uuid
+
+import pytest
+
+from app.services import cache_rag
+from app.services.cache_rag import RagCacheService
+
+
+@pytest.mark.asyncio
+async def test_invalidate_user_cache_unlinks_in_batches(monkeypatch, stub_redis):
+    monkeypatch.setattr(cache_rag, "_UNLINK_BATCH_SIZE", 2)
+    user_id = uuid.uuid4()
+    other = f"rag:u:{uuid.uuid4()}:q"
+    client = stub_redis([f"rag:u:{user_id}:q{i}" for i in range(5)] + [other])
+
+    deleted = await RagCacheService(client).invalidate_user_cache(user_id)
+
+    assert deleted == 5
+    assert list(client.store) == [other]
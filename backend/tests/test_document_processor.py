@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import pytest
+
+from app.services import document_processor
+from app.services.document_processor import iter_text_chunks, iter_token_chunks
+
+
+class ByteEncoder:
+    """One token per UTF-8 byte: splits every multi-byte character, like
+    byte-level BPE does for rare ones, and decodes with errors="replace"
+    as tiktoken does."""
+
+    def encode_ordinary(self, text):
+        return list(text.encode("utf-8"))
+
+    def decode(self, tokens):
+        return bytes(tokens).decode("utf-8", errors="replace")
+
+    def decode_single_token_bytes(self, token):
+        return bytes([token])
+
+
+@pytest.fixture
+def byte_encoder(monkeypatch):
+    monkeypatch.setattr(document_processor, "get_encoder", lambda: ByteEncoder())
+
+
+@pytest.fixture
+def small_windows(monkeypatch):
+    monkeypatch.setattr(document_processor, "_SPLIT_WINDOW_CHARS", 7)
+
+
+def test_text_chunks_split_by_word_count():
+    words = [f"w{i}" for i in range(7)]
+
+    assert list(iter_text_chunks(" ".join(words), 3)) == [
+        "w0 w1 w2", "w3 w4 w5", "w6",
+    ]
+
+
+def test_text_chunks_across_split_windows(small_windows):
+    words = [f"word{i}" for i in range(10)]
+
+    assert list(iter_text_chunks("\n".join(words), 4)) == [
+        " ".join(words[0:4]), " ".join(words[4:8]), " ".join(words[8:10]),
+    ]
+
+
+def test_text_chunks_reject_non_positive_size():
+    with pytest.raises(ValueError):
+        list(iter_text_chunks("some text", 0))
+
+
+def test_token_chunks_repeat_overlap(byte_encoder):
+    assert list(iter_token_chunks("abcdefghij", 4, 1)) == ["abcd", "defg", "ghij"]
+
+
+def test_token_chunks_emit_tail_past_overlap(byte_encoder):
+    assert list(iter_token_chunks("abcdefghijk", 4, 1)) == ["abcd", "defg", "ghij", "jk"]
+    # Shorter than one chunk: the whole text is the tail
+    assert list(iter_token_chunks("abc", 4, 1)) == ["abc"]
+
+
+def test_token_chunks_across_split_windows(byte_encoder, small_windows):
+    text = "alpha beta gamma delta epsilon"
+
+    chunks = list(iter_token_chunks(text, 8, 0))
+
+    assert "".join(chunks).replace(" ", "") == text.replace(" ", "")
+
+
+@pytest.mark.parametrize("overlap", [0, 2])
+def test_token_chunks_keep_characters_whole(byte_encoder, overlap):
+    # 3-byte CJK characters and 4-byte emoji, so most token edges fall mid-character
+    text = "漢字のテキスト😀𝕏" * 4
+
+    chunks = list(iter_token_chunks(text, 5, overlap))
+
+    assert chunks
+    assert all("�" not in chunk for chunk in chunks)
+    assert all(len(chunk.encode("utf-8")) <= 5 for chunk in chunks)
+    if overlap == 0:
+        assert "".join(chunks) == text
+    else:
+        assert all(chunk in text for chunk in chunks)
+        assert chunks[-1] == text[-len(chunks[-1]):]
+
+
+def test_token_chunks_fall_back_to_words(monkeypatch):
+    monkeypatch.setattr(document_processor, "get_encoder", lambda: None)
+    words = [f"w{i}" for i in range(10)]
+
+    # 8 tokens ~ 6 words
+    assert list(iter_token_chunks(" ".join(words), 8, 2)) == [
+        " ".join(words[:6]), " ".join(words[6:]),
+    ]
+
+
+def test_token_chunks_reject_overlap_not_below_target():
+    with pytest.raises(ValueError):
+        list(iter_token_chunks("text", 4, 4))
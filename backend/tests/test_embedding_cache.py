@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import sqlite3
+
+import numpy as np
+import pytest
+
+from app.services import embedding_service
+from app.services.embedding_service import EmbeddingService, _EmbeddingCache
+
+
+DAY = 86400
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_800_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(embedding_service.time, "time", clock)
+    return clock
+
+
+def _vec(value):
+    return np.full(4, value, dtype=np.float32)
+
+
+def test_round_trips_vectors(tmp_path, clock):
+    cache = _EmbeddingCache(tmp_path / "cache.sqlite3", "float16")
+
+    cache.put_many([("a", _vec(0.5))])
+
+    assert np.array_equal(cache.get_many(["a", "b"])["a"], _vec(0.5))
+
+
+def test_evicts_least_recently_used_past_cap(tmp_path, clock):
+    cache = _EmbeddingCache(tmp_path / "cache.sqlite3", max_entries=10)
+    for i in range(10):
+        cache.put_many([(f"k{i}", _vec(i))])
+        clock.now += DAY
+    # A hit refreshes k0, so k1 is now the oldest
+    cache.get_many(["k0"])
+
+    cache.put_many([("k10", _vec(10))])
+
+    remaining = set(cache.get_many([f"k{i}" for i in range(11)]))
+    assert len(remaining) == 9
+    assert {"k0", "k10"} <= remaining
+    assert not {"k1", "k2"} & remaining
+
+
+def test_expires_unused_rows_on_open(tmp_path, clock):
+    path = tmp_path / "cache.sqlite3"
+    cache = _EmbeddingCache(path, ttl_days=30)
+    cache.put_many([("old", _vec(1))])
+    clock.now += 20 * DAY
+    cache.put_many([("new", _vec(2))])
+    clock.now += 15 * DAY
+
+    reopened = _EmbeddingCache(path, ttl_days=30)
+
+    assert set(reopened.get_many(["old", "new"])) == {"new"}
+
+
+def test_delete_many(tmp_path, clock):
+    cache = _EmbeddingCache(tmp_path / "cache.sqlite3", max_entries=2)
+    cache.put_many([("a", _vec(1)), ("b", _vec(2))])
+
+    cache.delete_many(["a"])
+    cache.put_many([("c", _vec(3))])
+
+    assert set(cache.get_many(["a", "b", "c"])) == {"b", "c"}
+
+
+def test_upgrades_sidecar_without_used_at(tmp_path, clock):
+    path = tmp_path / "cache.sqlite3"
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE embeddings (hash TEXT PRIMARY KEY, vec BLOB NOT NULL)")
+        conn.execute("INSERT INTO embeddings VALUES ('a', ?)", (_vec(1).tobytes(),))
+    conn.close()
+
+    cache = _EmbeddingCache(path, ttl_days=30)
+
+    assert set(cache.get_many(["a"])) == {"a"}
+
+
+class FakeCollection:
+    def __init__(self, documents):
+        self.documents = documents
+        self.deleted = []
+
+    def get(self, ids, include):
+        return {
+            "ids": ids,
+            "documents": [self.documents[i][0] for i in ids],
+            "metadatas": [self.documents[i][1] for i in ids],
+        }
+
+    def delete(self, ids):
+        self.deleted.extend(ids)
+
+
+def test_delete_chunk_embeddings_prunes_cache(tmp_path, clock):
+    service = EmbeddingService.__new__(EmbeddingService)
+    service._model, service._dim = "model", 4
+    service._cache = _EmbeddingCache(tmp_path / "cache.sqlite3")
+    service._collection = FakeCollection(
+        {"c1": ("first", {"filename": "a.pdf"}), "c2": ("second", {"filename": "a.pdf"})}
+    )
+    keys = {
+        text: service._cache.make_key(
+            text, model="model", dim=4, task_type="RETRIEVAL_DOCUMENT", title="a.pdf"
+        )
+        for text in ("first", "second")
+    }
+    service._cache.put_many([(keys["first"], _vec(1)), (keys["second"], _vec(2))])
+
+    service.delete_chunk_embeddings(["c1"])
+
+    assert service._collection.deleted == ["c1"]
+    assert set(service._cache.get_many(list(keys.values()))) == {keys["second"]}
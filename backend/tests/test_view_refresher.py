@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import asyncio
+import uuid
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.services.analytics.view_refresher import (
+    MATERIALIZED_VIEWS,
+    MaterializedViewRefresher,
+)
+
+
+class FakeSession:
+    def __init__(self, fail: bool = False, dialect: str = "postgresql"):
+        self.fail = fail
+        self.dialect = dialect
+        self.statements = []
+        self.commits = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_exc):
+        return False
+
+    async def connection(self):
+        return SimpleNamespace(dialect=SimpleNamespace(name=self.dialect))
+
+    async def execute(self, statement):
+        if self.fail:
+            raise RuntimeError("refresh failed")
+        self.statements.append(str(statement))
+
+    async def commit(self):
+        self.commits += 1
+
+
+class FakeSessionFactory:
+    def __init__(self):
+        self.fail = False
+        self.sessions = []
+
+    def __call__(self):
+        session = FakeSession(fail=self.fail)
+        self.sessions.append(session)
+        return session
+
+
+async def _settle():
+    # Let the loop run its current iteration
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_refreshes_on_start_and_reports_fresh():
+    factory = FakeSessionFactory()
+    refresher = MaterializedViewRefresher(interval=3600)
+    assert not refresher.is_fresh()
+
+    await refresher.start(factory)
+    await _settle()
+
+    session = factory.sessions[0]
+    assert session.statements == [
+        f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view}" for view in MATERIALIZED_VIEWS
+    ]
+    assert session.commits == 1
+    assert refresher.is_fresh()
+
+    await refresher.stop()
+    assert not refresher.is_fresh()
+
+
+@pytest.mark.asyncio
+async def test_mark_dirty_is_noop_when_not_running():
+    refresher = MaterializedViewRefresher()
+
+    for _ in range(3):
+        refresher.mark_dirty(uuid.uuid4(), cache=object())
+
+    assert refresher._pending == {}
+    assert not refresher._dirty
+
+
+@pytest.mark.asyncio
+async def test_failed_refresh_keeps_users_queued():
+    factory = FakeSessionFactory()
+    factory.fail = True
+    refresher = MaterializedViewRefresher(interval=3600)
+    await refresher.start(factory)
+    await _settle()
+
+    user_id = uuid.uuid4()
+    cache = SimpleNamespace(unlink_pattern=AsyncMock())
+    refresher.mark_dirty(user_id, cache)
+
+    with pytest.raises(RuntimeError):
+        await refresher.refresh()
+    assert not refresher.is_fresh()
+    assert refresher._pending == {user_id.hex: cache}
+
+    factory.fail = False
+    await refresher.refresh()
+    assert refresher.is_fresh()
+    assert refresher._pending == {}
+    cache.unlink_pattern.assert_awaited_once_with(f"analytics:*:{user_id.hex}:*")
+
+    await refresher.stop()
+
+
+@pytest.mark.asyncio
+async def test_skips_refresh_on_other_dialects():
+    session = FakeSession(dialect="sqlite")
+    refresher = MaterializedViewRefresher(interval=3600)
+    refresher._session_factory = lambda: session
+
+    await refresher.refresh()
+
+    assert session.statements == []
+    assert session.commits == 0